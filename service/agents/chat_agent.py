@@ -87,7 +87,7 @@ class ChatAgent:
         )
         self.chain = self.prompt_template | self.model
 
-    def run(self, query, chat_history, username=None):
+    def run(self, query, chat_history, username=None, config=None):
         try:
             # Get the formatted prompt before invoking the chain
             logger.info(f"Chat agent input history: {chat_history}")
@@ -99,19 +99,38 @@ class ChatAgent:
 
             # Invoke the chain with the same parameters
             response = self.chain.invoke(
-                {"query": query, "chat_history": chat_history, "username": username}
+                {"query": query, "chat_history": chat_history, "username": username},
+                config=config,
             )
-            logger.info(f"Type of response: {type(response)}")
-            logger.info(f"Chat agent response: {response}")
-
-            # Ensure response has the expected structure
-            if not hasattr(response, "use_rag") or not hasattr(response, "message"):
-                logger.warning(f"Unexpected response format: {response}")
-                return ChatAgentResponse(use_rag=False, message=str(response))
-            return response
+            return self._check_response(response)
         except Exception as e:
             logger.error(f"Error in ChatAgent: {str(e)}", exc_info=True)
-            return ChatAgentResponse(
-                use_rag=False,
-                message="I encountered an error processing your request. Please try again.",
+            return self._error_response()
+
+    async def arun(self, query, chat_history, username=None, config=None):
+        try:
+            logger.info(f"Chat agent input history: {chat_history}")
+            response = await self.chain.ainvoke(
+                {"query": query, "chat_history": chat_history, "username": username},
+                config=config,
             )
+            return self._check_response(response)
+        except Exception as e:
+            logger.error(f"Error in ChatAgent: {str(e)}", exc_info=True)
+            return self._error_response()
+
+    def _check_response(self, response):
+        logger.info(f"Type of response: {type(response)}")
+        logger.info(f"Chat agent response: {response}")
+
+        # Ensure response has the expected structure
+        if not hasattr(response, "use_rag") or not hasattr(response, "message"):
+            logger.warning(f"Unexpected response format: {response}")
+            return ChatAgentResponse(use_rag=False, message=str(response))
+        return response
+
+    def _error_response(self):
+        return ChatAgentResponse(
+            use_rag=False,
+            message="I encountered an error processing your request. Please try again.",
+        )
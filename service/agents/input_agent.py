@@ -73,5 +73,8 @@ class InputAgent:
         )
         self.chain = self.prompt_template | self.agent
 
-    def run(self, query):
-        return self.chain.invoke({"query": query})
+    def run(self, query, config=None):
+        return self.chain.invoke({"query": query}, config=config)
+
+    async def arun(self, query, config=None):
+        return await self.chain.ainvoke({"query": query}, config=config)
@@ -75,7 +75,14 @@ class QueryAgent:
         )
         self.chain = self.prompt_template | self.agent
 
-    def run(self, query, chat_history=None):
+    def run(self, query, chat_history=None, config=None):
         if chat_history is None:
             chat_history = []
-        return self.chain.invoke({"query": query, "chat_history": chat_history})
+        return self.chain.invoke({"query": query, "chat_history": chat_history}, config=config)
+
+    async def arun(self, query, chat_history=None, config=None):
+        if chat_history is None:
+            chat_history = []
+        return await self.chain.ainvoke(
+            {"query": query, "chat_history": chat_history}, config=config
+        )
@@ -95,3 +95,9 @@ class ResponseAgent:
             chat_history = []
         prompt = self.create_prompt(query, sub_queries, memory, search_result, chat_history)
         return self.agent.invoke(prompt)
+
+    async def aanswer(self, query, sub_queries, memory, search_result, chat_history=None):
+        if chat_history is None:
+            chat_history = []
+        prompt = self.create_prompt(query, sub_queries, memory, search_result, chat_history)
+        return await self.agent.ainvoke(prompt)
@@ -1,14 +1,19 @@
+import os
 import uuid
 import streamlit as st
 from langgraph.types import Command
 from langfuse.langchain import CallbackHandler
 from orchestrator.main_graph_node import MainGraph
+from orchestrator.streaming import stream_turn
 from states.graph_states import OverallState, ContextSchema
 from ui.utilities import render_sidebar, setup_page, display_chat_history, login_form
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Show node progress and the answer tokens as they arrive instead of waiting for the full answer
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
+
 
 @st.dialog("Confirm Action")
 def confirm_action():
@@ -31,6 +36,49 @@ def confirm_action():
             st.rerun()
 
 
+def run_turn(main_graph, graph_input, config, context, durability, status_label):
+    """Run one graph turn, streaming progress and answer tokens into the chat message.
+
+    Returns:
+        The final response, and the pending interrupt value or None.
+    """
+    if not STREAM_RESPONSES:
+        with st.spinner(status_label):
+            output = main_graph.invoke(
+                graph_input, config=config, context=context, durability=durability
+            )
+        if output.get("__interrupt__", []):
+            return None, output["__interrupt__"][0].value
+        final_response = output["messages"][-1].content
+        st.markdown(final_response)
+        return final_response, None
+
+    status = st.status(status_label, expanded=False)
+    answer_placeholder = st.empty()
+    answer = ""
+
+    def on_token(token):
+        nonlocal answer
+        answer += token
+        answer_placeholder.markdown(answer + "▌")
+
+    turn = stream_turn(
+        main_graph,
+        graph_input,
+        config=config,
+        context=context,
+        durability=durability,
+        on_progress=lambda event: status.write(event),
+        on_token=on_token,
+    )
+    status.update(label="Done", state="complete")
+    if turn.interrupt is not None:
+        answer_placeholder.empty()
+        return None, turn.interrupt
+    answer_placeholder.markdown(turn.final_response)
+    return turn.final_response, None
+
+
 def main():
     # Show login if not authenticated
     if "username" not in st.session_state:
@@ -49,6 +97,7 @@ def main():
         logger.info(f"New session started with ID: {st.session_state['session_id']}")
 
     main_graph = st.session_state["main_graph"].graph
+    durability = st.session_state["main_graph"].durability
 
     langfuse_handler = CallbackHandler()
     config = {
@@ -66,11 +115,15 @@ def main():
     if "decision" in st.session_state and st.session_state.decision == "accept":
         del st.session_state.decision
         with st.chat_message("assistant", avatar="public/favicon.jpg"):
-            with st.spinner("Searching the web..."):
-                output = main_graph.invoke(Command(resume=True), config=config, context=context)
-                final_response = output["messages"][-1].content
-                st.markdown(final_response)
-                st.session_state.session_messages[-1]["content"] = final_response
+            final_response, _ = run_turn(
+                main_graph,
+                Command(resume=True),
+                config,
+                context,
+                durability,
+                "Searching the web...",
+            )
+            st.session_state.session_messages[-1]["content"] = final_response
         st.rerun()
 
     # Rejected HITL
@@ -86,42 +139,34 @@ def main():
             st.markdown(prompt)
 
         with st.chat_message("assistant", avatar="public/favicon.jpg"):
-            with st.spinner("Thinking..."):
-                try:
-                    input_state = OverallState(
-                        query=prompt,
-                        input_guardrails=False,
-                        use_rag=False,
-                        formatted_query=None,
-                        sub_results=[],
-                    )
-
-                    logger.info(f"Input State : {input_state}")
-                    output = main_graph.invoke(
-                        input_state,
-                        config=config,
-                        context=context,
-                    )
-                    log_output = {k: v for k, v in output.items() if k != "sub_results"}
-                    logger.info(f"LangGraph Output: {log_output} \n\n")
-                    logger.info("=" * 50)
-                    logger.info(f"Query: {input_state.query}")
-                    logger.info(f"Chat Response: {output['final_result']}")
-                    if output.get("__interrupt__", []):
-                        final_response = "Human Action needed for web search."
-                        logger.info(f"Human Action needed : {output['__interrupt__'][0].value}")
-                        confirm_action()
-                    else:
-                        final_response = output["messages"][-1].content
-                        st.markdown(final_response)
-
-                except Exception as e:
-                    error_msg = f"An error occurred: {str(e)}"
-                    st.error(error_msg)
-                    final_response = error_msg
-                st.session_state.session_messages.append(
-                    {"role": "assistant", "content": final_response}
+            try:
+                input_state = OverallState(
+                    query=prompt,
+                    input_guardrails=False,
+                    use_rag=False,
+                    formatted_query=None,
+                    sub_results=[],
+                )
+
+                logger.info(f"Input State : {input_state}")
+                final_response, interrupt_value = run_turn(
+                    main_graph, input_state, config, context, durability, "Thinking..."
                 )
+                logger.info("=" * 50)
+                logger.info(f"Query: {input_state.query}")
+                logger.info(f"Chat Response: {final_response}")
+                if interrupt_value is not None:
+                    final_response = "Human Action needed for web search."
+                    logger.info(f"Human Action needed : {interrupt_value}")
+                    confirm_action()
+
+            except Exception as e:
+                error_msg = f"An error occurred: {str(e)}"
+                st.error(error_msg)
+                final_response = error_msg
+            st.session_state.session_messages.append(
+                {"role": "assistant", "content": final_response}
+            )
 
 
 if __name__ == "__main__":
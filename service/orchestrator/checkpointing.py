@@ -0,0 +1,86 @@
+import asyncio
+import os
+import threading
+from typing import Optional
+from langgraph.checkpoint.postgres import PostgresSaver
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DB_URI = os.getenv(
+    "POSTGRES_URI", "postgresql://clarencechan@172.17.0.1:5432/postgres?sslmode=disable"
+)
+CONNECTION_KWARGS = {
+    "autocommit": True,
+    "prepare_threshold": 0,
+}
+POOL_MAX_SIZE = int(os.getenv("POSTGRES_POOL_MAX_SIZE", "20"))
+
+# "exit" persists checkpoints only at interrupts and at the end of a turn, "async" and "sync"
+# after every step
+CHECKPOINT_DURABILITY = os.getenv("CHECKPOINT_DURABILITY", "exit")
+
+_pool: Optional[ConnectionPool] = None
+_checkpointer: Optional[PostgresSaver] = None
+_lock = threading.Lock()
+
+_async_pool: Optional[AsyncConnectionPool] = None
+_async_checkpointer: Optional[AsyncPostgresSaver] = None
+_async_lock: Optional[asyncio.Lock] = None
+
+
+def get_checkpointer() -> PostgresSaver:
+    """Return the process-wide PostgresSaver on the shared connection pool.
+
+    The pool and the checkpoint tables are set up on first use.
+    """
+    global _pool, _checkpointer
+    with _lock:
+        if _checkpointer is None:
+            _pool = ConnectionPool(
+                DB_URI, max_size=POOL_MAX_SIZE, kwargs=CONNECTION_KWARGS, open=True
+            )
+            _checkpointer = PostgresSaver(_pool)
+            _checkpointer.setup()
+            logger.info(f"Postgres checkpointer initialized, pool max size {POOL_MAX_SIZE}")
+        return _checkpointer
+
+
+async def aget_checkpointer() -> AsyncPostgresSaver:
+    """Return the process-wide AsyncPostgresSaver on the shared async connection pool.
+
+    The pool is bound to the event loop it is first requested from.
+    """
+    global _async_pool, _async_checkpointer, _async_lock
+    if _async_lock is None:
+        _async_lock = asyncio.Lock()
+    async with _async_lock:
+        if _async_checkpointer is None:
+            pool = AsyncConnectionPool(
+                DB_URI, max_size=POOL_MAX_SIZE, kwargs=CONNECTION_KWARGS, open=False
+            )
+            await pool.open()
+            checkpointer = AsyncPostgresSaver(pool)
+            await checkpointer.setup()
+            _async_pool, _async_checkpointer = pool, checkpointer
+            logger.info(f"Async Postgres checkpointer initialized, pool max size {POOL_MAX_SIZE}")
+        return _async_checkpointer
+
+
+def close():
+    """Close the shared connection pool."""
+    global _pool, _checkpointer
+    with _lock:
+        if _pool is not None:
+            _pool.close()
+        _pool, _checkpointer = None, None
+
+
+async def aclose():
+    """Close the shared async connection pool."""
+    global _async_pool, _async_checkpointer
+    if _async_pool is not None:
+        await _async_pool.close()
+    _async_pool, _async_checkpointer = None, None
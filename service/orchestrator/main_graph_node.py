@@ -1,37 +1,54 @@
-from typing import Dict, Any
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 from langgraph.graph import StateGraph, END, START
 from langgraph.runtime import Runtime
-from langgraph.types import interrupt
+from langgraph.types import Overwrite, interrupt
 from langchain_core.runnables import RunnableConfig
 from states.graph_states import (
     InputState,
     OverallState,
     ContextSchema,
-    QueryResult,
     SummarizeResponse,
 )
 from .subgraph_nodes import RetrievalSubGraph
+from .speculation import SpeculativeFront
+from . import checkpointing
 from agents.input_agent import InputAgent
 from agents.chat_agent import ChatAgent
 from agents.query_agent import QueryAgent
 from agents.response_agent import ResponseAgent
 from tools.reranker import Reranker
-from tools.web_search import web_search
+from tools.rerank_cache import RerankScoreCache
+from tools.web_search import web_search, aweb_search
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
 from langgraph.config import get_stream_writer
-from langgraph.checkpoint.postgres import PostgresSaver
-from psycopg import Connection
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langfuse import get_client
 from utils.logger import get_logger
 
 langfuse = get_client()
 logger = get_logger(__name__)
 
+# Chunks reranked above this score are passed to the response agent
+RERANK_SCORE_THRESHOLD = 0.4
+
 
 class MainGraph:
 
-    def __init__(self):
+    def __init__(
+        self, checkpointer: Optional[BaseCheckpointSaver] = None, async_nodes: bool = False
+    ):
+        """Build the agents, the retrieval components and the compiled graph.
+
+        Args:
+            checkpointer: Checkpointer of the graph, the process-wide PostgresSaver on the
+                shared connection pool when omitted.
+            async_nodes: Compile the graph with async nodes, to run it with ainvoke/astream.
+                See `acreate`.
+        """
         self.chat_agent = ChatAgent(model_name="gpt-4o-mini", temperature=0)
         self.input_agent = InputAgent(model_name="gpt-5-nano", temperature=0)
         self.query_agent = QueryAgent(model_name="gpt-4o-mini", temperature=0)
@@ -41,21 +58,40 @@ class MainGraph:
             schema=SummarizeResponse,
         )
 
-        self.retrieval_subgraph = RetrievalSubGraph().subgraph
+        self.retrieval = RetrievalSubGraph()
+        self.retrieval_subgraph = self.retrieval.subgraph
+        # Two alternative retrieval paths, both fanning out per subquery under
+        # RETRIEVAL_MAX_CONCURRENCY:
+        # - "batch" (default, recommended): one encode call and one Qdrant batch request for
+        #   all subqueries, with the memory searches run concurrently alongside
+        # - "subgraph": the retrieval subgraph once per subquery through batch/abatch, for
+        #   per-subquery traces or custom subgraph steps
+        self.retrieval_mode = os.getenv("RETRIEVAL_MODE", "batch")
         self.reranker = Reranker()
+        if self.reranker.cascade and self.retrieval.qdrant_store.hybrid:
+            # Fused scores are not cosine similarities, the cascade thresholds do not apply
+            logger.warning("Rerank cascade needs dense similarity scores, disabled for hybrid")
+            self.reranker.cascade = False
+        self.rerank_cache = RerankScoreCache.shared()
+
+        # Run guardrail, chat router and query formatter concurrently instead of in sequence
+        self.speculative = os.getenv("SPECULATIVE_FRONT", "false").lower() == "true"
+        self.speculation = (
+            SpeculativeFront(self.input_agent, self.chat_agent, self.query_agent)
+            if self.speculative
+            else None
+        )
 
-        # Initialize checkpointer
-        DB_URI = "postgresql://clarencechan@172.17.0.1:5432/postgres?sslmode=disable"
-
-        connection_kwargs = {
-            "autocommit": True,
-            "prepare_threshold": 0,
-        }
+        # Blocking CPU model calls of the async nodes (reranking) run here, off the event loop
+        self.model_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("MODEL_EXECUTOR_WORKERS", "2")), thread_name_prefix="model"
+        )
 
-        conn = Connection.connect(DB_URI, **connection_kwargs)
-        self.checkpointer = PostgresSaver(conn)
-        self.checkpointer.setup()
-        logger.info("Postgres checkpointer initialized")
+        # Initialize checkpointer, pass `durability` when running the graph so that
+        # checkpoints are only written at interrupts and turn ends
+        self.checkpointer = checkpointer or checkpointing.get_checkpointer()
+        self.durability = checkpointing.CHECKPOINT_DURABILITY
+        self.async_nodes = async_nodes
 
         # Verify langfuse
         if langfuse.auth_check():
@@ -65,6 +101,31 @@ class MainGraph:
 
         self.graph = self._build_graph()
 
+    @classmethod
+    async def acreate(cls) -> "MainGraph":
+        """Build a MainGraph with async nodes, checkpointed by the shared AsyncPostgresSaver.
+
+        Conversations run with `graph.ainvoke`/`graph.astream` and share one event loop and
+        one connection pool, instead of holding a thread each while waiting on I/O.
+
+        Returns:
+            The graph wrapper, to be closed with `aclose`.
+        """
+        checkpointer = await checkpointing.aget_checkpointer()
+        # Loading the models blocks, keep the event loop free meanwhile
+        return await asyncio.to_thread(cls, checkpointer=checkpointer, async_nodes=True)
+
+    async def aclose(self):
+        """Release the executors and async clients. The shared pool stays open."""
+        if self.speculation is not None:
+            self.speculation.close()
+        await self.retrieval.qdrant_store.aclose()
+        self.model_executor.shutdown(wait=False)
+
+    async def _run_blocking(self, fn, *args):
+        """Run a blocking CPU call on the model executor."""
+        return await asyncio.get_running_loop().run_in_executor(self.model_executor, fn, *args)
+
     def _input_guardrails(
         self, state: InputState, config: RunnableConfig, runtime: Runtime[ContextSchema]
     ) -> OverallState:
@@ -74,10 +135,24 @@ class MainGraph:
         logger.info(f"Input guardrails state: {state}")
         writer(f"Input guardrails check: {is_safe}")
         logger.info(f"Input guardrails check: {is_safe}")
-        result = {"input_guardrails": is_safe, "use_rag": False}
+        return self._guardrails_result(state.query, is_safe)
+
+    async def _ainput_guardrails(
+        self, state: InputState, config: RunnableConfig, runtime: Runtime[ContextSchema]
+    ) -> OverallState:
+        writer = get_stream_writer()
+        response = await self.input_agent.arun(state.query)
+        is_safe = response.classification == "safe"
+        writer(f"Input guardrails check: {is_safe}")
+        logger.info(f"Input guardrails check: {is_safe}")
+        return self._guardrails_result(state.query, is_safe)
+
+    def _guardrails_result(self, query: str, is_safe: bool) -> Dict[str, Any]:
+        # First node of every turn, so metrics of the previous turn are dropped here
+        result = {"input_guardrails": is_safe, "use_rag": False, "metrics": Overwrite({})}
         if not is_safe:
             result["messages"] = [
-                HumanMessage(content=state.query),
+                HumanMessage(content=query),
                 AIMessage(content="Sorry, I can't assist with that."),
             ]
         return result
@@ -99,7 +174,20 @@ class MainGraph:
             query=state.query, chat_history=chat_history, username=username
         )
         logger.info(f"Chat router response: {response.message}")
-        human_message = HumanMessage(content=state.query)
+        return self._chat_router_result(state.query, response)
+
+    async def _achat_router(
+        self, state: OverallState, config: RunnableConfig, runtime: Runtime[ContextSchema]
+    ) -> OverallState:
+        chat_history = state.messages if state.messages else []
+        response = await self.chat_agent.arun(
+            query=state.query, chat_history=chat_history, username=runtime.context.user_id
+        )
+        logger.info(f"Chat router response: {response.message}")
+        return self._chat_router_result(state.query, response)
+
+    def _chat_router_result(self, query: str, response) -> Dict[str, Any]:
+        human_message = HumanMessage(content=query)
         ai_message = AIMessage(content=response.message)
         result = {
             "messages": (
@@ -115,6 +203,54 @@ class MainGraph:
             result["final_result"] = response.message
         return result
 
+    def _speculative_front(
+        self, state: OverallState, config: RunnableConfig, runtime: Runtime[ContextSchema]
+    ) -> OverallState:
+        """Guardrail, chat router and query formatter in one node, run concurrently."""
+        writer = get_stream_writer()
+        chat_history = state.messages if state.messages else []
+        outcome = self.speculation.run(
+            state.query, chat_history, username=runtime.context.user_id, config=config
+        )
+        return self._speculation_result(state.query, outcome, writer)
+
+    async def _aspeculative_front(
+        self, state: OverallState, config: RunnableConfig, runtime: Runtime[ContextSchema]
+    ) -> OverallState:
+        writer = get_stream_writer()
+        chat_history = state.messages if state.messages else []
+        outcome = await self.speculation.arun(
+            state.query, chat_history, username=runtime.context.user_id, config=config
+        )
+        return self._speculation_result(state.query, outcome, writer)
+
+    def _speculation_result(self, query: str, outcome, writer) -> Dict[str, Any]:
+        writer(f"Input guardrails check: {outcome.is_safe}")
+        logger.info(f"Input guardrails check: {outcome.is_safe}")
+
+        result = self._guardrails_result(query, outcome.is_safe)
+        if outcome.is_safe:
+            logger.info(f"Chat router response: {outcome.chat_response.message}")
+            result.update(self._chat_router_result(query, outcome.chat_response))
+        if outcome.formatted_query is not None:
+            writer(f"Formatted queries: {outcome.formatted_query}")
+            result["formatted_query"] = outcome.formatted_query
+
+        metrics = {
+            "speculation_hit": outcome.hit,
+            "speculation_wasted_tokens": outcome.wasted_tokens,
+            "speculation_hit_rate": self.speculation.stats()["hit_rate"],
+        }
+        result["metrics"] = Overwrite(metrics)
+        logger.info(f"Speculation metrics: {metrics}")
+        return result
+
+    def _route_after_speculation(self, state: OverallState, runtime: Runtime[ContextSchema]):
+        """Function to determine node after the speculative front (retrieval / web / END)"""
+        if not state.input_guardrails:
+            return END
+        return self._route_after_rag_usage(state, runtime)
+
     def _route_after_rag_usage(self, state: OverallState, runtime: Runtime[ContextSchema]):
         """Function to determine node based on RAG usage result (continue / END)"""
         if state.use_rag:
@@ -128,18 +264,38 @@ class MainGraph:
         self, state: OverallState, config: RunnableConfig, runtime: Runtime[ContextSchema]
     ) -> Dict[str, Any]:
 
-        sub_results = []
-        for subquery in state.formatted_query:
-            logger.info(f"Processing subquery: {subquery}")
-            response = self.retrieval_subgraph.invoke({"subquery": subquery})
+        if self.retrieval_mode == "batch":
+            writer = get_stream_writer()
+            writer(f"Searching {len(state.formatted_query)} subqueries")
+            logger.info(f"Processing subqueries in one batch: {state.formatted_query}")
+            sub_results = self.retrieval.retrieve_batch(
+                state.formatted_query, user_id=runtime.context.user_id
+            )
+        else:
+            logger.info(f"Processing subqueries concurrently: {state.formatted_query}")
+            sub_results = self.retrieval.run_subqueries(state.formatted_query)
+
+        return self._rerank_sub_results(state.query, sub_results)
 
-            query_result = QueryResult(
-                subquery=subquery,
-                search_result=response.get("search_result"),
-                memories=response.get("memories"),
+    async def _acall_retrieval_subgraph(
+        self, state: OverallState, config: RunnableConfig, runtime: Runtime[ContextSchema]
+    ) -> Dict[str, Any]:
+        if self.retrieval_mode == "batch":
+            writer = get_stream_writer()
+            writer(f"Searching {len(state.formatted_query)} subqueries")
+            logger.info(f"Processing subqueries in one batch: {state.formatted_query}")
+            sub_results = await self.retrieval.aretrieve_batch(
+                state.formatted_query, user_id=runtime.context.user_id
             )
-            sub_results.append(query_result)
+        else:
+            logger.info(f"Processing subqueries concurrently: {state.formatted_query}")
+            sub_results = await self.retrieval.arun_subqueries(state.formatted_query)
+
+        # The reranker model and the content store lookups block
+        return await self._run_blocking(self._rerank_sub_results, state.query, sub_results)
 
+    def _rerank_sub_results(self, query: str, sub_results: List[Any]) -> Dict[str, Any]:
+        """Rerank the retrieved chunks and fetch the texts of those kept."""
         # Apply reranking to retreived documents
         documents = []
         chunk_positions = []
@@ -153,19 +309,124 @@ class MainGraph:
                         documents.append(chunk["content"])
                         chunk_positions.append((result_idx, chunk_idx))
 
-        logger.info(f"Calling reranker with: {state.query} and {len(documents)} documents")
-        rerank_scores = self.reranker.run(queries=[state.query], documents=documents)
+        retrieved = [
+            sub_results[result_idx].search_result[chunk_idx]
+            for result_idx, chunk_idx in chunk_positions
+        ]
+        rerank_scores, cache_hits, model_scored = self._rerank_with_cache(
+            query,
+            [chunk["id"] for chunk in retrieved],
+            documents,
+            [chunk.get("score", 0.0) for chunk in retrieved],
+        )
         logger.info(f"Reranker scores : {rerank_scores}")
 
         for (result_idx, chunk_idx), score in zip(chunk_positions, rerank_scores):
             sub_results[result_idx].search_result[chunk_idx]["rerank_score"] = score
-
-        return {"sub_results": sub_results}
+        # With lean payloads only the chunks that survive reranking carry their text on
+        for chunk, document in zip(retrieved, documents):
+            if chunk.get("content") is None and chunk["rerank_score"] > RERANK_SCORE_THRESHOLD:
+                chunk["content"] = document
+
+        cache_stats = self.rerank_cache.stats()
+        metrics = {
+            "rerank_cache_hits": cache_hits,
+            "rerank_cache_misses": len(documents) - cache_hits,
+            "rerank_cache_hit_rate": cache_stats["hit_rate"],
+            "rerank_model_documents": model_scored,
+        }
+        if self.reranker.cascade:
+            metrics["rerank_cascade_skip_rate"] = self.reranker.cascade_stats()[
+                "skipped_document_rate"
+            ]
+        logger.info(f"Rerank metrics: {metrics}")
+        return {"sub_results": sub_results, "metrics": metrics}
+
+    def _rerank_with_cache(self, query, point_ids, documents, vector_scores):
+        """Rerank documents, sending only the chunks missing from the score cache.
+
+        With the reranker cascade enabled, the accept / reject / rerank decision is made on
+        all candidates of the query, and only cache misses left ambiguous go to the model.
+        Only model scores are cached.
+
+        Lean payloads carry no text. It is fetched in one lookup, once the cache and the
+        cascade have settled which chunks the model scores and which are kept without it,
+        and filled into `documents` in place.
+
+        Returns:
+            The scores in document order, the number of cache hits and the number of
+            documents scored by the model.
+        """
+        qdrant_store = self.retrieval.qdrant_store
+        collection_version = qdrant_store.get_collection_version()
+        self.rerank_cache.check_collection_version(qdrant_store.collection_name, collection_version)
+        keys = [
+            RerankScoreCache.make_key(
+                self.reranker.model_name,
+                qdrant_store.collection_name,
+                query,
+                point_id,
+                collection_version,
+            )
+            for point_id in point_ids
+        ]
+        scores = self.rerank_cache.get_many(keys)
+        miss_idx = [i for i, score in enumerate(scores) if score is None]
+
+        logger.info(
+            f"Calling reranker with: {query} and {len(miss_idx)}/{len(documents)} "
+            "documents not in the rerank cache"
+        )
+        model_idx = miss_idx
+        if miss_idx and self.reranker.cascade:
+            # Planned on the full list, so a warm cache leaving few misses does not change
+            # which rule applies to them
+            to_rerank, cascade_scores = self.reranker.plan_cascade(vector_scores)
+            ambiguous = set(to_rerank)
+            model_idx = [i for i in miss_idx if i in ambiguous]
+            for i in miss_idx:
+                if i not in ambiguous:
+                    scores[i] = cascade_scores[i]
+            self.reranker.record_cascade(len(miss_idx), len(model_idx))
+
+        model_set = set(model_idx)
+        missing = [
+            i
+            for i, document in enumerate(documents)
+            if document is None and (i in model_set or scores[i] > RERANK_SCORE_THRESHOLD)
+        ]
+        if missing:
+            contents = qdrant_store.fetch_contents([str(point_ids[i]) for i in missing])
+            for i in missing:
+                documents[i] = contents.get(str(point_ids[i]))
+
+        if model_idx:
+            model_scores = self.reranker.run(
+                queries=[query], documents=[documents[i] or "" for i in model_idx]
+            )
+            self.rerank_cache.put_many([keys[i] for i in model_idx], model_scores)
+            for i, score in zip(model_idx, model_scores):
+                scores[i] = score
+        return scores, len(documents) - len(miss_idx), len(model_idx)
 
     def _make_response(
         self, state: OverallState, config: RunnableConfig, runtime: Runtime[ContextSchema]
     ) -> Dict[str, str]:
+        response = self.response_agent.answer(**self._response_inputs(state))
+        logger.info(f"Response: {response}")
+        ai_message = AIMessage(content=response.content)
+        return {"messages": [ai_message], "final_result": response.content}
+
+    async def _amake_response(
+        self, state: OverallState, config: RunnableConfig, runtime: Runtime[ContextSchema]
+    ) -> Dict[str, str]:
+        response = await self.response_agent.aanswer(**self._response_inputs(state))
+        logger.info(f"Response: {response}")
+        ai_message = AIMessage(content=response.content)
+        return {"messages": [ai_message], "final_result": response.content}
 
+    def _response_inputs(self, state: OverallState) -> Dict[str, Any]:
+        """Distinct reranked chunks and memories of all subqueries, for the response agent."""
         seen_ids = set()
         distinct_search_results = []
         distinct_memories = []
@@ -173,7 +434,10 @@ class MainGraph:
         for sub_result in state.sub_results:
             if sub_result.search_result:
                 for chunk in sub_result.search_result:
-                    if chunk.get("id") not in seen_ids and chunk.get("rerank_score", 0) > 0.4:
+                    if (
+                        chunk.get("id") not in seen_ids
+                        and chunk.get("rerank_score", 0) > RERANK_SCORE_THRESHOLD
+                    ):
                         seen_ids.add(chunk["id"])
                         distinct_search_results.append(chunk)
 
@@ -184,16 +448,13 @@ class MainGraph:
 
         # Pass chat history to response agent for context-aware response generation
         chat_history = state.messages if state.messages else []
-        response = self.response_agent.answer(
-            query=state.query,
-            sub_queries=state.formatted_query,
-            memory=distinct_memories,
-            search_result=[result["content"] for result in distinct_search_results],
-            chat_history=chat_history,
-        )
-        logger.info(f"Response: {response}")
-        ai_message = AIMessage(content=response.content)
-        return {"messages": [ai_message], "final_result": response.content}
+        return {
+            "query": state.query,
+            "sub_queries": state.formatted_query,
+            "memory": distinct_memories,
+            "search_result": [result["content"] for result in distinct_search_results],
+            "chat_history": chat_history,
+        }
 
     def _query_formatter(
         self, state: OverallState, config: RunnableConfig, runtime: Runtime[ContextSchema]
@@ -207,6 +468,17 @@ class MainGraph:
         writer(f"Formatted queries: {formatted_queries}")
         return {"formatted_query": formatted_queries}
 
+    async def _aquery_formatter(
+        self, state: OverallState, config: RunnableConfig, runtime: Runtime[ContextSchema]
+    ) -> OverallState:
+        writer = get_stream_writer()
+        chat_history = state.messages if state.messages else []
+        formatted_queries = (
+            await self.query_agent.arun(query=state.query, chat_history=chat_history)
+        ).queries
+        writer(f"Formatted queries: {formatted_queries}")
+        return {"formatted_query": formatted_queries}
+
     def _should_summarize(self, state: OverallState) -> str:
         messages = state.messages
         print(f"Current message count: {len(messages)}")
@@ -216,6 +488,14 @@ class MainGraph:
         return False
 
     def _chat_summarizer(self, state: OverallState) -> OverallState:
+        response = self.summarize_model.invoke(self._summary_input(state))
+        return self._summary_result(state, response)
+
+    async def _achat_summarizer(self, state: OverallState) -> OverallState:
+        response = await self.summarize_model.ainvoke(self._summary_input(state))
+        return self._summary_result(state, response)
+
+    def _summary_input(self, state: OverallState) -> List[Any]:
         message_count = len(state.messages)
         prev_summarization = state.chat_summary
         print(f"In summarizing node at {message_count} messages")
@@ -227,9 +507,9 @@ class MainGraph:
         else:
             summary_message = "Create a summary of the conversation above:"
 
-        model_input = state.messages + [HumanMessage(content=summary_message)]
-        response = self.summarize_model.invoke(model_input)
+        return state.messages + [HumanMessage(content=summary_message)]
 
+    def _summary_result(self, state: OverallState, response: SummarizeResponse) -> OverallState:
         to_delete = [RemoveMessage(id=m.id) for m in state.messages]
         new_messages = to_delete + [AIMessage(content=response.summary)]
         return {"messages": new_messages, "chat_summary": response.summary}
@@ -245,37 +525,71 @@ class MainGraph:
         web_search_response = web_search(state.query)
         return {"messages": [AIMessage(content=web_search_response.content[0]["text"])]}
 
+    async def _acall_web_search_node(self, state: OverallState):
+        web_search_response = await aweb_search(state.query)
+        return {"messages": [AIMessage(content=web_search_response.content[0]["text"])]}
+
     def _build_graph(self):
         graph_builder = StateGraph(OverallState)
 
-        graph_builder.add_node("input_guardrails", self._input_guardrails)
-        graph_builder.add_node("chat_summarizer", self._chat_summarizer)
-        graph_builder.add_node("chat_router", self._chat_router)
-
-        graph_builder.add_node("retrieval_subgraph", self._call_retrieval_subgraph)
-        graph_builder.add_node("make_response", self._make_response)
-        graph_builder.add_node("query_formatter", self._query_formatter)
+        def node(sync_fn, async_fn):
+            return async_fn if self.async_nodes else sync_fn
 
-        graph_builder.add_node("approval_node", self._approval_node)
-        graph_builder.add_node("call_web_search_node", self._call_web_search_node)
+        graph_builder.add_node(
+            "chat_summarizer", node(self._chat_summarizer, self._achat_summarizer)
+        )
+        if self.speculative:
+            graph_builder.add_node(
+                "speculative_front", node(self._speculative_front, self._aspeculative_front)
+            )
+        else:
+            graph_builder.add_node(
+                "input_guardrails", node(self._input_guardrails, self._ainput_guardrails)
+            )
+            graph_builder.add_node("chat_router", node(self._chat_router, self._achat_router))
+            graph_builder.add_node(
+                "query_formatter", node(self._query_formatter, self._aquery_formatter)
+            )
 
-        graph_builder.add_conditional_edges(
-            START, self._should_summarize, {True: "chat_summarizer", False: "input_guardrails"}
+        graph_builder.add_node(
+            "retrieval_subgraph",
+            node(self._call_retrieval_subgraph, self._acall_retrieval_subgraph),
         )
-        graph_builder.add_edge("chat_summarizer", "input_guardrails")
-        graph_builder.add_conditional_edges(
-            "input_guardrails", self._route_after_guardrails, {True: "chat_router", False: END}
+        graph_builder.add_node("make_response", node(self._make_response, self._amake_response))
+
+        graph_builder.add_node("approval_node", self._approval_node)
+        graph_builder.add_node(
+            "call_web_search_node", node(self._call_web_search_node, self._acall_web_search_node)
         )
+
+        front = "speculative_front" if self.speculative else "input_guardrails"
         graph_builder.add_conditional_edges(
-            "chat_router",
-            self._route_after_rag_usage,
-            {"use_rag": "query_formatter", "use_web": "approval_node", END: END},
+            START, self._should_summarize, {True: "chat_summarizer", False: front}
         )
+        graph_builder.add_edge("chat_summarizer", front)
+        if self.speculative:
+            # The formatted queries are already in the state, go straight to retrieval
+            graph_builder.add_conditional_edges(
+                "speculative_front",
+                self._route_after_speculation,
+                {"use_rag": "retrieval_subgraph", "use_web": "approval_node", END: END},
+            )
+        else:
+            graph_builder.add_conditional_edges(
+                "input_guardrails",
+                self._route_after_guardrails,
+                {True: "chat_router", False: END},
+            )
+            graph_builder.add_conditional_edges(
+                "chat_router",
+                self._route_after_rag_usage,
+                {"use_rag": "query_formatter", "use_web": "approval_node", END: END},
+            )
+            graph_builder.add_edge("query_formatter", "retrieval_subgraph")
         graph_builder.add_conditional_edges(
             "approval_node", self._approval_routing, {True: "call_web_search_node", False: END}
         )
         graph_builder.add_edge("call_web_search_node", END)
-        graph_builder.add_edge("query_formatter", "retrieval_subgraph")
         graph_builder.add_edge("retrieval_subgraph", "make_response")
         graph_builder.add_edge("make_response", END)
 
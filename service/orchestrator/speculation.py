@@ -0,0 +1,249 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from langchain_core.callbacks import UsageMetadataCallbackHandler
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs
+from agents.chat_agent import ChatAgentResponse
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SpeculationOutcome:
+    """Result of one speculative front run.
+
+    Attributes:
+        is_safe: Guardrail classification of the query.
+        chat_response: Chat router response, None if the query is unsafe.
+        formatted_query: Subqueries from the query formatter, None unless the router chose RAG.
+        hit: Whether every speculative call was used.
+        wasted_tokens: Tokens of discarded calls that had finished when the turn was decided.
+    """
+
+    is_safe: bool
+    chat_response: Optional[ChatAgentResponse] = None
+    formatted_query: Optional[List[str]] = None
+    hit: bool = False
+    wasted_tokens: int = 0
+
+
+class SpeculativeFront:
+    """Runs the input guardrail, chat router and query formatter at the same time.
+
+    The guardrail decides first: on an unsafe query the router and formatter results are
+    dropped. The formatter result is only used when the router chooses RAG. Discarded calls
+    that have not started are cancelled, running ones finish in the background and their
+    tokens are counted as wasted. With `arun` the calls are asyncio tasks and discarded
+    ones are cancelled even while in flight.
+    """
+
+    def __init__(
+        self,
+        input_agent,
+        chat_agent,
+        query_agent,
+        max_workers: Optional[int] = None,
+    ):
+        """Initialize the speculative front.
+
+        Args:
+            input_agent: Guardrail agent, see InputAgent.
+            chat_agent: Chat router agent, see ChatAgent.
+            query_agent: Query formatter agent, see QueryAgent.
+            max_workers: Threads shared by the calls of all turns.
+                Defaults to SPECULATION_MAX_WORKERS.
+        """
+        if max_workers is None:
+            max_workers = int(os.getenv("SPECULATION_MAX_WORKERS", "12"))
+
+        self.input_agent = input_agent
+        self.chat_agent = chat_agent
+        self.query_agent = query_agent
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="speculation"
+        )
+        self._lock = threading.Lock()
+
+        self.turns = 0
+        self.hits = 0
+        self.wasted_calls = 0
+        self.wasted_tokens = 0
+
+    @staticmethod
+    def _total_tokens(handler: UsageMetadataCallbackHandler) -> int:
+        return sum(usage.get("total_tokens", 0) for usage in handler.usage_metadata.values())
+
+    def _submit(self, fn, config: Optional[RunnableConfig], **kwargs):
+        """Submit an agent call with its own token usage handler."""
+        handler = UsageMetadataCallbackHandler()
+        call_config = merge_configs(config, {"callbacks": [handler]})
+        return self._executor.submit(fn, config=call_config, **kwargs), handler
+
+    @staticmethod
+    def _start(fn, config: Optional[RunnableConfig], **kwargs):
+        """Start an async agent call as a task with its own token usage handler."""
+        handler = UsageMetadataCallbackHandler()
+        call_config = merge_configs(config, {"callbacks": [handler]})
+        return asyncio.ensure_future(fn(config=call_config, **kwargs)), handler
+
+    def _discard(
+        self, future: "Future | asyncio.Future", handler: UsageMetadataCallbackHandler
+    ) -> int:
+        """Drop a speculative call.
+
+        Returns:
+            The tokens it used if it has already finished, 0 otherwise. Calls still running
+            add their tokens to the running total when they finish.
+        """
+
+        def record(done: Future):
+            if not done.cancelled() and done.exception() is not None:
+                logger.info(f"Discarded speculative call failed: {done.exception()}")
+            with self._lock:
+                self.wasted_calls += 1
+                self.wasted_tokens += self._total_tokens(handler)
+
+        finished = future.done()
+        if not finished:
+            future.cancel()
+        future.add_done_callback(record)
+        return self._total_tokens(handler) if finished else 0
+
+    def run(
+        self,
+        query: str,
+        chat_history: List[Any],
+        username: Optional[str] = None,
+        config: Optional[RunnableConfig] = None,
+    ) -> SpeculationOutcome:
+        """Run the three front calls concurrently and keep the ones the turn needs.
+
+        Args:
+            query: User query.
+            chat_history: Messages of the conversation so far.
+            username: User name passed to the chat router.
+            config: Runnable config of the calling node, so callbacks and tracing carry over.
+
+        Returns:
+            The guardrail, router and formatter results that apply to this turn.
+        """
+        guardrail, guardrail_usage = self._submit(self.input_agent.run, config, query=query)
+        router, router_usage = self._submit(
+            self.chat_agent.run, config, query=query, chat_history=chat_history, username=username
+        )
+        formatter, formatter_usage = self._submit(
+            self.query_agent.run, config, query=query, chat_history=chat_history
+        )
+
+        try:
+            is_safe = guardrail.result().classification == "safe"
+        except Exception:
+            self._discard(router, router_usage)
+            self._discard(formatter, formatter_usage)
+            raise
+
+        if not is_safe:
+            outcome = SpeculationOutcome(
+                is_safe=False,
+                wasted_tokens=self._discard(router, router_usage)
+                + self._discard(formatter, formatter_usage),
+            )
+        else:
+            try:
+                chat_response = router.result()
+            except Exception:
+                self._discard(formatter, formatter_usage)
+                raise
+            if chat_response.use_rag:
+                outcome = SpeculationOutcome(
+                    is_safe=True,
+                    chat_response=chat_response,
+                    formatted_query=formatter.result().queries,
+                    hit=True,
+                )
+            else:
+                outcome = SpeculationOutcome(
+                    is_safe=True,
+                    chat_response=chat_response,
+                    wasted_tokens=self._discard(formatter, formatter_usage),
+                )
+
+        return self._record(outcome)
+
+    async def arun(
+        self,
+        query: str,
+        chat_history: List[Any],
+        username: Optional[str] = None,
+        config: Optional[RunnableConfig] = None,
+    ) -> SpeculationOutcome:
+        """Async version of run, on the agents' async methods."""
+        guardrail, guardrail_usage = self._start(self.input_agent.arun, config, query=query)
+        router, router_usage = self._start(
+            self.chat_agent.arun, config, query=query, chat_history=chat_history, username=username
+        )
+        formatter, formatter_usage = self._start(
+            self.query_agent.arun, config, query=query, chat_history=chat_history
+        )
+
+        try:
+            is_safe = (await guardrail).classification == "safe"
+        except BaseException:
+            self._discard(router, router_usage)
+            self._discard(formatter, formatter_usage)
+            raise
+
+        if not is_safe:
+            outcome = SpeculationOutcome(
+                is_safe=False,
+                wasted_tokens=self._discard(router, router_usage)
+                + self._discard(formatter, formatter_usage),
+            )
+        else:
+            try:
+                chat_response = await router
+            except BaseException:
+                self._discard(formatter, formatter_usage)
+                raise
+            if chat_response.use_rag:
+                outcome = SpeculationOutcome(
+                    is_safe=True,
+                    chat_response=chat_response,
+                    formatted_query=(await formatter).queries,
+                    hit=True,
+                )
+            else:
+                outcome = SpeculationOutcome(
+                    is_safe=True,
+                    chat_response=chat_response,
+                    wasted_tokens=self._discard(formatter, formatter_usage),
+                )
+        return self._record(outcome)
+
+    def _record(self, outcome: SpeculationOutcome) -> SpeculationOutcome:
+        with self._lock:
+            self.turns += 1
+            self.hits += outcome.hit
+        logger.info(
+            f"Speculation {'hit' if outcome.hit else 'miss'}, "
+            f"wasted tokens: {outcome.wasted_tokens}"
+        )
+        return outcome
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.turns if self.turns else 0.0,
+                "wasted_calls": self.wasted_calls,
+                "wasted_tokens": self.wasted_tokens,
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
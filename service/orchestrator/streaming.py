@@ -0,0 +1,131 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from langchain_core.messages import AIMessage, AIMessageChunk
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Nodes whose LLM output is the answer shown to the user. Other nodes call the LLM for
+# structured output (guardrail, router, formatter) and their tokens are not shown.
+ANSWER_NODES = {"make_response"}
+STREAM_MODES = ["messages", "custom", "updates"]
+
+
+@dataclass
+class StreamedTurn:
+    """Outcome of one streamed graph turn.
+
+    Attributes:
+        final_response: Text of the last AI message of the turn, None if interrupted.
+        interrupt: Value of the pending interrupt, None if the turn completed.
+        time_to_first_token: Seconds until the first answer token, None if nothing streamed.
+        total_time: Seconds until the turn finished or was interrupted.
+    """
+
+    final_response: Optional[str] = None
+    interrupt: Any = None
+    time_to_first_token: Optional[float] = None
+    total_time: float = 0.0
+
+
+class _TurnCollector:
+    """Dispatches stream parts to the callbacks and collects the turn outcome."""
+
+    def __init__(self, on_progress: Callable[[Any], None], on_token: Callable[[str], None]):
+        self.on_progress = on_progress
+        self.on_token = on_token
+        self.turn = StreamedTurn()
+        self.start = time.perf_counter()
+
+    def handle(self, mode: str, chunk: Any):
+        if mode == "custom":
+            self.on_progress(chunk)
+        elif mode == "messages":
+            message, metadata = chunk
+            if (
+                metadata.get("langgraph_node") in ANSWER_NODES
+                and isinstance(message, AIMessageChunk)
+                and isinstance(message.content, str)
+                and message.content
+            ):
+                if self.turn.time_to_first_token is None:
+                    self.turn.time_to_first_token = time.perf_counter() - self.start
+                self.on_token(message.content)
+        elif mode == "updates":
+            if "__interrupt__" in chunk:
+                self.turn.interrupt = chunk["__interrupt__"][0].value
+                return
+            for update in chunk.values():
+                for message in (update or {}).get("messages", []):
+                    if type(message) is AIMessage:
+                        self.turn.final_response = message.content
+
+    def finish(self) -> StreamedTurn:
+        self.turn.total_time = time.perf_counter() - self.start
+        if self.turn.interrupt is not None:
+            self.turn.final_response = None
+        ttft = self.turn.time_to_first_token
+        logger.info(
+            f"Turn streamed, time to first token: "
+            f"{f'{ttft:.2f}s' if ttft is not None else 'n/a'}, "
+            f"time to full answer: {self.turn.total_time:.2f}s"
+        )
+        return self.turn
+
+
+def stream_turn(
+    graph,
+    graph_input: Any,
+    config: dict,
+    context: Any,
+    durability: Optional[str] = None,
+    on_progress: Callable[[Any], None] = lambda event: None,
+    on_token: Callable[[str], None] = lambda token: None,
+) -> StreamedTurn:
+    """Run one turn of a compiled graph, forwarding progress events and answer tokens.
+
+    Args:
+        graph: Compiled MainGraph graph.
+        graph_input: Input state, or a Command to resume after an interrupt.
+        config: Runnable config with the thread ID.
+        context: Runtime context of the turn.
+        durability: Checkpoint durability passed to the graph.
+        on_progress: Called with every event written through get_stream_writer().
+        on_token: Called with every answer token as it arrives.
+
+    Returns:
+        The final response or pending interrupt, with time to first token and total time.
+    """
+    collector = _TurnCollector(on_progress, on_token)
+    for mode, chunk in graph.stream(
+        graph_input,
+        config=config,
+        context=context,
+        stream_mode=STREAM_MODES,
+        durability=durability,
+    ):
+        collector.handle(mode, chunk)
+    return collector.finish()
+
+
+async def astream_turn(
+    graph,
+    graph_input: Any,
+    config: dict,
+    context: Any,
+    durability: Optional[str] = None,
+    on_progress: Callable[[Any], None] = lambda event: None,
+    on_token: Callable[[str], None] = lambda token: None,
+) -> StreamedTurn:
+    """Async version of stream_turn, for graphs built with MainGraph.acreate."""
+    collector = _TurnCollector(on_progress, on_token)
+    async for mode, chunk in graph.astream(
+        graph_input,
+        config=config,
+        context=context,
+        stream_mode=STREAM_MODES,
+        durability=durability,
+    ):
+        collector.handle(mode, chunk)
+    return collector.finish()
@@ -1,17 +1,21 @@
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
 from langgraph.runtime import Runtime
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 
 # from langgraph.checkpoint.memory import InMemorySaver
 from tools.embedding_generator import EmbeddingGenerator
 from tools.vector_store import QdrantVectorStore
+from tools.local_vector_store import LocalVectorStore
 from tools.memory import Mem0Memory
 from states.graph_states import EmbeddingState, QueryResult, ContextSchema
 from langgraph.config import get_stream_writer
-from langgraph.checkpoint.postgres import PostgresSaver
-from psycopg import Connection
 from langfuse import get_client
+from utils.config import get_config
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -27,28 +31,40 @@ class RetrievalSubGraph:
     def __init__(self):
         self.collection_name = os.getenv("QDRANT_COLLECTION", "nba_rules_test")
         self.qdrant_url = os.getenv("QDRANT_URL")
+        self.retriever_config = get_config().retriever
+        self.max_concurrency = int(os.getenv("RETRIEVAL_MAX_CONCURRENCY", "3"))
+        vector_store_config = get_config().vector_store
 
         # Initialize components
         self.emb_generator = EmbeddingGenerator()
-        self.mem_zero = Mem0Memory()
-        self.qdrant_store = QdrantVectorStore(
-            collection_name=self.collection_name,
-            vector_size=self.emb_generator.embedding_dimension,
-            qdrant_url=self.qdrant_url,
-        )
-
-        # Initialize checkpointer
-        DB_URI = "postgresql://clarencechan@172.17.0.1:5432/postgres?sslmode=disable"
-
-        connection_kwargs = {
-            "autocommit": True,
-            "prepare_threshold": 0,
-        }
-
-        conn = Connection.connect(DB_URI, **connection_kwargs)
-        self.checkpointer = PostgresSaver(conn)
-        self.checkpointer.setup()
-        logger.info("Postgres checkpointer initialized")
+        self.mem_zero = Mem0Memory(embedding_generator=self.emb_generator)
+        # "local" serves retrieval from an embedded index, without a Qdrant server
+        self.vector_store_backend = os.getenv("VECTOR_STORE_BACKEND", "qdrant")
+        if self.vector_store_backend == "local":
+            self.qdrant_store = LocalVectorStore(
+                collection_name=self.collection_name,
+                vector_size=self.emb_generator.embedding_dimension,
+            )
+        else:
+            self.qdrant_store = QdrantVectorStore(
+                collection_name=self.collection_name,
+                vector_size=self.emb_generator.embedding_dimension,
+                qdrant_url=self.qdrant_url,
+                hybrid=self.retriever_config.use_hybrid,
+                fusion=self.retriever_config.fusion,
+                vector_weight=self.retriever_config.vector_weight,
+                keyword_weight=self.retriever_config.keyword_weight,
+                prefetch_limit=self.retriever_config.prefetch_limit,
+                hnsw_m=vector_store_config.hnsw_m,
+                hnsw_ef_construct=vector_store_config.hnsw_ef_construct,
+                hnsw_ef=vector_store_config.hnsw_ef,
+                on_disk=vector_store_config.on_disk,
+                on_disk_payload=vector_store_config.on_disk_payload,
+                quantization=vector_store_config.quantization,
+                quantization_always_ram=vector_store_config.quantization_always_ram,
+                rescore=vector_store_config.rescore,
+                oversampling=vector_store_config.oversampling,
+            )
 
         # Verify langfuse
         if langfuse.auth_check():
@@ -58,6 +74,7 @@ class RetrievalSubGraph:
 
         # Build the subgraph
         self.subgraph = self._build_subgraph()
+        self.async_subgraph = self._build_async_subgraph()
 
     @staticmethod
     def _normalize_scored_points(points):
@@ -82,7 +99,7 @@ class RetrievalSubGraph:
         #       " with user = ", runtime.context.user_id)
         writer(f"Generating embedding for {state.subquery}")
 
-        embedding = self.emb_generator.generate_embedding(state.subquery)
+        embedding = self.emb_generator.embed_query(state.subquery)
         # print(f"Generated embedding shape: {embedding.shape}")
         return {"embedding": embedding}
 
@@ -95,7 +112,9 @@ class RetrievalSubGraph:
         #       config["configurable"]["thread_id"],
         #       " with user = ", runtime.context.user_id)
         writer("Performing similarity search with database")
-        results = self.qdrant_store.search(state.embedding)
+        results = self.qdrant_store.search(
+            state.embedding, top_k=self.retriever_config.top_k, query_text=state.subquery
+        )
         normalized_results = self._normalize_scored_points(results)
         return {"search_result": normalized_results}
 
@@ -111,7 +130,162 @@ class RetrievalSubGraph:
         memories = self.mem_zero.search_memory(state.subquery, user_id=runtime.context.user_id)
         return {"memories": memories.get("results", [])}
 
-    def _build_subgraph(self):
+    async def agenerate_embedding(
+        self, state: QueryResult, config: RunnableConfig, runtime: Runtime[ContextSchema]
+    ) -> EmbeddingState:
+        writer = get_stream_writer()
+        writer(f"Generating embedding for {state.subquery}")
+        embedding = await self.emb_generator.aembed_query(state.subquery)
+        return {"embedding": embedding}
+
+    async def avector_search(
+        self, state: EmbeddingState, config: RunnableConfig, runtime: Runtime[ContextSchema]
+    ) -> QueryResult:
+        """Perform vector search on the async Qdrant client."""
+        writer = get_stream_writer()
+        writer("Performing similarity search with database")
+        results = await self.qdrant_store.asearch(
+            state.embedding, top_k=self.retriever_config.top_k, query_text=state.subquery
+        )
+        return {"search_result": self._normalize_scored_points(results)}
+
+    async def amemory_search(
+        self, state: QueryResult, config: RunnableConfig, runtime: Runtime[ContextSchema]
+    ) -> QueryResult:
+        """Search for relevant memories without blocking the event loop."""
+        writer = get_stream_writer()
+        writer("Performing memory search for any relevant preferences")
+        memories = await asyncio.to_thread(
+            self.mem_zero.search_memory, state.subquery, user_id=runtime.context.user_id
+        )
+        return {"memories": memories.get("results", [])}
+
+    @staticmethod
+    def _to_query_results(subqueries: List[str], responses: List[dict]) -> List[QueryResult]:
+        return [
+            QueryResult(
+                subquery=subquery,
+                search_result=response.get("search_result"),
+                memories=response.get("memories"),
+            )
+            for subquery, response in zip(subqueries, responses)
+        ]
+
+    def run_subqueries(
+        self, subqueries: List[str], context: Optional[ContextSchema] = None
+    ) -> List[QueryResult]:
+        """Run the subgraph for every subquery concurrently.
+
+        Wall time is that of the slowest subquery instead of the sum. At most
+        `max_concurrency` subgraph runs are in flight, and results keep the input order.
+
+        Args:
+            subqueries: Reformulated subqueries of the user query.
+            context: Runtime context, inherited from the parent graph when omitted.
+
+        Returns:
+            One QueryResult per subquery, in input order.
+        """
+        if not subqueries:
+            return []
+        kwargs = {"context": context} if context is not None else {}
+        responses = self.subgraph.batch(
+            [{"subquery": subquery} for subquery in subqueries],
+            config={"max_concurrency": self.max_concurrency},
+            **kwargs,
+        )
+        return self._to_query_results(subqueries, responses)
+
+    async def arun_subqueries(
+        self, subqueries: List[str], context: Optional[ContextSchema] = None
+    ) -> List[QueryResult]:
+        """Async version of run_subqueries on the async subgraph."""
+        if not subqueries:
+            return []
+        kwargs = {"context": context} if context is not None else {}
+        responses = await self.async_subgraph.abatch(
+            [{"subquery": subquery} for subquery in subqueries],
+            config={"max_concurrency": self.max_concurrency},
+            **kwargs,
+        )
+        return self._to_query_results(subqueries, responses)
+
+    def retrieve_batch(self, subqueries: List[str], user_id: str) -> List[QueryResult]:
+        """Retrieve chunks and memories for several subqueries without the subgraph.
+
+        All subqueries are embedded in one encode call and searched in one Qdrant batch
+        request. Memory searches run concurrently with the vector search, at most
+        `max_concurrency` at a time like the subgraph fan-out of run_subqueries.
+
+        Args:
+            subqueries: Reformulated subqueries of the user query.
+            user_id: User whose memories are searched.
+
+        Returns:
+            One QueryResult per subquery, in input order.
+        """
+        if not subqueries:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(len(subqueries), self.max_concurrency)) as pool:
+            memory_futures = [
+                pool.submit(self.mem_zero.search_memory, subquery, user_id=user_id)
+                for subquery in subqueries
+            ]
+            embeddings = self.emb_generator.generate_embedding(subqueries)
+            search_results = self.qdrant_store.search_batch(
+                embeddings, top_k=self.retriever_config.top_k, query_texts=subqueries
+            )
+            memories = [future.result().get("results", []) for future in memory_futures]
+
+        return [
+            QueryResult(
+                subquery=subquery,
+                search_result=self._normalize_scored_points(points),
+                memories=subquery_memories,
+            )
+            for subquery, points, subquery_memories in zip(subqueries, search_results, memories)
+        ]
+
+    async def aretrieve_batch(self, subqueries: List[str], user_id: str) -> List[QueryResult]:
+        """Async version of retrieve_batch, searching through the async Qdrant client."""
+        if not subqueries:
+            return []
+
+        limit = asyncio.Semaphore(self.max_concurrency)
+
+        async def search_memory(subquery: str):
+            async with limit:
+                return await asyncio.to_thread(
+                    self.mem_zero.search_memory, subquery, user_id=user_id
+                )
+
+        memory_tasks = [search_memory(subquery) for subquery in subqueries]
+
+        async def search():
+            embeddings = await asyncio.to_thread(self.emb_generator.generate_embedding, subqueries)
+            return await self.qdrant_store.asearch_batch(
+                embeddings, top_k=self.retriever_config.top_k, query_texts=subqueries
+            )
+
+        search_results, *memories = await asyncio.gather(search(), *memory_tasks)
+        return [
+            QueryResult(
+                subquery=subquery,
+                search_result=self._normalize_scored_points(points),
+                memories=subquery_memories.get("results", []),
+            )
+            for subquery, points, subquery_memories in zip(subqueries, search_results, memories)
+        ]
+
+    def _build_subgraph(self, checkpointer: Union[BaseCheckpointSaver, bool, None] = False):
+        """Compile the retrieval subgraph.
+
+        Args:
+            checkpointer: False runs the subgraph without checkpoints, even when called from
+                a checkpointed parent graph. Its state lives for one turn and is returned to
+                the parent, so persisting every step only adds writes.
+        """
         subgraph_builder = StateGraph(QueryResult, context_schema=ContextSchema)
 
         # Add nodes
@@ -127,4 +301,21 @@ class RetrievalSubGraph:
         subgraph_builder.add_edge("memory_search", END)
 
         logger.info("Compiling subgraph")
-        return subgraph_builder.compile(checkpointer=self.checkpointer)
+        return subgraph_builder.compile(checkpointer=checkpointer)
+
+    def _build_async_subgraph(self):
+        """Same graph with async nodes, for use with ainvoke/astream on one event loop."""
+        subgraph_builder = StateGraph(QueryResult, context_schema=ContextSchema)
+
+        subgraph_builder.add_node("generate_embedding", self.agenerate_embedding)
+        subgraph_builder.add_node("vector_search", self.avector_search)
+        subgraph_builder.add_node("memory_search", self.amemory_search)
+
+        subgraph_builder.add_edge(START, "generate_embedding")
+        subgraph_builder.add_edge(START, "memory_search")
+        subgraph_builder.add_edge("generate_embedding", "vector_search")
+        subgraph_builder.add_edge("vector_search", END)
+        subgraph_builder.add_edge("memory_search", END)
+
+        logger.info("Compiling async subgraph")
+        return subgraph_builder.compile(checkpointer=False)
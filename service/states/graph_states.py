@@ -1,7 +1,8 @@
 import os
+import operator
 from pydantic import BaseModel, Field
 from dataclasses import dataclass
-from typing import List, Optional, Annotated
+from typing import Any, Dict, List, Optional, Annotated
 from langgraph.graph import add_messages
 from dotenv import load_dotenv
 
@@ -38,6 +39,8 @@ class FormatterState(BaseModel):
 
 class EmbeddingState(BaseModel):
     embedding: Optional[List[float]] = None
+    # Needed by vector_search for the BM25 half of hybrid queries
+    subquery: Optional[str] = None
 
 
 class QueryResult(BaseModel):
@@ -58,3 +61,6 @@ class OverallState(BaseModel):
     final_result: str = ""
     chat_summary: str = ""
     approved: Optional[bool] = None
+    # Per-turn counters (cache hit rates, ...), merged key by key across nodes. The first
+    # node of a turn replaces the dict with an Overwrite, so no key outlives its turn
+    metrics: Annotated[Dict[str, Any], operator.or_] = Field(default_factory=dict)
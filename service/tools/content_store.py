@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_shared_stores: Dict[str, "ChunkContentStore"] = {}
+_shared_lock = threading.Lock()
+
+
+class ChunkContentStore:
+    """Local SQLite store of chunk texts keyed by their content-addressed point ID.
+
+    With lean payloads, Qdrant only keeps the chunk metadata and the text lives here, so
+    search responses stay small and texts are read locally for the chunks that need them.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Open the store, creating the database if it does not exist.
+
+        Args:
+            path: Path of the SQLite database file. Defaults to CHUNK_CONTENT_DB.
+        """
+        path = path or os.getenv("CHUNK_CONTENT_DB", ".cache/chunk_content.db")
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS chunks (id TEXT PRIMARY KEY, content TEXT)")
+        self._db.commit()
+        logger.info(f"Chunk content store opened at {path}")
+
+    @classmethod
+    def shared(cls, path: Optional[str] = None) -> "ChunkContentStore":
+        """Return the process-wide store for a database path."""
+        path = path or os.getenv("CHUNK_CONTENT_DB", ".cache/chunk_content.db")
+        with _shared_lock:
+            if path not in _shared_stores:
+                _shared_stores[path] = cls(path)
+            return _shared_stores[path]
+
+    def put_many(self, point_ids: Sequence[str], contents: Sequence[str]):
+        """Store chunk texts. Point IDs are content-addressed, so existing rows are kept."""
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO chunks VALUES (?, ?)", zip(point_ids, contents)
+            )
+            self._db.commit()
+
+    def get_many(self, point_ids: Iterable[str], batch_size: int = 500) -> Dict[str, str]:
+        """Fetch the texts of several chunks. Unknown IDs are missing from the result."""
+        point_ids = [str(point_id) for point_id in point_ids]
+        contents = {}
+        with self._lock:
+            for i in range(0, len(point_ids), batch_size):
+                batch = point_ids[i : i + batch_size]
+                rows = self._db.execute(
+                    f"SELECT id, content FROM chunks WHERE id IN ({', '.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                contents.update(rows)
+        return contents
+
+    def delete_many(self, point_ids: List[str]):
+        with self._lock:
+            self._db.executemany("DELETE FROM chunks WHERE id = ?", ((i,) for i in point_ids))
+            self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            count, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0) FROM chunks"
+            ).fetchone()
+        return {"chunks": count, "content_bytes": size}
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# One cache per on-disk directory so that every EmbeddingGenerator in the process
+# shares the same memmap instead of racing on the same files.
+_shared_caches: Dict[Tuple[Optional[str], int], "EmbeddingCache"] = {}
+_shared_lock = threading.Lock()
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache with an in-process LRU tier and an on-disk tier.
+
+    Entries are keyed by (model key, normalization flag, sha256 of the text). The disk tier
+    stores vectors in a memory-mapped array of max_disk_entries rows with a key index next
+    to it. Once the disk tier is full, the oldest row is reused.
+
+    The key index is a JSON snapshot plus an append-only JSONL journal of the rows written
+    since, so persisting a batch costs as much as the batch. The journal is folded into the
+    snapshot once it holds more lines than the disk tier has rows.
+
+    A reused row is overwritten before its eviction reaches the journal, and memmap pages
+    can reach the disk at any time. Each row therefore also holds a tag of its key and a
+    checksum of its vector, both checked on every disk read, so an index entry left stale
+    by a crash reads as a miss instead of returning another text's vector.
+    """
+
+    MATRIX_FILE = "embeddings.rows"
+    INDEX_FILE = "index.json"
+    JOURNAL_FILE = "index.jsonl"
+    FORMAT = 2
+
+    def __init__(
+        self,
+        dimension: int,
+        cache_dir: Optional[str] = None,
+        max_memory_entries: int = 4096,
+        max_disk_entries: int = 200_000,
+    ):
+        """Initialize the cache.
+
+        Args:
+            dimension: Embedding dimension stored in each row.
+            cache_dir: Directory for the on-disk tier. If None, only the LRU tier is used.
+            max_memory_entries: Size cap of the in-process LRU tier.
+            max_disk_entries: Size cap (rows) of the on-disk tier.
+        """
+        self.dimension = dimension
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._disk_index: Dict[str, int] = {}
+        self._row_keys: List[Optional[str]] = []
+        self._next_row = 0
+        self._row_dtype = np.dtype(
+            [("tag", "<u8"), ("checksum", "<u4"), ("vector", "<f4", (dimension,))]
+        )
+        self._matrix: Optional[np.memmap] = None
+        # (key, row) assignments not yet appended to the journal
+        self._pending: List[Tuple[str, int]] = []
+        self._journal_lines = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self.stale_rows = 0
+
+        if self.cache_dir is not None:
+            self._open_disk_tier()
+
+    @classmethod
+    def shared(cls, dimension: int, cache_dir: Optional[str] = None, **kwargs) -> "EmbeddingCache":
+        """Return the process-wide cache for a directory, creating it on first use."""
+        key = (str(Path(cache_dir).resolve()) if cache_dir else None, dimension)
+        with _shared_lock:
+            if key not in _shared_caches:
+                _shared_caches[key] = cls(dimension=dimension, cache_dir=cache_dir, **kwargs)
+            return _shared_caches[key]
+
+    @staticmethod
+    def make_key(model_key: str, normalize: bool, text: str) -> str:
+        """Build the cache key for a text embedded by a given model configuration."""
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model_key}|{int(normalize)}|{text_hash}"
+
+    @staticmethod
+    def _tag(key: str) -> int:
+        """64-bit tag of a key, stored in its disk row. Never 0, which marks a row in rewrite."""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def _open_disk_tier(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        matrix_path = self.cache_dir / self.MATRIX_FILE
+        index_path = self.cache_dir / self.INDEX_FILE
+
+        if matrix_path.exists() and index_path.exists():
+            with open(index_path, "r") as f:
+                index = json.load(f)
+            if (
+                index.get("format") == self.FORMAT
+                and index.get("dimension") == self.dimension
+                and index.get("capacity") == self.max_disk_entries
+            ):
+                self._matrix = np.memmap(
+                    matrix_path,
+                    dtype=self._row_dtype,
+                    mode="r+",
+                    shape=(self.max_disk_entries,),
+                )
+                self._disk_index = index["keys"]
+                self._next_row = index["next_row"]
+                self._row_keys = [None] * self.max_disk_entries
+                for key, row in self._disk_index.items():
+                    self._row_keys[row] = key
+                self._replay_journal()
+                logger.info(
+                    f"Loaded embedding cache from {self.cache_dir} "
+                    f"with {len(self._disk_index)} entries"
+                )
+                return
+            logger.warning(
+                f"Embedding cache at {self.cache_dir} has a different layout, recreating it"
+            )
+
+        self._matrix = np.memmap(
+            matrix_path,
+            dtype=self._row_dtype,
+            mode="w+",
+            shape=(self.max_disk_entries,),
+        )
+        self._row_keys = [None] * self.max_disk_entries
+        self._write_snapshot()
+        logger.info(f"Created embedding cache at {self.cache_dir}")
+
+    def _assign(self, key: str, row: int):
+        """Point a disk row at a key, evicting the key previously stored there."""
+        old_key = self._row_keys[row]
+        if old_key is not None:
+            del self._disk_index[old_key]
+        self._row_keys[row] = key
+        self._disk_index[key] = row
+        self._next_row = (row + 1) % self.max_disk_entries
+
+    def _replay_journal(self):
+        journal_path = self.cache_dir / self.JOURNAL_FILE
+        if not journal_path.exists():
+            return
+        with open(journal_path, "r") as f:
+            for line in f:
+                try:
+                    key, row = json.loads(line)
+                except ValueError:
+                    # Line cut short by a crash mid-append, its row is rewritten later
+                    continue
+                self._assign(key, row)
+                self._journal_lines += 1
+
+    def _write_snapshot(self):
+        """Write the full key index and start an empty journal."""
+        index_path = self.cache_dir / self.INDEX_FILE
+        tmp_path = index_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "format": self.FORMAT,
+                    "dimension": self.dimension,
+                    "capacity": self.max_disk_entries,
+                    "next_row": self._next_row,
+                    "keys": self._disk_index,
+                },
+                f,
+            )
+        tmp_path.replace(index_path)
+        (self.cache_dir / self.JOURNAL_FILE).unlink(missing_ok=True)
+        self._journal_lines = 0
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up a single key, promoting disk hits into the LRU tier."""
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+            row = self._disk_index.get(key)
+            if row is not None:
+                record = self._matrix[row]
+                vector = np.array(record["vector"], dtype=np.float32)
+                if int(record["tag"]) == self._tag(key) and int(record["checksum"]) == zlib.crc32(
+                    vector.tobytes()
+                ):
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector
+                # The row was reused (or torn) before a crash, drop the stale entry
+                del self._disk_index[key]
+                self._row_keys[row] = None
+                self.stale_rows += 1
+
+            self.misses += 1
+            return None
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up several keys at once. Missing keys are returned as None."""
+        return [self.get(key) for key in keys]
+
+    def put(self, key: str, vector: np.ndarray):
+        """Store a vector in both tiers. Call flush() to persist the key index."""
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._remember(key, vector)
+            if self._matrix is None or key in self._disk_index:
+                return
+
+            row = self._next_row
+            if self._row_keys[row] is not None:
+                self.disk_evictions += 1
+            record = self._matrix[row]
+            # Invalidate the row before rewriting it, its old key may still be on disk
+            record["tag"] = 0
+            record["vector"] = vector
+            record["checksum"] = zlib.crc32(vector.tobytes())
+            record["tag"] = self._tag(key)
+            self._assign(key, row)
+            self._pending.append((key, row))
+
+    def put_many(self, keys: Sequence[str], vectors: Sequence[np.ndarray]):
+        """Store several vectors and persist the disk tier once."""
+        for key, vector in zip(keys, vectors):
+            self.put(key, vector)
+        self.flush()
+
+    def flush(self):
+        """Persist the memmap and append the rows written since the last flush to the journal."""
+        with self._lock:
+            if self._matrix is None or not self._pending:
+                return
+            # Vectors reach the disk before the journal lines that point at them
+            self._matrix.flush()
+            with open(self.cache_dir / self.JOURNAL_FILE, "a") as f:
+                f.writelines(json.dumps([key, row]) + "\n" for key, row in self._pending)
+            self._journal_lines += len(self._pending)
+            self._pending = []
+            if self._journal_lines > self.max_disk_entries:
+                self._write_snapshot()
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss/eviction counters and current tier sizes."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+                "stale_rows": self.stale_rows,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_index),
+            }
@@ -1,6 +1,14 @@
+import asyncio
+import os
+from pathlib import Path
 from typing import List, Optional
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
+from tools.embedding_cache import EmbeddingCache
+from tools.embedding_scheduler import EmbeddingScheduler
+from tools.model_registry import get_or_load, get_sentence_transformer
+from utils.batching import length_buckets
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -9,19 +17,227 @@ logger = get_logger(__name__)
 class EmbeddingGenerator:
     """A class to generate text embeddings using Sentence Transformers."""
 
-    def __init__(self, model_name: str = "Qwen/Qwen3-Embedding-0.6B", device: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: str = "Qwen/Qwen3-Embedding-0.6B",
+        device: Optional[str] = None,
+        backend: Optional[str] = None,
+        onnx_quantize: Optional[bool] = None,
+        onnx_quantization_config: Optional[str] = None,
+        onnx_num_threads: Optional[int] = None,
+        onnx_dir: Optional[str] = None,
+        use_cache: bool = True,
+        cache_dir: Optional[str] = None,
+        cache_max_memory_entries: Optional[int] = None,
+        cache_max_disk_entries: Optional[int] = None,
+        use_scheduler: Optional[bool] = None,
+        scheduler_max_wait_ms: Optional[float] = None,
+        scheduler_max_batch_size: Optional[int] = None,
+    ):
         """Initialize the embedding generator with a Sentence Transformers model.
 
         Args:
             model_name: Name of the Sentence Transformers model to use.
             device: Device to run the model on ('cuda', 'mps', 'cpu'). If None, auto-detects.
+            backend: 'torch' for the PyTorch model or 'onnx' for ONNX Runtime on CPU.
+                Defaults to EMBEDDING_BACKEND.
+            onnx_quantize: Whether to use a dynamically int8-quantized ONNX model.
+                Defaults to EMBEDDING_ONNX_QUANTIZE.
+            onnx_quantization_config: Target ISA of the quantized model
+                ('arm64', 'avx2', 'avx512', 'avx512_vnni'). Defaults to EMBEDDING_ONNX_QUANT_CONFIG.
+            onnx_num_threads: Intra-op thread count of the ONNX Runtime session.
+                Defaults to EMBEDDING_ONNX_THREADS, 0 leaves it to ONNX Runtime.
+            onnx_dir: Directory where exported ONNX models are kept. Defaults to EMBEDDING_ONNX_DIR.
+            use_cache: Whether to reuse embeddings of previously seen texts.
+            cache_dir: Directory of the on-disk cache tier. Defaults to EMBEDDING_CACHE_DIR;
+                if that is set to an empty string, only the LRU tier is used.
+            cache_max_memory_entries: Size cap of the in-process LRU tier.
+                Defaults to EMBEDDING_CACHE_MEMORY_ENTRIES.
+            cache_max_disk_entries: Size cap of the on-disk tier.
+                Defaults to EMBEDDING_CACHE_DISK_ENTRIES.
+            use_scheduler: Whether embed_query merges concurrent calls into shared batches.
+                Each query can then wait up to scheduler_max_wait_ms for others, which only
+                pays off with many concurrent sessions. Defaults to EMBEDDING_MICRO_BATCH
+                (off).
+            scheduler_max_wait_ms: Time the scheduler waits for more queries before encoding.
+                Defaults to EMBEDDING_BATCH_MAX_WAIT_MS.
+            scheduler_max_batch_size: Maximum number of queries encoded together.
+                Defaults to EMBEDDING_BATCH_MAX_SIZE.
         """
-        logger.info(f"Loading Sentence Transformer model: {model_name}")
-        self.model = SentenceTransformer(model_name, device=device)
+        if backend is None:
+            backend = os.getenv("EMBEDDING_BACKEND", "torch")
+        if onnx_quantize is None:
+            onnx_quantize = os.getenv("EMBEDDING_ONNX_QUANTIZE", "false").lower() == "true"
+        if onnx_quantization_config is None:
+            onnx_quantization_config = os.getenv("EMBEDDING_ONNX_QUANT_CONFIG", "avx512_vnni")
+        if onnx_num_threads is None:
+            onnx_num_threads = int(os.getenv("EMBEDDING_ONNX_THREADS", "0")) or None
+        if onnx_dir is None:
+            onnx_dir = os.getenv("EMBEDDING_ONNX_DIR", ".cache/onnx")
+
+        logger.info(f"Loading Sentence Transformer model: {model_name} ({backend} backend)")
+        # Models come from the process-wide registry so every consumer shares one copy
+        if backend == "torch":
+            self.model = get_sentence_transformer(model_name, device=device)
+        elif backend == "onnx":
+            # The model file and session options are fixed at load time, so they are all part
+            # of the registry key
+            self.model = get_or_load(
+                (
+                    "sentence-transformer-onnx",
+                    model_name,
+                    str(Path(onnx_dir).resolve()),
+                    onnx_quantize,
+                    onnx_quantization_config,
+                    onnx_num_threads,
+                ),
+                lambda: self._load_onnx_model(
+                    model_name, onnx_dir, onnx_quantize, onnx_quantization_config, onnx_num_threads
+                ),
+            )
+        else:
+            raise ValueError(f"Unsupported embedding backend: {backend}")
         self.model_name = model_name
+        self.backend = backend
+        # Cached vectors are only reusable for the exact same weights and runtime
+        self.model_key = model_name if backend == "torch" else f"{model_name}@{backend}"
+        if backend == "onnx" and onnx_quantize:
+            self.model_key += f"-qint8-{onnx_quantization_config}"
+        self.normalize_embeddings = True
         self.embedding_dimension = self.model.get_sentence_embedding_dimension()
         logger.info(f"Model loaded with embedding dimension: {self.embedding_dimension}")
 
+        self.cache = None
+        if use_cache:
+            if cache_dir is None:
+                cache_dir = os.getenv("EMBEDDING_CACHE_DIR", ".cache/embeddings") or None
+            if cache_max_memory_entries is None:
+                cache_max_memory_entries = int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "4096"))
+            if cache_max_disk_entries is None:
+                cache_max_disk_entries = int(os.getenv("EMBEDDING_CACHE_DISK_ENTRIES", "200000"))
+            self.cache = EmbeddingCache.shared(
+                dimension=self.embedding_dimension,
+                cache_dir=cache_dir,
+                max_memory_entries=cache_max_memory_entries,
+                max_disk_entries=cache_max_disk_entries,
+            )
+
+        if use_scheduler is None:
+            use_scheduler = os.getenv("EMBEDDING_MICRO_BATCH", "false").lower() == "true"
+        self.scheduler = None
+        if use_scheduler:
+            if scheduler_max_wait_ms is None:
+                scheduler_max_wait_ms = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+            if scheduler_max_batch_size is None:
+                scheduler_max_batch_size = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+            self.scheduler = EmbeddingScheduler.shared(
+                key=self.model_key,
+                encode_fn=self._encode_cached,
+                max_wait_ms=scheduler_max_wait_ms,
+                max_batch_size=scheduler_max_batch_size,
+            )
+
+    @staticmethod
+    def _load_onnx_model(
+        model_name: str,
+        onnx_dir: str,
+        quantize: bool,
+        quantization_config: str,
+        num_threads: Optional[int],
+    ) -> SentenceTransformer:
+        """Export the model to ONNX once, optionally quantize it, and load it on ONNX Runtime.
+
+        Args:
+            model_name: Name of the Sentence Transformers model to use.
+            onnx_dir: Directory where exported ONNX models are kept.
+            quantize: Whether to load the dynamically int8-quantized model.
+            quantization_config: Target ISA of the quantized model.
+            num_threads: Intra-op thread count of the ONNX Runtime session.
+
+        Returns:
+            A SentenceTransformer running on the ONNX backend.
+        """
+        try:
+            import onnxruntime as ort
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+        except ImportError as e:
+            raise ImportError(
+                "The ONNX backend requires `pip install sentence-transformers[onnx]`"
+            ) from e
+
+        export_dir = Path(onnx_dir) / model_name.replace("/", "__")
+        file_name = "onnx/model.onnx"
+        if not (export_dir / file_name).exists():
+            logger.info(f"Exporting {model_name} to ONNX at {export_dir}")
+            exported = SentenceTransformer(model_name, device="cpu", backend="onnx")
+            exported.save_pretrained(str(export_dir))
+
+        if quantize:
+            file_name = f"onnx/model_qint8_{quantization_config}.onnx"
+            if not (export_dir / file_name).exists():
+                logger.info(f"Quantizing ONNX model to int8 ({quantization_config})")
+                export_dynamic_quantized_onnx_model(
+                    SentenceTransformer(str(export_dir), device="cpu", backend="onnx"),
+                    quantization_config=quantization_config,
+                    model_name_or_path=str(export_dir),
+                )
+
+        session_options = ort.SessionOptions()
+        if num_threads:
+            session_options.intra_op_num_threads = num_threads
+
+        return SentenceTransformer(
+            str(export_dir),
+            device="cpu",
+            backend="onnx",
+            model_kwargs={
+                "file_name": file_name,
+                "provider": "CPUExecutionProvider",
+                "session_options": session_options,
+            },
+        )
+
+    def _encode(self, text_list: list[str], batch_size: int = 32) -> np.ndarray:
+        """Run the model forward pass without consulting the cache.
+
+        Args:
+            text_list: Texts to encode.
+            batch_size: Texts per forward pass inside the model's encode().
+        """
+        return self.model.encode(
+            text_list,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize_embeddings,
+            show_progress_bar=False,
+        )
+
+    def _cache_keys(self, text_list: list[str]) -> list[str]:
+        return [
+            EmbeddingCache.make_key(self.model_key, self.normalize_embeddings, text)
+            for text in text_list
+        ]
+
+    def _encode_cached(self, text_list: list[str]) -> np.ndarray:
+        """Encode texts, running the model only for texts missing from the cache."""
+        if self.cache is None:
+            return self._encode(text_list)
+
+        keys = self._cache_keys(text_list)
+        cached = self.cache.get_many(keys)
+        miss_idx = [i for i, vector in enumerate(cached) if vector is None]
+
+        if miss_idx:
+            # Duplicate texts inside one call only need a single forward pass
+            unique_texts = list(dict.fromkeys(text_list[i] for i in miss_idx))
+            encoded = self._encode(unique_texts)
+            by_text = dict(zip(unique_texts, encoded))
+            self.cache.put_many(self._cache_keys(unique_texts), encoded)
+            for i in miss_idx:
+                cached[i] = by_text[text_list[i]]
+
+        return np.vstack(cached).astype(np.float32, copy=False)
+
     def generate_embedding(self, text_list: list[str]) -> np.ndarray:
         """Generate embedding for a single text.
 
@@ -32,44 +248,144 @@ class EmbeddingGenerator:
             A numpy array containing the text embedding.
         """
         try:
-            return self.model.encode(
-                text_list, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False
-            )
+            if isinstance(text_list, str):
+                return self._encode_cached([text_list])[0]
+            return self._encode_cached(list(text_list))
+        except Exception as e:
+            logger.error(f"Error generating embedding: {str(e)}")
+            raise
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Generate embedding for a single query, batched with concurrent callers if enabled.
+
+        Args:
+            text: Input query text.
+
+        Returns:
+            A numpy array containing the query embedding.
+        """
+        if self.scheduler is None:
+            return self.generate_embedding(text)
+        try:
+            return self.scheduler.embed(text)
         except Exception as e:
             logger.error(f"Error generating embedding: {str(e)}")
             raise
 
-    def generate_embeddings_batch(self, documents, batch_size: int = 32) -> List[List[float]]:
+    async def aembed_query(self, text: str) -> np.ndarray:
+        """Async version of embed_query, awaiting the scheduler instead of blocking.
+
+        Args:
+            text: Input query text.
+
+        Returns:
+            A numpy array containing the query embedding.
+        """
+        if self.scheduler is None:
+            return await asyncio.to_thread(self.generate_embedding, text)
+        return await asyncio.wrap_future(self.scheduler.submit(text))
+
+    def _tokenize(self, text_list: list[str]) -> List[List[int]]:
+        """Tokenize texts as encode() would, truncated to the model limit and not padded."""
+        encoded = self.model.tokenizer(
+            [text.strip() for text in text_list],
+            add_special_tokens=True,
+            truncation=True,
+            max_length=self.model.max_seq_length,
+            return_attention_mask=False,
+        )
+        return encoded["input_ids"]
+
+    @torch.no_grad()
+    def _encode_token_ids(self, token_ids: List[List[int]]) -> np.ndarray:
+        """Pad already tokenized texts into one batch and run the model forward pass on it."""
+        features = self.model.tokenizer.pad(
+            {"input_ids": token_ids}, padding=True, return_tensors="pt"
+        )
+        features = {key: value.to(self.model.device) for key, value in features.items()}
+        embeddings = self.model(features)["sentence_embedding"]
+        if self.normalize_embeddings:
+            embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+        return embeddings.float().cpu().numpy()
+
+    def generate_embeddings_batch(
+        self,
+        documents,
+        batch_size: int = 32,
+        bucket_by_length: Optional[bool] = None,
+        max_tokens_per_batch: int = 16384,
+    ) -> List[List[float]]:
         """Generate embeddings for a batch of documents.
 
         Args:
             documents: List of document objects with 'page_content' attribute.
             batch_size: Number of documents to process in each batch.
+            bucket_by_length: Group documents of similar token length and size each batch
+                from `max_tokens_per_batch` instead of `batch_size`. The texts are tokenized
+                once and the token ids are reused for the forward pass.
+                Defaults to EMBEDDING_BUCKET_BY_LENGTH.
+            max_tokens_per_batch: Budget of padded tokens per batch when bucketing.
 
         Returns:
-            List of embeddings.
+            List of embeddings, in the same order as `documents`.
         """
         if not documents:
             logger.warning("No documents provided for embedding generation")
             return []
+        if bucket_by_length is None:
+            bucket_by_length = os.getenv("EMBEDDING_BUCKET_BY_LENGTH", "true").lower() == "true"
 
         try:
             # Extract text content from documents
             texts = [doc.page_content for doc in documents]
+            results = [None] * len(texts)
 
-            logger.info(
-                f"Generating embeddings for {len(documents)} documents in batches of {batch_size}"
-            )
+            # Re-ingested chunks are served from the cache, only new texts are encoded
+            pending = list(range(len(texts)))
+            if self.cache is not None:
+                cached = self.cache.get_many(self._cache_keys(texts))
+                pending = []
+                for i, vector in enumerate(cached):
+                    if vector is None:
+                        pending.append(i)
+                    else:
+                        results[i] = vector
+                logger.info(f"Embedding cache served {len(texts) - len(pending)} documents")
+
+            token_ids = None
+            if bucket_by_length and pending:
+                token_ids = dict(zip(pending, self._tokenize([texts[i] for i in pending])))
+                batches = [
+                    [pending[i] for i in bucket]
+                    for bucket in length_buckets(
+                        [len(token_ids[i]) for i in pending], max_tokens_per_batch
+                    )
+                ]
+                logger.info(
+                    f"Generating embeddings for {len(pending)} documents in {len(batches)} "
+                    f"length buckets of at most {max_tokens_per_batch} tokens"
+                )
+            else:
+                batches = [pending[i : i + batch_size] for i in range(0, len(pending), batch_size)]
+                logger.info(
+                    f"Generating embeddings for {len(pending)} documents in batches of {batch_size}"
+                )
 
-            # Combine documents with their embeddings and metadata
-            results = []
-            for i in range(0, len(texts), batch_size):
-                logger.info(f"Processing batch {i // batch_size + 1}/{len(texts) // batch_size}")
-                batch_texts = texts[i : i + batch_size]
-                batch_embeddings = self.generate_embedding(batch_texts)
-                results.extend(batch_embeddings)
+            for batch_num, batch_idx in enumerate(batches, start=1):
+                logger.info(f"Processing batch {batch_num}/{len(batches)}")
+                batch_texts = [texts[j] for j in batch_idx]
+                if token_ids is not None:
+                    batch_embeddings = self._encode_token_ids([token_ids[j] for j in batch_idx])
+                else:
+                    batch_embeddings = self._encode(batch_texts, batch_size=len(batch_texts))
+                if self.cache is not None:
+                    self.cache.put_many(self._cache_keys(batch_texts), batch_embeddings)
+                for j, embedding in zip(batch_idx, batch_embeddings):
+                    results[j] = embedding
             assert len(results) == len(documents)
             logger.info(f"Completed embedding generation for {len(results)} documents")
+            if self.cache is not None:
+                logger.info(f"Embedding cache stats: {self.cache.stats()}")
             return results
 
         except Exception as e:
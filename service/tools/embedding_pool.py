@@ -0,0 +1,226 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional
+import numpy as np
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _worker_main(worker_id, model_name, backend, threads_per_worker, tasks, results):
+    """Worker loop: load the model once, then embed batches into shared memory."""
+    # Thread pools size themselves from these on import, so set them before torch loads
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_worker)
+    os.environ["MKL_NUM_THREADS"] = str(threads_per_worker)
+    import torch
+    from tools.embedding_generator import EmbeddingGenerator
+
+    torch.set_num_threads(threads_per_worker)
+    generator = EmbeddingGenerator(
+        model_name,
+        device="cpu",
+        backend=backend,
+        onnx_num_threads=threads_per_worker,
+        use_cache=False,
+        use_scheduler=False,
+    )
+    results.put(("ready", worker_id, generator.dimension))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        call_id, shm_name, total, start, texts = task
+        try:
+            shm = SharedMemory(name=shm_name)
+            try:
+                out = np.ndarray((total, generator.dimension), dtype=np.float32, buffer=shm.buf)
+                out[start : start + len(texts)] = generator.generate_embedding(texts)
+                del out
+            finally:
+                shm.close()
+            results.put(("done", worker_id, call_id, start, len(texts)))
+        except Exception as e:
+            results.put(("error", worker_id, call_id, f"{type(e).__name__}: {e}"))
+
+
+class EmbeddingProcessPool:
+    """Pool of worker processes that each hold one embedding model for bulk ingestion.
+
+    Chunk batches are put on a shared task queue. Workers write their vectors straight into
+    a shared-memory float32 matrix, so only batch offsets travel back through the result
+    queue instead of pickled embedding lists. Every task and result carries the id of the
+    embed_texts call it belongs to, so results left over from a failed call are never counted
+    by the next one.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "Qwen/Qwen3-Embedding-0.6B",
+        num_workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        backend: Optional[str] = None,
+        batch_size: int = 32,
+        startup_timeout: float = 600,
+    ):
+        """Start the worker processes and wait until every model is loaded.
+
+        Args:
+            model_name: Name of the Sentence Transformers model to use.
+            num_workers: Number of worker processes. Defaults to EMBEDDING_POOL_WORKERS, or
+                cores / threads_per_worker if that is unset.
+            threads_per_worker: Torch / ONNX Runtime threads used by each worker.
+                Defaults to EMBEDDING_POOL_THREADS.
+            backend: Embedding backend of the workers ('torch' or 'onnx').
+                Defaults to EMBEDDING_BACKEND.
+            batch_size: Number of chunks per task.
+            startup_timeout: Seconds to wait for the workers to load their model.
+        """
+        if num_workers is None:
+            num_workers = int(os.getenv("EMBEDDING_POOL_WORKERS", "0")) or None
+        if threads_per_worker is None:
+            threads_per_worker = int(os.getenv("EMBEDDING_POOL_THREADS", "1"))
+        if backend is None:
+            backend = os.getenv("EMBEDDING_BACKEND", "torch")
+
+        self.model_name = model_name
+        self.threads_per_worker = threads_per_worker
+        self.num_workers = num_workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.batch_size = batch_size
+        self._call_ids = itertools.count()
+
+        ctx = mp.get_context("spawn")
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._workers = [
+            ctx.Process(
+                target=_worker_main,
+                args=(i, model_name, backend, threads_per_worker, self._tasks, self._results),
+                daemon=True,
+            )
+            for i in range(self.num_workers)
+        ]
+        logger.info(
+            f"Starting {self.num_workers} embedding workers with "
+            f"{threads_per_worker} threads each"
+        )
+        for worker in self._workers:
+            worker.start()
+
+        self.dimension = None
+        deadline = time.monotonic() + startup_timeout
+        ready = 0
+        while ready < self.num_workers:
+            try:
+                _, worker_id, dimension = self._results.get(timeout=5)
+            except queue.Empty:
+                if not all(worker.is_alive() for worker in self._workers):
+                    self.close()
+                    raise RuntimeError("An embedding worker exited while loading its model")
+                if time.monotonic() > deadline:
+                    self.close()
+                    raise TimeoutError(
+                        f"Embedding workers not ready after {startup_timeout} seconds"
+                    )
+                continue
+            self.dimension = dimension
+            ready += 1
+            logger.info(f"Embedding worker {worker_id} ready")
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Embed texts across the workers.
+
+        Args:
+            texts: Texts to embed.
+
+        Returns:
+            A float32 array of shape [len(texts), dimension] in input order.
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        total = len(texts)
+        call_id = next(self._call_ids)
+        # Texts of similar length share a task so each forward pass pads little. Character
+        # length stands in for token length, which would need a tokenizer in this process.
+        order = sorted(range(total), key=lambda i: len(texts[i]))
+        texts = [texts[i] for i in order]
+        shm = SharedMemory(create=True, size=total * self.dimension * 4)
+        try:
+            out = np.ndarray((total, self.dimension), dtype=np.float32, buffer=shm.buf)
+            num_tasks = 0
+            for start in range(0, total, self.batch_size):
+                self._tasks.put(
+                    (call_id, shm.name, total, start, texts[start : start + self.batch_size])
+                )
+                num_tasks += 1
+
+            # Wait for every task of this call, even after an error, so that no worker still
+            # writes into the shared memory once it is unlinked
+            finished = 0
+            error = None
+            while finished < num_tasks:
+                try:
+                    message = self._results.get(timeout=5)
+                except queue.Empty:
+                    if not all(worker.is_alive() for worker in self._workers):
+                        raise RuntimeError("An embedding worker exited unexpectedly")
+                    continue
+                if message[2] != call_id:
+                    # Left over from an earlier call that ended with a dead worker
+                    continue
+                finished += 1
+                if message[0] == "error":
+                    if error is None:
+                        error = f"Embedding worker {message[1]} failed: {message[3]}"
+                    continue
+                if finished % 10 == 0 or finished == num_tasks:
+                    logger.info(f"Embedded {finished}/{num_tasks} batches")
+
+            if error is not None:
+                raise RuntimeError(error)
+            embeddings = np.empty_like(out)
+            embeddings[order] = out
+            del out
+            return embeddings
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def embed_documents(self, documents) -> np.ndarray:
+        """Embed documents with a 'page_content' attribute."""
+        return self.embed_texts([doc.page_content for doc in documents])
+
+    def ingest(self, documents, vector_store) -> int:
+        """Embed documents across the workers and add them to the vector store.
+
+        Args:
+            documents: List of document chunks.
+            vector_store: QdrantVectorStore receiving the chunks.
+
+        Returns:
+            Number of documents ingested.
+        """
+        embeddings = self.embed_documents(documents)
+        vector_store.add_documents_bulk(documents, embeddings)
+        return len(documents)
+
+    def close(self):
+        """Stop the worker processes."""
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+        logger.info("Embedding workers stopped")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Schedulers are shared per model and settings so that every Streamlit session feeds the
+# same queue
+_shared_schedulers: Dict[Tuple[str, float, int], "EmbeddingScheduler"] = {}
+_shared_lock = threading.Lock()
+
+
+class EmbeddingScheduler:
+    """Micro-batching scheduler that merges concurrent embedding requests.
+
+    Callers submit one text at a time and receive a Future. A background worker waits for
+    the first request, keeps collecting requests for up to `max_wait_ms` or until
+    `max_batch_size` texts are queued, then runs a single encode call for the whole batch
+    and resolves each caller's future with its own row.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_wait_ms: float = 5.0,
+        max_batch_size: int = 32,
+        name: str = "embedding-scheduler",
+    ):
+        """Initialize the scheduler and start its worker thread.
+
+        Args:
+            encode_fn: Function encoding a list of texts into a [n, dim] array.
+            max_wait_ms: Maximum time to wait for more requests after the first one.
+            max_batch_size: Maximum number of texts encoded in one call.
+            name: Name of the worker thread.
+        """
+        self.encode_fn = encode_fn
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._stopped = threading.Event()
+
+        self.batches = 0
+        self.requests = 0
+
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+        logger.info(
+            f"Embedding scheduler started with max_wait_ms={max_wait_ms}, "
+            f"max_batch_size={max_batch_size}"
+        )
+
+    @classmethod
+    def shared(
+        cls,
+        key: str,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_wait_ms: float = 5.0,
+        max_batch_size: int = 32,
+    ):
+        """Return the process-wide scheduler for a key and settings, creating it on first use.
+
+        Callers asking for other max_wait_ms / max_batch_size values get their own scheduler
+        instead of silently sharing one with different settings.
+        """
+        shared_key = (key, max_wait_ms, max_batch_size)
+        with _shared_lock:
+            scheduler = _shared_schedulers.get(shared_key)
+            if scheduler is None or scheduler._stopped.is_set():
+                scheduler = cls(
+                    encode_fn,
+                    max_wait_ms=max_wait_ms,
+                    max_batch_size=max_batch_size,
+                    name=f"embedding-scheduler-{key}",
+                )
+                _shared_schedulers[shared_key] = scheduler
+            return scheduler
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for embedding and return a future resolving to its vector."""
+        if self._stopped.is_set():
+            raise RuntimeError("Embedding scheduler is stopped")
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str, timeout: Optional[float] = None) -> np.ndarray:
+        """Embed a single text through the scheduler and wait for the result."""
+        return self.submit(text).result(timeout=timeout)
+
+    def _collect_batch(self) -> List[Tuple[str, Future]]:
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            batch = [
+                (text, future) for text, future in batch if future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+
+            try:
+                embeddings = self.encode_fn([text for text, _ in batch])
+            except Exception as e:
+                logger.error(f"Error in batched embedding: {str(e)}", exc_info=True)
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(batch)
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+    def stats(self) -> Dict[str, float]:
+        """Return the number of encode calls and the average batch size."""
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
+
+    def stop(self):
+        """Stop the worker thread and fail any requests still queued."""
+        self._stopped.set()
+        self._worker.join(timeout=1)
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("Embedding scheduler is stopped"))
@@ -0,0 +1,393 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from tools.vector_store import QdrantVectorStore, SearchFilter
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ScoredChunk:
+    """Search hit with the same attributes as Qdrant's ScoredPoint."""
+
+    id: str
+    score: float
+    payload: Dict[str, Any]
+
+
+class LocalVectorStore:
+    """Embedded vector store with the same interface as QdrantVectorStore, no server needed.
+
+    Vectors live in a memory-mapped float32 file, payloads in a SQLite sidecar and the
+    counters in meta.json, so a store reopens without re-embedding anything. Queries are
+    answered with a blocked matrix product and `argpartition`, or with an HNSW index when
+    `index="hnsw"` and hnswlib is installed.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        vector_size: int = 1024,
+        distance: str = "Cosine",
+        data_dir: Optional[str] = None,
+        index: Optional[str] = None,
+        hnsw_m: int = 16,
+        hnsw_ef_construct: int = 200,
+        hnsw_ef: int = 64,
+        search_block_size: int = 65536,
+    ):
+        """Open the store, creating its files if they do not exist.
+
+        Args:
+            collection_name: Name of the collection, used as directory name
+            vector_size: Dimension of the vectors
+            distance: 'Cosine' (vectors are normalized on insert) or 'Dot'
+            data_dir: Directory holding one sub-directory per collection, defaults to
+                LOCAL_VECTOR_STORE_DIR
+            index: 'exact' for brute-force NumPy search or 'hnsw' for an hnswlib index,
+                defaults to LOCAL_VECTOR_STORE_INDEX
+            hnsw_m: Edges per node of the HNSW graph
+            hnsw_ef_construct: Candidate list size while building the graph
+            hnsw_ef: Candidate list size at search time
+            search_block_size: Vectors scored per matrix product in exact search
+        """
+        if data_dir is None:
+            data_dir = os.getenv("LOCAL_VECTOR_STORE_DIR", ".cache/vector_store")
+        if index is None:
+            index = os.getenv("LOCAL_VECTOR_STORE_INDEX", "exact")
+
+        if distance not in ("Cosine", "Dot"):
+            raise ValueError(f"Unsupported distance for the local vector store: {distance}")
+        if index not in ("exact", "hnsw"):
+            raise ValueError(f"Unsupported local index: {index}")
+
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.distance = distance
+        self.index = index
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.hnsw_ef = hnsw_ef
+        self.search_block_size = search_block_size
+        # Same attribute as QdrantVectorStore, sparse vectors are not supported here
+        self.hybrid = False
+
+        self._dir = Path(data_dir) / collection_name
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+
+        self._meta = {"count": 0, "capacity": 1024, "dim": vector_size, "version": "0"}
+        meta_path = self._dir / "meta.json"
+        if meta_path.exists():
+            self._meta = json.loads(meta_path.read_text())
+            if self._meta["dim"] != vector_size:
+                raise ValueError(
+                    f"Collection {collection_name} stores {self._meta['dim']}-d vectors, "
+                    f"not {vector_size}-d"
+                )
+        self._open_vectors(self._meta["capacity"])
+
+        self._db = sqlite3.connect(str(self._dir / "payloads.db"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS points "
+            "(row INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, payload TEXT NOT NULL)"
+        )
+        self._db.commit()
+        self._rows = {
+            point_id: row for point_id, row in self._db.execute("SELECT id, row FROM points")
+        }
+
+        self._hnsw = None
+        if index == "hnsw":
+            self._open_hnsw()
+
+        logger.info(
+            f"Local vector store {collection_name} opened at {self._dir} with "
+            f"{self._meta['count']} vectors ({index} search)"
+        )
+
+    def _open_vectors(self, capacity: int):
+        path = self._dir / "vectors.f32"
+        size = capacity * self.vector_size * 4
+        path.touch(exist_ok=True)
+        if path.stat().st_size < size:
+            with open(path, "r+b") as f:
+                f.truncate(size)
+        self._vectors = np.memmap(
+            path, dtype=np.float32, mode="r+", shape=(capacity, self.vector_size)
+        )
+        self._meta["capacity"] = capacity
+
+    def _open_hnsw(self):
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError("The hnsw local index requires `pip install hnswlib`") from e
+
+        self._hnsw = hnswlib.Index(space="ip", dim=self.vector_size)
+        index_path = self._dir / "index.hnsw"
+        if index_path.exists():
+            self._hnsw.load_index(str(index_path), max_elements=self._meta["capacity"])
+        else:
+            self._hnsw.init_index(
+                max_elements=self._meta["capacity"],
+                ef_construction=self.hnsw_ef_construct,
+                M=self.hnsw_m,
+            )
+            count = self._meta["count"]
+            if count:
+                self._hnsw.add_items(self._vectors[:count], np.arange(count))
+        self._hnsw.set_ef(self.hnsw_ef)
+
+    def _ensure_capacity(self, needed: int):
+        capacity = self._meta["capacity"]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._vectors.flush()
+        del self._vectors
+        self._open_vectors(capacity)
+        if self._hnsw is not None:
+            self._hnsw.resize_index(capacity)
+
+    def _prepare(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if self.distance == "Cosine":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.maximum(norms, 1e-12)
+        return vectors
+
+    chunk_id = staticmethod(QdrantVectorStore.chunk_id)
+
+    def add_documents(self, documents, embeddings: List[List[float]]) -> None:
+        """Add documents to the store, replacing chunks that are already stored.
+
+        Args:
+            documents: List of documents
+            embeddings: List of embeddings for the documents
+        """
+        if not documents:
+            return
+
+        assert len(documents) == len(embeddings)
+        logger.info(f"Adding {len(documents)} documents to local vector store")
+        vectors = self._prepare(embeddings)
+
+        with self._lock:
+            count = self._meta["count"]
+            rows = []
+            records = []
+            for doc in documents:
+                point_id = self.chunk_id(doc)
+                row = self._rows.get(point_id)
+                if row is None:
+                    row = count
+                    count += 1
+                    self._rows[point_id] = row
+                rows.append(row)
+                records.append((row, point_id, json.dumps(QdrantVectorStore._payload(doc))))
+
+            self._ensure_capacity(count)
+            self._vectors[rows] = vectors
+            if self._hnsw is not None:
+                self._hnsw.add_items(vectors, np.asarray(rows))
+            self._db.executemany("INSERT OR REPLACE INTO points VALUES (?, ?, ?)", records)
+            self._meta["count"] = count
+            self._meta["version"] = uuid.uuid4().hex
+            self._persist()
+
+        logger.info(f"Completed adding {len(documents)} documents to local vector store")
+
+    def _persist(self):
+        """Flush vectors, payloads, index and counters so the store can be reopened."""
+        self._vectors.flush()
+        self._db.commit()
+        if self._hnsw is not None:
+            self._hnsw.save_index(str(self._dir / "index.hnsw"))
+        tmp_path = self._dir / "meta.json.tmp"
+        tmp_path.write_text(json.dumps(self._meta))
+        os.replace(tmp_path, self._dir / "meta.json")
+
+    def get_collection_version(self) -> str:
+        """Return an identifier that changes whenever the collection is re-ingested."""
+        return self._meta["version"]
+
+    def fetch_contents(self, point_ids: List[str]) -> Dict[str, str]:
+        """Fetch chunk texts in bulk from the payload store."""
+        rows = [self._rows[point_id] for point_id in map(str, point_ids) if point_id in self._rows]
+        if not rows:
+            return {}
+        hits = self._load_hits(np.asarray([rows]), np.zeros((1, len(rows))), with_content=True)
+        return {hit.id: hit.payload.get("content") for hit in hits[0]}
+
+    def _filter_rows(self, filter_conditions) -> np.ndarray:
+        """Rows whose payload satisfies a SearchFilter or a dict of exact matches."""
+        if not isinstance(filter_conditions, SearchFilter):
+            filter_conditions = SearchFilter(match=filter_conditions)
+
+        clauses = []
+        params = []
+        for key, value in filter_conditions.match.items():
+            clauses.append(f"json_extract(payload, '$.{key}') = ?")
+            params.append(value)
+        for key, values in filter_conditions.any_of.items():
+            clauses.append(f"json_extract(payload, '$.{key}') IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        for key, bounds in filter_conditions.range.items():
+            for op, bound in (("gt", ">"), ("gte", ">="), ("lt", "<"), ("lte", "<=")):
+                value = getattr(bounds, op)
+                if value is not None:
+                    clauses.append(f"json_extract(payload, '$.{key}') {bound} ?")
+                    params.append(value)
+
+        where = " AND ".join(clauses) or "1"
+        with self._lock:
+            rows = self._db.execute(f"SELECT row FROM points WHERE {where}", params).fetchall()
+        return np.fromiter((row for (row,) in rows), dtype=np.int64, count=len(rows))
+
+    def _exact_top_k(self, queries: np.ndarray, top_k: int, rows: Optional[np.ndarray]):
+        """Blocked brute-force top-k, returns (rows, scores) per query sorted by score."""
+        count = self._meta["count"] if rows is None else len(rows)
+        if rows is not None:
+            rows = np.sort(rows)  # Sequential reads from the memory map
+        k = min(top_k, count)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, count, self.search_block_size):
+            if rows is None:
+                block_rows = np.arange(start, min(start + self.search_block_size, count))
+                block = self._vectors[start : start + len(block_rows)]
+            else:
+                block_rows = rows[start : start + self.search_block_size]
+                block = self._vectors[block_rows]
+            scores = queries @ block.T
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+                block_rows = block_rows[top]
+            else:
+                block_rows = np.broadcast_to(block_rows, scores.shape)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_rows = np.concatenate([best_rows, block_rows], axis=1)
+            if best_scores.shape[1] > k:
+                top = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, top, axis=1)
+                best_rows = np.take_along_axis(best_rows, top, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(
+            best_scores, order, axis=1
+        )
+
+    def _load_hits(self, rows: np.ndarray, scores: np.ndarray, with_content: bool):
+        unique_rows = sorted({int(row) for row in rows.ravel()})
+        with self._lock:
+            records = self._db.execute(
+                f"SELECT row, id, payload FROM points WHERE row IN "
+                f"({', '.join('?' * len(unique_rows))})",
+                unique_rows,
+            ).fetchall()
+        by_row = {}
+        for row, point_id, payload in records:
+            payload = json.loads(payload)
+            if not with_content:
+                payload.pop("content", None)
+            by_row[row] = (point_id, payload)
+        return [
+            [
+                ScoredChunk(id=by_row[row][0], score=float(score), payload=by_row[row][1])
+                for row, score in zip(query_rows, query_scores)
+            ]
+            for query_rows, query_scores in zip(rows.tolist(), scores.tolist())
+        ]
+
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filter_conditions: Optional[Union[SearchFilter, Dict[str, Any]]] = None,
+        with_content: bool = True,
+        query_text: Optional[str] = None,
+    ) -> List[ScoredChunk]:
+        """Search for similar documents.
+
+        Args:
+            query_embedding: Search query embedding
+            top_k: Number of results to return
+            filter_conditions: Optional SearchFilter, or dict of exact matches on metadata
+            with_content: Whether to include full content in payload
+            query_text: Accepted for interface parity, the local store is dense-only
+
+        Returns:
+            List of search results with scores and metadata
+        """
+        return self.search_batch([query_embedding], top_k, filter_conditions, with_content)[0]
+
+    def search_batch(
+        self,
+        query_embeddings,
+        top_k: int = 5,
+        filter_conditions: Optional[Union[SearchFilter, Dict[str, Any]]] = None,
+        with_content: bool = True,
+        query_texts: Optional[List[str]] = None,
+    ) -> List[List[ScoredChunk]]:
+        """Search for several query embeddings at once.
+
+        Args:
+            query_embeddings: Matrix of query embeddings, one row per query
+            top_k: Number of results to return per query
+            filter_conditions: Optional SearchFilter, or dict of exact matches on metadata,
+                applied to every query
+            with_content: Whether to include full content in payload
+            query_texts: Accepted for interface parity, the local store is dense-only
+
+        Returns:
+            One list of search results per query, in the order of `query_embeddings`
+        """
+        if len(query_embeddings) == 0:
+            return []
+        queries = self._prepare(query_embeddings)
+        if self._meta["count"] == 0:
+            return [[] for _ in range(len(queries))]
+
+        # Filtered searches score only the matching rows, exactly
+        rows = self._filter_rows(filter_conditions) if filter_conditions else None
+        if rows is not None and len(rows) == 0:
+            return [[] for _ in range(len(queries))]
+
+        if self._hnsw is not None and rows is None:
+            k = min(top_k, self._meta["count"])
+            labels, distances = self._hnsw.knn_query(queries, k=k)
+            # hnswlib's inner product distance is 1 - dot
+            return self._load_hits(labels.astype(np.int64), 1.0 - distances, with_content)
+
+        hit_rows, scores = self._exact_top_k(queries, top_k, rows)
+        return self._load_hits(hit_rows, scores, with_content)
+
+    async def asearch(self, query_embedding: List[float], top_k: int = 5, **kwargs):
+        """Async version of search, run in a worker thread (NumPy releases the GIL)."""
+        return await asyncio.to_thread(self.search, query_embedding, top_k, **kwargs)
+
+    async def asearch_batch(self, query_embeddings, top_k: int = 5, **kwargs):
+        """Async version of search_batch, run in a worker thread."""
+        return await asyncio.to_thread(self.search_batch, query_embeddings, top_k, **kwargs)
+
+    async def aclose(self):
+        self.close()
+
+    def close(self):
+        """Persist and release the files."""
+        with self._lock:
+            self._persist()
+            self._db.close()
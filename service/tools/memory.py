@@ -1,5 +1,9 @@
 import os
+import re
+from typing import List, Optional
+from langchain_core.embeddings import Embeddings
 from mem0 import Memory
+from tools.embedding_generator import EmbeddingGenerator
 from utils.logger import get_logger
 from dotenv import load_dotenv
 
@@ -8,10 +12,37 @@ load_dotenv(".env", override=True)
 logger = get_logger(__name__)
 
 
+class SharedModelEmbeddings(Embeddings):
+    """LangChain embeddings adapter so Mem0 reuses the EmbeddingGenerator's model."""
+
+    def __init__(self, embedding_generator: EmbeddingGenerator):
+        self.embedding_generator = embedding_generator
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_generator.generate_embedding(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embedding_generator.embed_query(text).tolist()
+
+
 class Mem0Memory:
-    def __init__(self):
+    def __init__(self, embedding_generator: Optional[EmbeddingGenerator] = None):
+        # Same Qwen/Qwen3-Embedding-0.6B instance as retrieval, through the model registry
+        self.embedding_generator = embedding_generator or EmbeddingGenerator()
+        # Memories embedded by another model (the former 1536-d OpenAI "mem0" collection)
+        # live in a different vector space, so each model and dimension gets its own collection
+        model_slug = re.sub(r"[^a-z0-9]+", "_", self.embedding_generator.model_name.lower())
+        self.collection_name = f"mem0_{model_slug}_{self.embedding_generator.dimension}"
         self.config = {
-            "vector_store": {"provider": "qdrant", "config": {"host": "localhost", "port": 6333}},
+            "vector_store": {
+                "provider": "qdrant",
+                "config": {
+                    "host": "localhost",
+                    "port": 6333,
+                    "collection_name": self.collection_name,
+                    "embedding_model_dims": self.embedding_generator.dimension,
+                },
+            },
             "llm_config": {
                 "provider": "openai",
                 "model": "gpt-4o-mini",
@@ -22,11 +53,14 @@ class Mem0Memory:
             #     "model": "text-embedding-3-small",
             #     "api_key": os.getenv("OPENAI_API_KEY")
             # },
-            "embed_config": {"provider": "huggingface", "model": "Qwen/Qwen3-Embedding-0.6B"},
+            "embedder": {
+                "provider": "langchain",
+                "config": {"model": SharedModelEmbeddings(self.embedding_generator)},
+            },
         }
 
         self.memory = Memory.from_config(self.config)
-        logger.info("Mem0 Memory initialized")
+        logger.info(f"Mem0 Memory initialized on collection {self.collection_name}")
 
     def add_memory(self, message: str, user_id: str) -> None:
         self.memory.add(message, user_id=user_id)
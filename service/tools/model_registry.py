@@ -0,0 +1,50 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_models: Dict[Hashable, Any] = {}
+_registry_lock = threading.Lock()
+_load_locks: Dict[Hashable, threading.Lock] = {}
+
+
+def get_or_load(key: Hashable, loader: Callable[[], Any]) -> Any:
+    """Return the process-wide instance for a key, loading it on first use.
+
+    Args:
+        key: Identity of the model, e.g. (kind, model name, device, backend).
+        loader: Function creating the model when it is not loaded yet.
+
+    Returns:
+        The shared model instance.
+    """
+    with _registry_lock:
+        if key in _models:
+            return _models[key]
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    # Loads of different models may run in parallel, the same model is only loaded once
+    with load_lock:
+        with _registry_lock:
+            if key in _models:
+                return _models[key]
+        logger.info(f"Loading shared model: {key}")
+        model = loader()
+        with _registry_lock:
+            _models[key] = model
+        return model
+
+
+def get_sentence_transformer(model_name: str, device: Optional[str] = None, **kwargs):
+    """Return the shared SentenceTransformer for a model name and device."""
+    from sentence_transformers import SentenceTransformer
+
+    key = ("sentence-transformer", model_name, device, tuple(sorted(kwargs.items())))
+    return get_or_load(key, lambda: SentenceTransformer(model_name, device=device, **kwargs))
+
+
+def loaded_models() -> List[Hashable]:
+    """Return the keys of every model loaded in this process."""
+    with _registry_lock:
+        return list(_models)
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_shared_cache: Optional["RerankScoreCache"] = None
+_shared_lock = threading.Lock()
+
+
+class RerankScoreCache:
+    """Bounded TTL cache of reranker scores.
+
+    Entries are keyed by (reranker model, collection, normalized query hash, point ID,
+    collection version), so a repeated or rephrased-to-the-same question only reranks chunks
+    it has not scored yet, and a re-ingested collection never serves scores of old content.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Size cap, the least recently used entries are evicted first.
+                Defaults to RERANK_CACHE_MAX_ENTRIES.
+            ttl_seconds: Time after which an entry is no longer served.
+                Defaults to RERANK_CACHE_TTL_SECONDS.
+        """
+        if max_entries is None:
+            max_entries = int(os.getenv("RERANK_CACHE_MAX_ENTRIES", "20000"))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("RERANK_CACHE_TTL_SECONDS", "3600"))
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._collection_versions: Dict[str, str] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def shared(cls) -> "RerankScoreCache":
+        """Return the process-wide cache shared by all sessions."""
+        global _shared_cache
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = cls()
+            return _shared_cache
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Lowercase, collapse whitespace and drop trailing punctuation."""
+        return re.sub(r"\s+", " ", query.strip().lower()).rstrip(" ?!.")
+
+    @classmethod
+    def make_key(
+        cls, model_name: str, collection_name: str, query: str, point_id, collection_version: str
+    ) -> Tuple:
+        query_hash = hashlib.sha256(cls.normalize_query(query).encode("utf-8")).hexdigest()
+        return (model_name, collection_name, query_hash, str(point_id), collection_version)
+
+    def check_collection_version(self, collection_name: str, collection_version: str):
+        """Drop the entries of a collection re-ingested since it was last seen."""
+        with self._lock:
+            previous = self._collection_versions.get(collection_name)
+            self._collection_versions[collection_name] = collection_version
+        if previous is not None and previous != collection_version:
+            logger.info(
+                f"Collection {collection_name} changed version {previous} -> "
+                f"{collection_version}, invalidating rerank cache"
+            )
+            self.invalidate(collection_name)
+
+    def get_many(self, keys: Sequence[Tuple]) -> List[Optional[float]]:
+        """Look up several keys at once. Missing or expired keys are returned as None."""
+        now = time.monotonic()
+        scores = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[0] > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    scores.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    scores.append(entry[1])
+        return scores
+
+    def put_many(self, keys: Sequence[Tuple], scores: Sequence[float]):
+        """Store several scores, evicting the least recently used entries over the cap."""
+        now = time.monotonic()
+        with self._lock:
+            for key, score in zip(keys, scores):
+                self._entries[key] = (now, score)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, collection_name: Optional[str] = None):
+        """Remove the entries of a collection, or every entry if no collection is given."""
+        with self._lock:
+            if collection_name is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[1] == collection_name]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and the cumulative hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
@@ -1,6 +1,9 @@
-from typing import Optional
+import copy
+import os
+from typing import List, Optional, Sequence, Tuple
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM
+from utils.batching import length_buckets
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -8,15 +11,86 @@ logger = get_logger(__name__)
 
 class Reranker:
 
-    def __init__(self, model_name: str = "Qwen/Qwen3-Reranker-0.6B", device: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: str = "Qwen/Qwen3-Reranker-0.6B",
+        device: Optional[str] = None,
+        max_tokens_per_batch: Optional[int] = None,
+        reuse_prefix_cache: Optional[bool] = None,
+        yes_no_head: Optional[bool] = None,
+        quantize_int8: Optional[bool] = None,
+        cascade: Optional[bool] = None,
+        cascade_threshold: Optional[float] = None,
+        cascade_margin: Optional[float] = None,
+        cascade_min_candidates: Optional[int] = None,
+    ):
+        if max_tokens_per_batch is None:
+            max_tokens_per_batch = int(os.getenv("RERANKER_MAX_TOKENS_PER_BATCH", "8192"))
+        if reuse_prefix_cache is None:
+            reuse_prefix_cache = os.getenv("RERANKER_PREFIX_CACHE", "false").lower() == "true"
+        if yes_no_head is None:
+            yes_no_head = os.getenv("RERANKER_YES_NO_HEAD", "true").lower() == "true"
+        if quantize_int8 is None:
+            quantize_int8 = os.getenv("RERANKER_INT8", "false").lower() == "true"
+        if cascade is None:
+            cascade = os.getenv("RERANKER_CASCADE", "false").lower() == "true"
+        if cascade_threshold is None:
+            cascade_threshold = float(os.getenv("RERANKER_CASCADE_THRESHOLD", "0.55"))
+        if cascade_margin is None:
+            cascade_margin = float(os.getenv("RERANKER_CASCADE_MARGIN", "0.1"))
+        if cascade_min_candidates is None:
+            cascade_min_candidates = int(os.getenv("RERANKER_CASCADE_MIN_CANDIDATES", "3"))
+
         logger.info(f"Loading reranker model: {model_name}")
+        self.model_name = model_name
         # Left padding to ensure not distrub the right addition tokens
         self.tokenizer = AutoTokenizer.from_pretrained(model_name, padding_side="left")
         self.model = AutoModelForCausalLM.from_pretrained(model_name).eval()
 
         self.token_false_id = self.tokenizer.convert_tokens_to_ids("no")
         self.token_true_id = self.tokenizer.convert_tokens_to_ids("yes")
+        # Only the 'no'/'yes' rows of the LM head are needed to score a pair, so the lean
+        # path runs the base transformer and projects the last hidden state onto these rows
+        # instead of materializing [batch, seq_len, vocab_size] logits.
+        self.yes_no_head = yes_no_head
+        yes_no_weight = self.model.get_output_embeddings().weight[
+            [self.token_false_id, self.token_true_id]
+        ]
+        # A module of its own so that int8 quantization covers it like the full LM head
+        self.yes_no_projection = torch.nn.Sequential(
+            torch.nn.Linear(yes_no_weight.shape[1], 2, bias=False)
+        ).to(device=yes_no_weight.device, dtype=yes_no_weight.dtype)
+        self.yes_no_projection[0].weight.data.copy_(yes_no_weight.detach())
+        self.yes_no_projection.eval()
+
+        # Torch thread count is a process-wide setting shared with every other model, so it
+        # is left to the caller (torch.set_num_threads or OMP_NUM_THREADS)
+        if quantize_int8:
+            # Dynamic int8 quantization of the Linear layers, weights quantized once here
+            # and activations quantized on the fly, CPU only
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            self.yes_no_projection = torch.ao.quantization.quantize_dynamic(
+                self.yes_no_projection, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            logger.info("Reranker Linear layers quantized to int8")
+        self.base_model = self.model.base_model
         self.max_length = 8192
+        # Padded tokens per forward pass, bounds peak activation memory
+        self.max_tokens_per_batch = max_tokens_per_batch
+        # Run the prompt shared by all documents of a query once and reuse its KV cache
+        self.reuse_prefix_cache = reuse_prefix_cache
+
+        # Cascade on first-stage similarity: clear accepts / rejects skip the model
+        self.cascade = cascade
+        self.cascade_threshold = cascade_threshold
+        self.cascade_margin = cascade_margin
+        self.cascade_min_candidates = cascade_min_candidates
+        self.cascade_documents = 0
+        self.cascade_skipped_documents = 0
+        self.cascade_calls = 0
+        self.cascade_skipped_calls = 0
 
         prefix = """<|im_start|>system
         Judge whether Document meets the requirements based on the Query and Instruct provided.
@@ -35,7 +109,8 @@ class Reranker:
         )
         return output
 
-    def process_inputs(self, pairs):
+    def tokenize_pairs(self, pairs) -> List[List[int]]:
+        """Tokenize formatted pairs and wrap them with the prefix and suffix tokens."""
         inputs = self.tokenizer(
             pairs,
             padding=False,
@@ -43,31 +118,269 @@ class Reranker:
             return_attention_mask=False,
             max_length=self.max_length - len(self.prefix_tokens) - len(self.suffix_tokens),
         )
-        for i, ele in enumerate(inputs["input_ids"]):
-            inputs["input_ids"][i] = self.prefix_tokens + ele + self.suffix_tokens
+        return [self.prefix_tokens + ele + self.suffix_tokens for ele in inputs["input_ids"]]
+
+    def pad_batch(self, token_ids: List[List[int]]):
+        """Left-pad token ids into model inputs on the model device."""
         inputs = self.tokenizer.pad(
-            inputs, padding=True, return_tensors="pt", max_length=self.max_length
+            {"input_ids": token_ids}, padding=True, return_tensors="pt", max_length=self.max_length
         )
         for key in inputs:
             inputs[key] = inputs[key].to(self.model.device)
         return inputs
 
+    def process_inputs(self, pairs):
+        return self.pad_batch(self.tokenize_pairs(pairs))
+
+    def _yes_probabilities(self, batch_scores) -> List[float]:
+        """Turn last-position logits over the vocabulary into P(yes) against P(no)."""
+        true_vector = batch_scores[:, self.token_true_id]  # Get 'yes' token prob
+        false_vector = batch_scores[:, self.token_false_id]  # Get 'no' token prob
+        return self._yes_no_probabilities(torch.stack([false_vector, true_vector], dim=1))
+
+    def _yes_no_probabilities(self, batch_scores) -> List[float]:
+        """Turn [batch, 2] ('no', 'yes') logits into P(yes)."""
+        batch_scores = torch.nn.functional.log_softmax(batch_scores.float(), dim=1)
+        scores = batch_scores[:, 1].exp().tolist()
+        return scores
+
     @torch.no_grad()
     def compute_logits(self, inputs, **kwargs):
         # Raw output shape [batch_size, seq_length, vocab_size] == [2, 108, 151669]
         batch_scores = self.model(**inputs).logits[:, -1, :]  # Get the last token
-        true_vector = batch_scores[:, self.token_true_id]  # Get 'yes' token prob
-        false_vector = batch_scores[:, self.token_false_id]  # Get 'no' token prob
-        batch_scores = torch.stack([false_vector, true_vector], dim=1)
-        batch_scores = torch.nn.functional.log_softmax(batch_scores, dim=1)
-        scores = batch_scores[:, 1].exp().tolist()
+        return self._yes_probabilities(batch_scores)
+
+    def _project_yes_no(self, last_hidden) -> List[float]:
+        """Apply only the 'no'/'yes' rows of the LM head to last-token hidden states."""
+        return self._yes_no_probabilities(self.yes_no_projection(last_hidden))
+
+    @torch.no_grad()
+    def compute_yes_no_logits(self, inputs, **kwargs):
+        """Same scores as compute_logits without building the full vocabulary logits."""
+        # Hidden states are [batch_size, seq_length, hidden_size], left padded
+        last_hidden = self.base_model(**inputs).last_hidden_state[:, -1, :]
+        return self._project_yes_no(last_hidden)
+
+    def _score_inputs(self, inputs) -> List[float]:
+        if self.yes_no_head:
+            return self.compute_yes_no_logits(inputs)
+        return self.compute_logits(inputs)
+
+    def tokenize_shared_prefix(self, query, documents):
+        """Split the pairs of one query into shared prefix tokens and per-document tokens.
+
+        The shared part ends right before the space that precedes the document, so that the
+        document tokens (including that space) match the tokenization of the full pair.
+        """
+        shared_text = self.format_instruction(self.task, query, "").rstrip(" ")
+        shared_tokens = self.prefix_tokens + self.tokenizer.encode(
+            shared_text, add_special_tokens=False
+        )
+        max_doc_length = self.max_length - len(shared_tokens) - len(self.suffix_tokens)
+        doc_inputs = self.tokenizer(
+            [" " + doc for doc in documents],
+            add_special_tokens=False,
+            truncation=True,
+            max_length=max_doc_length,
+            return_attention_mask=False,
+        )
+        doc_tokens = [ele + self.suffix_tokens for ele in doc_inputs["input_ids"]]
+        return shared_tokens, doc_tokens
+
+    @staticmethod
+    def _expand_past(past_key_values, batch_size):
+        """Copy a batch-1 KV cache into a cache of `batch_size` identical rows."""
+        if isinstance(past_key_values, tuple):
+            return tuple(
+                tuple(t.expand(batch_size, *t.shape[1:]).contiguous() for t in layer)
+                for layer in past_key_values
+            )
+        expanded = copy.deepcopy(past_key_values)
+        expanded.batch_repeat_interleave(batch_size)
+        return expanded
+
+    @torch.no_grad()
+    def compute_prefix_cache(self, shared_tokens):
+        """Run the shared prefix once and return its past_key_values."""
+        input_ids = torch.tensor([shared_tokens], device=self.model.device)
+        model = self.base_model if self.yes_no_head else self.model
+        return model(input_ids=input_ids, use_cache=True).past_key_values
+
+    @torch.no_grad()
+    def compute_logits_with_prefix(self, past_key_values, prefix_length, token_ids):
+        """Score documents that continue a cached shared prefix.
+
+        Documents are right-padded so that every row continues the prefix at the same
+        position. The score is read at each row's last real token.
+        """
+        batch_size = len(token_ids)
+        lengths = [len(ids) for ids in token_ids]
+        max_len = max(lengths)
+        device = self.model.device
+
+        input_ids = torch.full(
+            (batch_size, max_len), self.tokenizer.pad_token_id, dtype=torch.long, device=device
+        )
+        attention_mask = torch.zeros(
+            (batch_size, prefix_length + max_len), dtype=torch.long, device=device
+        )
+        attention_mask[:, :prefix_length] = 1
+        for i, ids in enumerate(token_ids):
+            input_ids[i, : len(ids)] = torch.tensor(ids, device=device)
+            attention_mask[i, prefix_length : prefix_length + len(ids)] = 1
+        position_ids = torch.arange(prefix_length, prefix_length + max_len, device=device)
+        position_ids = position_ids.unsqueeze(0).expand(batch_size, -1)
+
+        model_inputs = {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "position_ids": position_ids,
+            "past_key_values": self._expand_past(past_key_values, batch_size),
+        }
+        last_positions = torch.tensor([length - 1 for length in lengths], device=device)
+        rows = torch.arange(batch_size, device=device)
+        if self.yes_no_head:
+            hidden = self.base_model(**model_inputs).last_hidden_state
+            return self._project_yes_no(hidden[rows, last_positions, :])
+        logits = self.model(**model_inputs).logits
+        return self._yes_probabilities(logits[rows, last_positions, :])
+
+    def score_with_shared_prefix(self, query, documents) -> List[float]:
+        """Score documents for one query, running the shared prompt prefix only once.
+
+        Args:
+            query: User query.
+            documents: Document texts.
+
+        Returns:
+            Relevance scores in the same order as `documents`.
+        """
+        shared_tokens, doc_tokens = self.tokenize_shared_prefix(query, documents)
+        past_key_values = self.compute_prefix_cache(shared_tokens)
+        scores = [0.0] * len(documents)
+        batches = length_buckets([len(ids) for ids in doc_tokens], self.max_tokens_per_batch)
+        for batch in batches:
+            batch_scores = self.compute_logits_with_prefix(
+                past_key_values, len(shared_tokens), [doc_tokens[i] for i in batch]
+            )
+            for i, score in zip(batch, batch_scores):
+                scores[i] = score
+        logger.info(
+            f"Reranked {len(documents)} documents on a {len(shared_tokens)}-token shared prefix "
+            f"in {len(batches)} batches"
+        )
+        return scores
+
+    def score_pairs(self, pairs) -> List[float]:
+        """Score formatted pairs in length-sorted mini-batches under the token budget.
+
+        Args:
+            pairs: Formatted instruction/query/document strings.
+
+        Returns:
+            Relevance scores in the same order as `pairs`.
+        """
+        token_ids = self.tokenize_pairs(pairs)
+        scores = [0.0] * len(pairs)
+        batches = length_buckets([len(ids) for ids in token_ids], self.max_tokens_per_batch)
+        for batch in batches:
+            inputs = self.pad_batch([token_ids[i] for i in batch])
+            for i, score in zip(batch, self._score_inputs(inputs)):
+                scores[i] = score
+        logger.info(f"Reranked {len(pairs)} pairs in {len(batches)} batches")
         return scores
 
     def run(self, queries, documents):
+        if not documents:
+            return []
+        if self.reuse_prefix_cache:
+            scores = []
+            for query in queries:
+                scores.extend(self.score_with_shared_prefix(query, documents))
+            return scores
+
         pairs = []
         for query in queries:
             for doc in documents:
                 pairs.append(self.format_instruction(self.task, query, doc))
-        inputs = self.process_inputs(pairs)
-        scores = self.compute_logits(inputs)
-        return scores
+        if not pairs:
+            return []
+        return self.score_pairs(pairs)
+
+    def plan_cascade(self, vector_scores: Sequence[float]) -> Tuple[List[int], List[float]]:
+        """Decide which candidates need the reranker from their first-stage similarity.
+
+        Candidates scoring at least `cascade_threshold + cascade_margin` are accepted and
+        those at most `cascade_threshold - cascade_margin` are rejected without the model.
+        Only the ambiguous middle is reranked. With `cascade_min_candidates` or fewer
+        candidates the model is skipped altogether: those above `cascade_threshold` are
+        accepted and the rest rejected.
+
+        Args:
+            vector_scores: Qdrant similarity score of every candidate of the query.
+
+        Returns:
+            Indices to rerank, and provisional scores (1.0 accepted, 0.0 rejected).
+        """
+        if len(vector_scores) <= self.cascade_min_candidates:
+            return [], [1.0 if score > self.cascade_threshold else 0.0 for score in vector_scores]
+
+        to_rerank = []
+        scores = []
+        for i, score in enumerate(vector_scores):
+            if score >= self.cascade_threshold + self.cascade_margin:
+                scores.append(1.0)
+            elif score <= self.cascade_threshold - self.cascade_margin:
+                scores.append(0.0)
+            else:
+                to_rerank.append(i)
+                scores.append(0.0)
+        return to_rerank, scores
+
+    def record_cascade(self, num_documents: int, num_reranked: int):
+        """Count one cascade call in the skip statistics.
+
+        Args:
+            num_documents: Documents the cascade decided on.
+            num_reranked: Documents among them sent to the model.
+        """
+        self.cascade_calls += 1
+        self.cascade_documents += num_documents
+        self.cascade_skipped_documents += num_documents - num_reranked
+        if not num_reranked:
+            self.cascade_skipped_calls += 1
+        logger.info(f"Rerank cascade sent {num_reranked}/{num_documents} documents to the model")
+
+    def run_cascade(self, query, documents, vector_scores) -> Tuple[List[float], List[int]]:
+        """Rerank only the candidates the first-stage scores leave ambiguous.
+
+        Args:
+            query: User query.
+            documents: Document texts.
+            vector_scores: Qdrant similarity score of each document.
+
+        Returns:
+            Scores in document order, and the indices that were scored by the model.
+        """
+        to_rerank, scores = self.plan_cascade(vector_scores)
+        if to_rerank:
+            model_scores = self.run([query], [documents[i] for i in to_rerank])
+            for i, score in zip(to_rerank, model_scores):
+                scores[i] = score
+        self.record_cascade(len(documents), len(to_rerank))
+        return scores, to_rerank
+
+    def cascade_stats(self):
+        """Return how often the cascade skipped the model, per call and per document."""
+        return {
+            "calls": self.cascade_calls,
+            "skipped_calls": self.cascade_skipped_calls,
+            "skipped_call_rate": (
+                self.cascade_skipped_calls / self.cascade_calls if self.cascade_calls else 0.0
+            ),
+            "skipped_document_rate": (
+                self.cascade_skipped_documents / self.cascade_documents
+                if self.cascade_documents
+                else 0.0
+            ),
+        }
@@ -0,0 +1,76 @@
+import os
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional
+from qdrant_client import models
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how in is it its of on or that the "
+    "there this to was what when where which who why will with".split()
+)
+
+
+class BM25SparseEncoder:
+    """Stateless BM25 encoder producing Qdrant sparse vectors.
+
+    Documents get the BM25 term-frequency part of the score, saturated with `k1` and
+    length-normalized with `b`. The IDF part is left to Qdrant (`Modifier.IDF` on the
+    sparse vector), so adding chunks never requires re-encoding the existing ones. Terms
+    are hashed to stable indices, so no vocabulary has to be stored.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        avg_doc_length: Optional[float] = None,
+    ):
+        """Initialize the encoder.
+
+        Args:
+            k1: Term frequency saturation.
+            b: Strength of the document length normalization.
+            avg_doc_length: Average chunk length in tokens used for length normalization.
+                Defaults to BM25_AVG_DOC_LENGTH.
+        """
+        if avg_doc_length is None:
+            avg_doc_length = float(os.getenv("BM25_AVG_DOC_LENGTH", "300"))
+
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = avg_doc_length
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Lowercase alphanumeric tokens without stopwords, e.g. 'Rule 12B' -> rule, 12b."""
+        return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS]
+
+    @staticmethod
+    def token_index(token: str) -> int:
+        return zlib.crc32(token.encode("utf-8"))
+
+    def _to_sparse(self, weights: Dict[int, float]) -> models.SparseVector:
+        indices = sorted(weights)
+        return models.SparseVector(indices=indices, values=[weights[i] for i in indices])
+
+    def encode_document(self, text: str) -> models.SparseVector:
+        """Encode a chunk with BM25 term-frequency weights."""
+        tokens = self.tokenize(text)
+        length_norm = 1 - self.b + self.b * len(tokens) / self.avg_doc_length
+        weights: Dict[int, float] = {}
+        for token, tf in Counter(tokens).items():
+            index = self.token_index(token)
+            weights[index] = weights.get(index, 0.0) + tf * (self.k1 + 1) / (
+                tf + self.k1 * length_norm
+            )
+        return self._to_sparse(weights)
+
+    def encode_documents(self, texts: List[str]) -> List[models.SparseVector]:
+        return [self.encode_document(text) for text in texts]
+
+    def encode_query(self, text: str) -> models.SparseVector:
+        """Encode a query as the set of its terms, each with weight 1."""
+        return self._to_sparse({self.token_index(token): 1.0 for token in self.tokenize(text)})
@@ -1,9 +1,66 @@
-from typing import List, Dict, Any, Optional
-from qdrant_client import QdrantClient, models
+import hashlib
+import os
+import time
+import uuid
+from typing import Callable, List, Dict, Any, Optional, Set, Union
+import numpy as np
+from pydantic import BaseModel, Field
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+from tools.content_store import ChunkContentStore
+from tools.sparse_encoder import BM25SparseEncoder
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Fixed namespace so the same chunk always maps to the same point ID
+CHUNK_ID_NAMESPACE = uuid.UUID("5b0e8f0c-3c39-4d5e-9b36-6a1f3c2b7d41")
+
+# Name of the BM25 sparse vector, the dense vector stays the unnamed default
+SPARSE_VECTOR_NAME = "bm25"
+
+# Top-level payload fields that get a payload index, so filtered searches stay fast
+PAYLOAD_INDEXES = {
+    "source": models.PayloadSchemaType.KEYWORD,
+    "page": models.PayloadSchemaType.INTEGER,
+}
+
+
+class PayloadRange(BaseModel):
+    """Numeric range condition, unset bounds are open."""
+
+    gt: Optional[float] = None
+    gte: Optional[float] = None
+    lt: Optional[float] = None
+    lte: Optional[float] = None
+
+
+class SearchFilter(BaseModel):
+    """Filter over top-level payload fields (source, page, chunk_index).
+
+    Every condition must hold, e.g.
+    SearchFilter(match={"source": "rules_2024.pdf"}, range={"page": PayloadRange(gte=10)}).
+    """
+
+    match: Dict[str, Union[str, int, bool]] = Field(default_factory=dict)
+    any_of: Dict[str, List[Union[str, int]]] = Field(default_factory=dict)
+    range: Dict[str, PayloadRange] = Field(default_factory=dict)
+
+    def to_qdrant(self) -> Optional[models.Filter]:
+        """Convert to a Qdrant filter, None when there is no condition."""
+        must_conditions = [
+            models.FieldCondition(key=key, match=models.MatchValue(value=value))
+            for key, value in self.match.items()
+        ]
+        must_conditions.extend(
+            models.FieldCondition(key=key, match=models.MatchAny(any=values))
+            for key, values in self.any_of.items()
+        )
+        must_conditions.extend(
+            models.FieldCondition(key=key, range=models.Range(**bounds.model_dump()))
+            for key, bounds in self.range.items()
+        )
+        return models.Filter(must=must_conditions) if must_conditions else None
+
 
 class QdrantVectorStore:
     """Handles vector storage and retrieval using Qdrant."""
@@ -14,6 +71,24 @@ class QdrantVectorStore:
         vector_size: int = 1024,
         distance: str = "Cosine",
         qdrant_url: Optional[str] = None,
+        hybrid: Optional[bool] = None,
+        fusion: str = "rrf",
+        vector_weight: float = 0.7,
+        keyword_weight: float = 0.3,
+        prefetch_limit: int = 20,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construct: Optional[int] = None,
+        hnsw_ef: Optional[int] = None,
+        on_disk: bool = False,
+        on_disk_payload: bool = False,
+        quantization: Optional[str] = None,
+        quantization_always_ram: bool = True,
+        rescore: bool = True,
+        oversampling: Optional[float] = None,
+        grpc_port: Optional[int] = None,
+        lean_payloads: Optional[bool] = None,
+        content_store: Optional[ChunkContentStore] = None,
+        version_ttl_seconds: Optional[float] = None,
     ):
         """Initialize the vector store.
 
@@ -21,15 +96,77 @@ class QdrantVectorStore:
             collection_name: Name of the Qdrant collection
             config: Configuration for the vector store
             qdrant_url: URL for the Qdrant server
+            hybrid: Whether to store BM25 sparse vectors and fuse them with dense search.
+                None follows the collection schema: hybrid if the existing collection has
+                a BM25 sparse vector, dense-only otherwise and for new collections
+            fusion: 'rrf' for server-side reciprocal rank fusion or 'weighted' for a
+                weighted sum of the max-normalized dense and BM25 scores
+            vector_weight: Weight of the dense score in weighted fusion
+            keyword_weight: Weight of the BM25 score in weighted fusion
+            prefetch_limit: Candidates taken from each search before fusion
+            hnsw_m: Edges per node of the HNSW graph, None keeps the Qdrant default (16)
+            hnsw_ef_construct: Candidate list size while building the graph (default 100)
+            hnsw_ef: Candidate list size at search time, None lets Qdrant use ef_construct
+            on_disk: Keep the original vectors memory-mapped on disk instead of in RAM
+            on_disk_payload: Keep payloads on disk instead of in RAM
+            quantization: None, 'scalar' (int8) or 'binary' (1 bit per dimension)
+            quantization_always_ram: Keep the quantized vectors in RAM
+            rescore: Re-score quantized candidates with the original vectors
+            oversampling: Fetch `oversampling * top_k` quantized candidates before rescoring
+            grpc_port: gRPC port of the Qdrant server, used by add_documents_bulk.
+                Defaults to QDRANT_GRPC_PORT
+            lean_payloads: Keep chunk texts out of Qdrant, in a local content store.
+                Defaults to QDRANT_LEAN_PAYLOADS
+            content_store: Content store used with lean payloads, defaults to the shared one
+            version_ttl_seconds: How long get_collection_version trusts the ingest version it
+                last read or wrote before asking Qdrant again, so ingests by other processes
+                are picked up. Defaults to QDRANT_VERSION_TTL_SECONDS
         """
         self.collection_name = collection_name
         self.distance = distance
         self.vector_size = vector_size
         self.qdrant_url = qdrant_url or "http://172.17.0.1:6333"
+        if fusion not in ("rrf", "weighted"):
+            raise ValueError(f"Unsupported fusion method: {fusion}")
+        self.hybrid = hybrid
+        self.fusion = fusion
+        self.vector_weight = vector_weight
+        self.keyword_weight = keyword_weight
+        self.prefetch_limit = prefetch_limit
+        self.sparse_encoder = None
+        if quantization not in (None, "scalar", "binary"):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.hnsw_ef = hnsw_ef
+        self.on_disk = on_disk
+        self.on_disk_payload = on_disk_payload
+        self.quantization = quantization
+        self.quantization_always_ram = quantization_always_ram
+        self.rescore = rescore
+        self.oversampling = oversampling
 
         # Initialize clients
         logger.info(f"Initializing vector store with url: {self.qdrant_url}")
         self.qdrant_client = QdrantClient(url=self.qdrant_url)
+        if grpc_port is None:
+            grpc_port = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+        self.grpc_port = grpc_port
+        if lean_payloads is None:
+            lean_payloads = os.getenv("QDRANT_LEAN_PAYLOADS", "false").lower() == "true"
+        self.lean_payloads = lean_payloads
+        self.content_store = None
+        if lean_payloads:
+            self.content_store = content_store or ChunkContentStore.shared()
+        self._bulk_client: Optional[QdrantClient] = None
+        self._async_client: Optional[AsyncQdrantClient] = None
+        # Bumped on every ingest so caches keyed by collection content can be invalidated
+        self._local_version = 0
+        if version_ttl_seconds is None:
+            version_ttl_seconds = float(os.getenv("QDRANT_VERSION_TTL_SECONDS", "30"))
+        self.version_ttl_seconds = version_ttl_seconds
+        self._remote_version: Optional[str] = None
+        self._remote_version_read_at = 0.0
 
         # Ensure the collection exists
         self._ensure_collection()
@@ -40,10 +177,21 @@ class QdrantVectorStore:
         collection_names = [collection.name for collection in collections.collections]
 
         if self.collection_name not in collection_names:
+            self.hybrid = bool(self.hybrid)
             self.qdrant_client.create_collection(
                 collection_name=self.collection_name,
                 vectors_config=models.VectorParams(
-                    size=self.vector_size, distance=self._get_distance_metric()
+                    size=self.vector_size,
+                    distance=self._get_distance_metric(),
+                    on_disk=self.on_disk,
+                ),
+                hnsw_config=self._hnsw_config(),
+                quantization_config=self._quantization_config(),
+                on_disk_payload=self.on_disk_payload,
+                sparse_vectors_config=(
+                    {SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)}
+                    if self.hybrid
+                    else None
                 ),
             )
             logger.info(
@@ -51,6 +199,91 @@ class QdrantVectorStore:
             )
         else:
             logger.info(f"Collection {self.collection_name} already exists")
+            info = self.qdrant_client.get_collection(self.collection_name)
+            has_sparse = SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+            if self.hybrid and not has_sparse:
+                # Sparse vectors can only be declared at creation, re-create to enable
+                logger.warning(
+                    f"Collection {self.collection_name} has no '{SPARSE_VECTOR_NAME}' sparse "
+                    "vector, falling back to dense-only search"
+                )
+            if self.hybrid is None:
+                self.hybrid = has_sparse
+            else:
+                self.hybrid = self.hybrid and has_sparse
+
+        if self.hybrid:
+            self.sparse_encoder = BM25SparseEncoder()
+        logger.info(
+            f"Collection {self.collection_name} uses {'hybrid' if self.hybrid else 'dense'} search"
+        )
+
+        self._ensure_payload_indexes()
+
+    def _hnsw_config(self) -> Optional[models.HnswConfigDiff]:
+        if self.hnsw_m is None and self.hnsw_ef_construct is None:
+            return None
+        return models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def _quantization_config(self):
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=self.quantization_always_ram)
+            )
+        return None
+
+    def _search_params(self) -> Optional[models.SearchParams]:
+        """Search-time HNSW and quantization parameters, None for the server defaults."""
+        quantization = None
+        if self.quantization is not None:
+            quantization = models.QuantizationSearchParams(
+                rescore=self.rescore, oversampling=self.oversampling
+            )
+        if self.hnsw_ef is None and quantization is None:
+            return None
+        return models.SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+    def update_collection_params(self):
+        """Apply the HNSW, on-disk and quantization settings to an existing collection.
+
+        Qdrant rebuilds the affected index segments in the background, searches keep working
+        meanwhile. Switching quantization off is done with `quantization=None`.
+        """
+        self.qdrant_client.update_collection(
+            collection_name=self.collection_name,
+            vectors_config={"": models.VectorParamsDiff(on_disk=self.on_disk)},
+            hnsw_config=self._hnsw_config(),
+            quantization_config=self._quantization_config() or models.Disabled.DISABLED,
+            collection_params=models.CollectionParamsDiff(on_disk_payload=self.on_disk_payload),
+        )
+        logger.info(
+            f"Updated collection {self.collection_name}: hnsw m={self.hnsw_m} "
+            f"ef_construct={self.hnsw_ef_construct}, on_disk={self.on_disk}, "
+            f"on_disk_payload={self.on_disk_payload}, quantization={self.quantization}"
+        )
+
+    def _ensure_payload_indexes(self):
+        """Create the payload indexes of filterable fields that do not exist yet."""
+        info = self.qdrant_client.get_collection(self.collection_name)
+        existing = info.payload_schema or {}
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            if field_name in existing:
+                continue
+            self.qdrant_client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field_name,
+                field_schema=field_schema,
+                wait=True,
+            )
+            logger.info(f"Created {field_schema.value} payload index on '{field_name}'")
 
     def _get_distance_metric(self) -> models.Distance:
         """Get the Qdrant distance metric from config."""
@@ -61,6 +294,50 @@ class QdrantVectorStore:
         }
         return distance_map.get(self.distance, models.Distance.COSINE)
 
+    @staticmethod
+    def chunk_id(document) -> str:
+        """Content-addressed point ID derived from (source, page, chunk text hash)."""
+        content_hash = hashlib.sha256(document.page_content.encode("utf-8")).hexdigest()
+        key = f"{document.metadata.get('source')}|{document.metadata.get('page')}|{content_hash}"
+        return str(uuid.uuid5(CHUNK_ID_NAMESPACE, key))
+
+    @staticmethod
+    def _payload(document, with_content: bool = True) -> Dict[str, Any]:
+        payload = {
+            "source": document.metadata["source"],
+            "page": document.metadata["page"],
+            "chunk_index": document.metadata["chunk_index"],
+        }
+        if with_content:
+            payload["content"] = document.page_content
+        return payload
+
+    def _store_contents(self, documents, point_ids: List[str]):
+        """With lean payloads, write chunk texts to the local content store."""
+        if self.content_store is not None:
+            self.content_store.put_many(point_ids, [doc.page_content for doc in documents])
+
+    def fetch_contents(self, point_ids: List[str]) -> Dict[str, str]:
+        """Fetch chunk texts in bulk, from the content store or from the payloads.
+
+        Args:
+            point_ids: IDs of the chunks whose text is needed
+
+        Returns:
+            Mapping of point ID to chunk text
+        """
+        if not point_ids:
+            return {}
+        if self.content_store is not None:
+            return self.content_store.get_many(point_ids)
+        records = self.qdrant_client.retrieve(
+            collection_name=self.collection_name,
+            ids=list(point_ids),
+            with_payload=models.PayloadSelectorInclude(include=["content"]),
+            with_vectors=False,
+        )
+        return {str(record.id): record.payload.get("content") for record in records}
+
     def add_documents(self, documents, embeddings: List[List[float]]) -> None:
         """Add documents to the vector store.
 
@@ -75,20 +352,28 @@ class QdrantVectorStore:
         assert len(documents) == len(embeddings)
         logger.info(f"Adding {len(documents)} documents to vector store")
 
+        sparse_vectors = None
+        if self.hybrid:
+            sparse_vectors = self.sparse_encoder.encode_documents(
+                [doc.page_content for doc in documents]
+            )
+
+        point_ids = [self.chunk_id(doc) for doc in documents]
+        self._store_contents(documents, point_ids)
+
         points = []
-        for idx, (doc, embedding) in enumerate(zip(documents, embeddings)):
+        for i, (doc, embedding) in enumerate(zip(documents, embeddings)):
             # Prepare payload with metadata
-            payload = {
-                "source": doc.metadata["source"],
-                "page": doc.metadata["page"],
-                "chunk_index": doc.metadata["chunk_index"],
-                "content": doc.page_content,
-            }
+            payload = self._payload(doc, with_content=not self.lean_payloads)
+
+            vector = embedding  # Directly use the embedding
+            if sparse_vectors is not None:
+                vector = {"": embedding, SPARSE_VECTOR_NAME: sparse_vectors[i]}
 
             # Create point structure
             point = models.PointStruct(
-                id=idx,  # Note: 'id' not 'ids'
-                vector=embedding,  # Directly use the embedding
+                id=point_ids[i],  # Same chunk -> same ID, upserts are idempotent
+                vector=vector,
                 payload=payload,  # Note: 'payload' not 'payloads'
             )
             points.append(point)
@@ -106,52 +391,466 @@ class QdrantVectorStore:
                 collection_name=self.collection_name, points=points, wait=True
             )
 
+        self._bump_collection_version()
         logger.info(f"Completed adding {len(documents)} documents to vector store")
 
+    def _get_bulk_client(self) -> QdrantClient:
+        """gRPC client used for bulk uploads, created on first use."""
+        if self._bulk_client is None:
+            self._bulk_client = QdrantClient(
+                url=self.qdrant_url, prefer_grpc=True, grpc_port=self.grpc_port
+            )
+        return self._bulk_client
+
+    def add_documents_bulk(
+        self,
+        documents,
+        embeddings,
+        batch_size: Optional[int] = None,
+        parallel: Optional[int] = None,
+    ) -> None:
+        """Add many documents through parallel gRPC uploads, waiting once at the end.
+
+        Unlike add_documents, dense vectors stay a numpy matrix end to end and batches are
+        not acknowledged one by one.
+
+        Args:
+            documents: List of documents
+            embeddings: Embedding matrix (or list of embeddings) for the documents
+            batch_size: Number of points per upload request, defaults to QDRANT_UPLOAD_BATCH_SIZE
+            parallel: Number of upload worker processes, defaults to QDRANT_UPLOAD_PARALLEL
+        """
+        if not documents:
+            return
+        if batch_size is None:
+            batch_size = int(os.getenv("QDRANT_UPLOAD_BATCH_SIZE", "256"))
+        if parallel is None:
+            parallel = int(os.getenv("QDRANT_UPLOAD_PARALLEL", "4"))
+
+        assert len(documents) == len(embeddings)
+        logger.info(
+            f"Bulk uploading {len(documents)} documents over gRPC "
+            f"(batch size {batch_size}, {parallel} workers)"
+        )
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        ids = [self.chunk_id(doc) for doc in documents]
+        payloads = [self._payload(doc, with_content=not self.lean_payloads) for doc in documents]
+        self._store_contents(documents, ids)
+        if self.hybrid:
+            # Named dense + sparse vectors have to be sent point by point
+            sparse_vectors = self.sparse_encoder.encode_documents(
+                [doc.page_content for doc in documents]
+            )
+            vectors = [
+                {"": vector.tolist(), SPARSE_VECTOR_NAME: sparse_vector}
+                for vector, sparse_vector in zip(vectors, sparse_vectors)
+            ]
+
+        client = self._get_bulk_client()
+        client.upload_collection(
+            collection_name=self.collection_name,
+            vectors=vectors,
+            payload=payloads,
+            ids=ids,
+            batch_size=batch_size,
+            parallel=parallel,
+            wait=False,
+        )
+        # Updates are applied in order, so waiting on a last write waits for all of them
+        last_vector = vectors[-1]
+        client.upsert(
+            collection_name=self.collection_name,
+            points=[
+                models.PointStruct(
+                    id=ids[-1],
+                    vector=(
+                        last_vector.tolist() if isinstance(last_vector, np.ndarray) else last_vector
+                    ),
+                    payload=payloads[-1],
+                )
+            ],
+            wait=True,
+        )
+
+        self._bump_collection_version()
+        logger.info(f"Completed bulk upload of {len(documents)} documents")
+
+    def _existing_ids(self, point_ids: List[str], batch_size: int = 1000) -> Set[str]:
+        """Return which of the given point IDs are already stored."""
+        existing = set()
+        for i in range(0, len(point_ids), batch_size):
+            records = self.qdrant_client.retrieve(
+                collection_name=self.collection_name,
+                ids=point_ids[i : i + batch_size],
+                with_payload=False,
+                with_vectors=False,
+            )
+            existing.update(str(record.id) for record in records)
+        return existing
+
+    def _source_point_ids(self, source: str, batch_size: int = 1000) -> Set[Union[int, str]]:
+        """Return the IDs of every point stored for a source document.
+
+        IDs are returned as stored. Collections ingested before content-addressed IDs use
+        integer IDs, which Qdrant only matches as integers.
+        """
+        point_ids = set()
+        offset = None
+        while True:
+            records, offset = self.qdrant_client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=SearchFilter(match={"source": source}).to_qdrant(),
+                limit=batch_size,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False,
+            )
+            point_ids.update(record.id for record in records)
+            if offset is None:
+                return point_ids
+
+    def sync_documents(
+        self, documents, embed_documents: Callable[[list], List[List[float]]]
+    ) -> Dict[str, int]:
+        """Incrementally ingest documents, touching only chunks that changed.
+
+        New or changed chunks are embedded and upserted. Points of the ingested sources whose
+        chunk no longer exists are deleted. Unchanged chunks are neither embedded nor sent.
+
+        Args:
+            documents: All current chunks of the sources being (re-)ingested
+            embed_documents: Function embedding a list of documents, e.g.
+                EmbeddingGenerator.generate_embeddings_batch
+
+        Returns:
+            Counts of added, unchanged and deleted chunks
+        """
+        chunks = {}
+        for doc in documents:
+            chunks.setdefault(self.chunk_id(doc), doc)
+
+        existing = self._existing_ids(list(chunks))
+        new_docs = [doc for point_id, doc in chunks.items() if point_id not in existing]
+        if new_docs:
+            self.add_documents(new_docs, embed_documents(new_docs))
+
+        stale_ids = []
+        for source in {doc.metadata["source"] for doc in documents}:
+            stale_ids.extend(
+                point_id
+                for point_id in self._source_point_ids(source)
+                if str(point_id) not in chunks
+            )
+        if stale_ids:
+            self.qdrant_client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.PointIdsList(points=stale_ids),
+                wait=True,
+            )
+            if self.content_store is not None:
+                self.content_store.delete_many([str(point_id) for point_id in stale_ids])
+            if not new_docs:
+                self._bump_collection_version()
+
+        stats = {
+            "added": len(new_docs),
+            "unchanged": len(chunks) - len(new_docs),
+            "deleted": len(stale_ids),
+        }
+        logger.info(f"Synced {len(chunks)} chunks to vector store: {stats}")
+        return stats
+
+    def _bump_collection_version(self):
+        """Record a new ingest version in the collection metadata."""
+        self._local_version += 1
+        ingest_version = uuid.uuid4().hex
+        try:
+            self.qdrant_client.update_collection(
+                collection_name=self.collection_name,
+                metadata={"ingest_version": ingest_version},
+            )
+            self._remote_version = ingest_version
+            self._remote_version_read_at = time.monotonic()
+        except Exception as e:
+            # Older Qdrant servers have no collection metadata, fall back to this process
+            logger.warning(f"Could not store ingest version in collection metadata: {str(e)}")
+
+    def get_collection_version(self) -> str:
+        """Return an identifier that changes whenever the collection is re-ingested.
+
+        Ingests through this store update the version in process. The version stored in
+        Qdrant is only read again once it is older than version_ttl_seconds, so the lookup
+        stays off the request path.
+        """
+        if (
+            self._remote_version is None
+            or time.monotonic() - self._remote_version_read_at > self.version_ttl_seconds
+        ):
+            remote_version = "0"
+            try:
+                info = self.qdrant_client.get_collection(self.collection_name)
+                metadata = getattr(info.config, "metadata", None) or {}
+                remote_version = str(metadata.get("ingest_version", "0"))
+            except Exception as e:
+                logger.warning(f"Could not read collection version: {str(e)}")
+            self._remote_version = remote_version
+            self._remote_version_read_at = time.monotonic()
+        return f"{self._remote_version}.{self._local_version}"
+
+    @staticmethod
+    def _build_filter(
+        filter_conditions: Optional[Union[SearchFilter, Dict[str, Any]]],
+    ) -> Optional[models.Filter]:
+        """Build a Qdrant filter from a SearchFilter or a dict of exact matches."""
+        if not filter_conditions:
+            return None
+        if not isinstance(filter_conditions, SearchFilter):
+            # Payload fields are stored at the top level, not under 'metadata'
+            filter_conditions = SearchFilter(match=filter_conditions)
+        return filter_conditions.to_qdrant()
+
     def search(
         self,
         query_embedding: List[float],
         top_k: int = 5,
-        filter_conditions: Optional[Dict[str, Any]] = None,
+        filter_conditions: Optional[Union[SearchFilter, Dict[str, Any]]] = None,
         with_content: bool = True,
+        query_text: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Search for similar documents.
 
         Args:
             query_embedding: Search query embedding
             top_k: Number of results to return
-            filter_conditions: Optional filter conditions for metadata
+            filter_conditions: Optional SearchFilter, or dict of exact matches on metadata
             with_content: Whether to include full content in payload
+            query_text: Query text for the BM25 search, hybrid search needs it
 
         Returns:
             List of search results with scores and metadata
         """
-        # Build filter
-        query_filter = None
-        if filter_conditions:
-            must_conditions = []
-            for key, value in filter_conditions.items():
-                must_conditions.append(
-                    models.FieldCondition(
-                        key=f"metadata.{key}", match=models.MatchValue(value=value)
-                    )
-                )
-
-            if must_conditions:
-                query_filter = models.Filter(must=must_conditions)
+        if self.hybrid and query_text is not None:
+            return self.search_batch(
+                [query_embedding], top_k, filter_conditions, with_content, [query_text]
+            )[0]
 
         # Perform search
         search_result = self.qdrant_client.query_points(
             collection_name=self.collection_name,
             query=query_embedding,
-            query_filter=query_filter,
+            query_filter=self._build_filter(filter_conditions),
+            search_params=self._search_params(),
             limit=top_k,
             with_vectors=False,  # Exclude vectors from results
-            with_payload=True,  # Include payload in response
+            with_payload=self._payload_selector(with_content),
         ).points
 
         return search_result
 
+    def search_batch(
+        self,
+        query_embeddings,
+        top_k: int = 5,
+        filter_conditions: Optional[Union[SearchFilter, Dict[str, Any]]] = None,
+        with_content: bool = True,
+        query_texts: Optional[List[str]] = None,
+    ) -> List[List[Any]]:
+        """Search for several query embeddings in a single request.
+
+        With hybrid search enabled and `query_texts` given, every query runs a dense and a
+        BM25 search in the same request and their results are fused.
+
+        Args:
+            query_embeddings: Matrix of query embeddings, one row per query
+            top_k: Number of results to return per query
+            filter_conditions: Optional SearchFilter, or dict of exact matches on metadata,
+                applied to every query
+            with_content: Whether to include full content in payload
+            query_texts: Query texts for the BM25 search, one per embedding
+
+        Returns:
+            One list of search results per query, in the order of `query_embeddings`
+        """
+        if len(query_embeddings) == 0:
+            return []
+
+        requests = self._batch_requests(
+            query_embeddings, top_k, filter_conditions, with_content, query_texts
+        )
+        responses = self.qdrant_client.query_batch_points(
+            collection_name=self.collection_name, requests=requests
+        )
+        return self._batch_results(responses, top_k, query_texts)
+
+    def _get_async_client(self) -> AsyncQdrantClient:
+        """Async client shared by every asearch call, so its HTTP connections are reused."""
+        if self._async_client is None:
+            self._async_client = AsyncQdrantClient(url=self.qdrant_url)
+        return self._async_client
+
+    async def asearch(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filter_conditions: Optional[Union[SearchFilter, Dict[str, Any]]] = None,
+        with_content: bool = True,
+        query_text: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async version of search, awaiting Qdrant instead of blocking the thread."""
+        if self.hybrid and query_text is not None:
+            return (
+                await self.asearch_batch(
+                    [query_embedding], top_k, filter_conditions, with_content, [query_text]
+                )
+            )[0]
+
+        response = await self._get_async_client().query_points(
+            collection_name=self.collection_name,
+            query=[float(x) for x in query_embedding],
+            query_filter=self._build_filter(filter_conditions),
+            search_params=self._search_params(),
+            limit=top_k,
+            with_vectors=False,
+            with_payload=self._payload_selector(with_content),
+        )
+        return response.points
+
+    async def asearch_batch(
+        self,
+        query_embeddings,
+        top_k: int = 5,
+        filter_conditions: Optional[Union[SearchFilter, Dict[str, Any]]] = None,
+        with_content: bool = True,
+        query_texts: Optional[List[str]] = None,
+    ) -> List[List[Any]]:
+        """Async version of search_batch, all queries still go in a single request."""
+        if len(query_embeddings) == 0:
+            return []
+
+        requests = self._batch_requests(
+            query_embeddings, top_k, filter_conditions, with_content, query_texts
+        )
+        responses = await self._get_async_client().query_batch_points(
+            collection_name=self.collection_name, requests=requests
+        )
+        return self._batch_results(responses, top_k, query_texts)
+
+    async def aclose(self):
+        """Close the async client and its connections."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    @staticmethod
+    def _payload_selector(with_content: bool):
+        """Request the whole payload, or everything but the chunk text."""
+        if with_content:
+            return True
+        return models.PayloadSelectorExclude(exclude=["content"])
+
+    def _batch_requests(
+        self, query_embeddings, top_k, filter_conditions, with_content, query_texts
+    ) -> List[models.QueryRequest]:
+        """Build the batch query requests shared by search_batch and asearch_batch."""
+        with_payload = self._payload_selector(with_content)
+        query_filter = self._build_filter(filter_conditions)
+        search_params = self._search_params()
+        hybrid = self.hybrid and query_texts is not None
+        requests = []
+        for i, embedding in enumerate(query_embeddings):
+            dense_query = [float(x) for x in embedding]
+            if not hybrid:
+                requests.append(
+                    models.QueryRequest(
+                        query=dense_query,
+                        filter=query_filter,
+                        params=search_params,
+                        limit=top_k,
+                        with_vector=False,
+                        with_payload=with_payload,
+                    )
+                )
+                continue
+
+            sparse_query = self.sparse_encoder.encode_query(query_texts[i])
+            if self.fusion == "rrf":
+                # Both searches and the fusion run inside Qdrant
+                requests.append(
+                    models.QueryRequest(
+                        prefetch=[
+                            models.Prefetch(
+                                query=dense_query,
+                                filter=query_filter,
+                                params=search_params,
+                                limit=self.prefetch_limit,
+                            ),
+                            models.Prefetch(
+                                query=sparse_query,
+                                using=SPARSE_VECTOR_NAME,
+                                filter=query_filter,
+                                limit=self.prefetch_limit,
+                            ),
+                        ],
+                        query=models.FusionQuery(fusion=models.Fusion.RRF),
+                        limit=top_k,
+                        with_vector=False,
+                        with_payload=with_payload,
+                    )
+                )
+            else:
+                # Qdrant has no weighted fusion, fetch both lists in the batch and fuse here
+                requests.append(
+                    models.QueryRequest(
+                        query=dense_query,
+                        filter=query_filter,
+                        params=search_params,
+                        limit=self.prefetch_limit,
+                        with_vector=False,
+                        with_payload=with_payload,
+                    )
+                )
+                requests.append(
+                    models.QueryRequest(
+                        query=sparse_query,
+                        using=SPARSE_VECTOR_NAME,
+                        filter=query_filter,
+                        limit=self.prefetch_limit,
+                        with_vector=False,
+                        with_payload=with_payload,
+                    )
+                )
+
+        return requests
+
+    def _batch_results(self, responses, top_k, query_texts) -> List[List[Any]]:
+        """Split batch responses per query, fusing dense and BM25 lists in weighted mode."""
+        results = [response.points for response in responses]
+        if self.hybrid and query_texts is not None and self.fusion == "weighted":
+            return [
+                self._weighted_fusion(results[i], results[i + 1], top_k)
+                for i in range(0, len(results), 2)
+            ]
+        return results
+
+    def _weighted_fusion(self, dense_points, sparse_points, top_k: int) -> List[Any]:
+        """Rank points by the weighted sum of their max-normalized dense and BM25 scores."""
+        fused = {}
+        for points, weight in (
+            (dense_points, self.vector_weight),
+            (sparse_points, self.keyword_weight),
+        ):
+            if not points:
+                continue
+            max_score = max(point.score for point in points)
+            if max_score <= 0:
+                max_score = 1.0
+            for point in points:
+                entry = fused.setdefault(point.id, [point, 0.0])
+                entry[1] += weight * point.score / max_score
+
+        ranked = sorted(fused.values(), key=lambda entry: entry[1], reverse=True)[:top_k]
+        return [point.model_copy(update={"score": score}) for point, score in ranked]
+
 
 # docker run -p 6333:6333 -p 6334:6334 \
 #     -v "$(pwd)/qdrant_storage:/qdrant/storage:z" \
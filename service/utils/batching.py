@@ -0,0 +1,29 @@
+"""
+Helpers for packing variable-length inputs into padded batches.
+"""
+
+from typing import List
+
+
+def length_buckets(lengths: List[int], max_tokens_per_batch: int) -> List[List[int]]:
+    """Group indices of similar length so that batch_size * longest <= token budget.
+
+    Args:
+        lengths: Token length of each input.
+        max_tokens_per_batch: Budget of padded tokens per forward pass.
+
+    Returns:
+        Lists of indices into `lengths`, shortest inputs first. An input longer than the
+        budget gets a batch of its own.
+    """
+    buckets = []
+    current = []
+    for idx in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        # Lengths are ascending, so the new item is always the longest in the bucket
+        if current and (len(current) + 1) * lengths[idx] > max_tokens_per_batch:
+            buckets.append(current)
+            current = []
+        current.append(idx)
+    if current:
+        buckets.append(current)
+    return buckets
@@ -13,8 +13,21 @@ class VectorStoreConfig(BaseModel):
     collection_name: str = "documents"
     vector_size: int = 384  # Default for BAAI/bge-small-en-v1.5
     distance: str = "Cosine"
-    on_disk: bool = True
+    # Memory-mapped vectors trade search latency for RAM, opt in with QDRANT_ON_DISK=true
+    on_disk: bool = Field(
+        default_factory=lambda: os.getenv("QDRANT_ON_DISK", "false").lower() == "true"
+    )
+    on_disk_payload: bool = False
     url: str = Field(default_factory=lambda: os.getenv("QDRANT_URL"))
+    # HNSW index, None keeps the Qdrant defaults (m=16, ef_construct=100, hnsw_ef=ef_construct)
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    hnsw_ef: Optional[int] = None
+    # Quantization: None, "scalar" (int8) or "binary", rescored with the original vectors
+    quantization: Optional[str] = None
+    quantization_always_ram: bool = True
+    rescore: bool = True
+    oversampling: Optional[float] = None
 
 
 class EmbeddingConfig(BaseModel):
@@ -31,9 +44,19 @@ class RetrieverConfig(BaseModel):
     """Configuration for the retriever."""
 
     top_k: int = 5
-    use_hybrid: bool = True
+    # None follows the collection schema (hybrid only if it has BM25 sparse vectors),
+    # set RETRIEVER_HYBRID=true to create new collections with them
+    use_hybrid: Optional[bool] = Field(
+        default_factory=lambda: (
+            os.getenv("RETRIEVER_HYBRID").lower() == "true"
+            if os.getenv("RETRIEVER_HYBRID")
+            else None
+        )
+    )
     vector_weight: float = 0.7
     keyword_weight: float = 0.3
+    fusion: str = "rrf"  # "rrf" (server-side) or "weighted" (vector/keyword weights)
+    prefetch_limit: int = 20
 
 
 class AgentConfig(BaseModel):
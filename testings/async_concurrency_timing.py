@@ -0,0 +1,165 @@
+"""
+Throughput of many concurrent RAG conversations on the sync MainGraph (one thread per
+in-flight conversation) versus the async MainGraph (all conversations on one event loop).
+
+Agents, retrieval and reranking are stubbed with fixed sleeps standing in for network waits,
+and checkpoints go to an in-memory saver, so only the execution model differs.
+
+Usage:
+    python testings/async_concurrency_timing.py --conversations 300 --threads 32
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from langchain_core.messages import AIMessage  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from agents.chat_agent import ChatAgentResponse  # noqa: E402
+from agents.input_agent import GuardrailOutput  # noqa: E402
+from agents.query_agent import SearchQueryList  # noqa: E402
+from orchestrator.main_graph_node import MainGraph  # noqa: E402
+from states.graph_states import ContextSchema, QueryResult  # noqa: E402
+
+# Seconds of network wait per call
+LLM_DELAY = 0.2
+RETRIEVAL_DELAY = 0.1
+QUERY = "What happens after a flagrant foul 2?"
+
+
+class StubAgent:
+    def __init__(self, output):
+        self.output = output
+
+    def run(self, *args, **kwargs):
+        time.sleep(LLM_DELAY)
+        return self.output
+
+    async def arun(self, *args, **kwargs):
+        await asyncio.sleep(LLM_DELAY)
+        return self.output
+
+    def answer(self, *args, **kwargs):
+        return self.run()
+
+    async def aanswer(self, *args, **kwargs):
+        return await self.arun()
+
+
+class StubRetrieval:
+    @staticmethod
+    def _results(subqueries):
+        return [QueryResult(subquery=q, search_result=[], memories=[]) for q in subqueries]
+
+    def retrieve_batch(self, subqueries, user_id):
+        time.sleep(RETRIEVAL_DELAY)
+        return self._results(subqueries)
+
+    async def aretrieve_batch(self, subqueries, user_id):
+        await asyncio.sleep(RETRIEVAL_DELAY)
+        return self._results(subqueries)
+
+
+def build_graph(async_nodes: bool) -> MainGraph:
+    """MainGraph wired to the stubs, without OpenAI, models, Qdrant or Postgres."""
+    main_graph = MainGraph.__new__(MainGraph)
+    main_graph.input_agent = StubAgent(GuardrailOutput(classification="safe"))
+    main_graph.chat_agent = StubAgent(ChatAgentResponse(use_rag=True, message="rules"))
+    main_graph.query_agent = StubAgent(SearchQueryList(queries=[QUERY]))
+    main_graph.response_agent = StubAgent(AIMessage(content="stub"))
+    main_graph.retrieval = StubRetrieval()
+    main_graph.retrieval_mode = "batch"
+    main_graph.speculative = False
+    main_graph.speculation = None
+    main_graph.model_executor = ThreadPoolExecutor(max_workers=2)
+    main_graph._rerank_sub_results = lambda query, sub_results: {
+        "sub_results": sub_results,
+        "metrics": {},
+    }
+    main_graph.checkpointer = InMemorySaver()
+    main_graph.async_nodes = async_nodes
+    main_graph.graph = main_graph._build_graph()
+    return main_graph
+
+
+def turn_input():
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    return {"query": QUERY}, config, ContextSchema(user_id="timing")
+
+
+class ThreadSampler:
+    """Records the peak number of live threads while running."""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_sync(main_graph: MainGraph, conversations: int, threads: int):
+    def turn(_):
+        state, config, context = turn_input()
+        return main_graph.graph.invoke(state, config=config, context=context)
+
+    with ThreadSampler() as sampler, ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        outputs = list(pool.map(turn, range(conversations)))
+        elapsed = time.perf_counter() - start
+    return elapsed, sampler.peak, outputs
+
+
+async def run_async(main_graph: MainGraph, conversations: int):
+    async def turn():
+        state, config, context = turn_input()
+        return await main_graph.graph.ainvoke(state, config=config, context=context)
+
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        outputs = await asyncio.gather(*(turn() for _ in range(conversations)))
+        elapsed = time.perf_counter() - start
+    return elapsed, sampler.peak, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--conversations", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=32, help="Threads of the sync runner")
+    args = parser.parse_args()
+
+    turn_time = 4 * LLM_DELAY + RETRIEVAL_DELAY
+    print(f"{args.conversations} conversations, {turn_time:.2f}s of waits per turn")
+    print(f"{'mode':>6} {'wall s':>8} {'turns/s':>8} {'peak threads':>13} {'ok':>4}")
+    for mode in ("sync", "async"):
+        main_graph = build_graph(async_nodes=mode == "async")
+        if mode == "sync":
+            elapsed, peak, outputs = run_sync(main_graph, args.conversations, args.threads)
+        else:
+            elapsed, peak, outputs = asyncio.run(run_async(main_graph, args.conversations))
+        ok = all(output["final_result"] == "stub" for output in outputs)
+        print(
+            f"{mode:>6} {elapsed:>8.2f} {args.conversations / elapsed:>8.1f} {peak:>13} "
+            f"{str(ok):>4}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Latency and throughput of the embedding backends on CPU: PyTorch, ONNX Runtime and
+int8-quantized ONNX Runtime.
+
+Usage:
+    python testings/bench_embedding_backends.py --threads 4 --batch-size 32
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from embedding_backend_parity import load_fixture_texts  # noqa: E402
+from tools.embedding_generator import EmbeddingGenerator  # noqa: E402
+
+BACKENDS = {
+    "torch": {"backend": "torch"},
+    "onnx": {"backend": "onnx"},
+    "onnx-int8": {"backend": "onnx", "onnx_quantize": True},
+}
+
+
+def bench(generator: EmbeddingGenerator, texts: list[str], batch_size: int, repeats: int):
+    generator.generate_embedding(texts[:batch_size])  # warm up
+
+    latencies = []
+    for _ in range(repeats):
+        for text in texts[:8]:
+            start = time.perf_counter()
+            generator.generate_embedding([text])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for i in range(0, len(texts), batch_size):
+            generator.generate_embedding(texts[i : i + batch_size])
+    throughput = repeats * len(texts) / (time.perf_counter() - start)
+
+    latencies.sort()
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    return statistics.median(latencies), p95, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="Qwen/Qwen3-Embedding-0.6B")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+
+        torch.set_num_threads(args.threads)
+
+    texts = load_fixture_texts()
+    print(f"{'backend':>10} {'p50 ms':>8} {'p95 ms':>8} {'texts/s':>9}")
+    for name in args.backends:
+        generator = EmbeddingGenerator(
+            args.model,
+            device="cpu",
+            onnx_num_threads=args.threads,
+            use_cache=False,
+            use_scheduler=False,
+            **BACKENDS[name],
+        )
+        p50, p95, throughput = bench(generator, texts, args.batch_size, args.repeats)
+        print(f"{name:>10} {p50:>8.1f} {p95:>8.1f} {throughput:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Docs/sec scaling of the multi-process embedding pool from 1 to N workers, against the
+single-process `generate_embeddings_batch` path.
+
+Usage:
+    python testings/bench_embedding_pool.py --docs 2000 --workers 1 2 4 8 --threads 1
+    python testings/bench_embedding_pool.py --pdf data/nba_rulebook.pdf
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from embedding_backend_parity import load_fixture_texts  # noqa: E402
+from tools.embedding_generator import EmbeddingGenerator  # noqa: E402
+from tools.embedding_pool import EmbeddingProcessPool  # noqa: E402
+from tools.loader import Document, DocumentLoader  # noqa: E402
+
+
+def build_corpus(num_docs: int, pdf_path: str = None) -> list[Document]:
+    if pdf_path:
+        loader = DocumentLoader()
+        return loader.split_documents(loader.load_pdf(pdf_path))
+    passages = load_fixture_texts()
+    return [
+        Document(page_content=f"{passages[i % len(passages)]} (chunk {i})") for i in range(num_docs)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="Qwen/Qwen3-Embedding-0.6B")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--pdf", default=None)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    documents = build_corpus(args.docs, args.pdf)
+    print(f"Corpus: {len(documents)} chunks")
+
+    generator = EmbeddingGenerator(args.model, device="cpu", use_cache=False, use_scheduler=False)
+    start = time.perf_counter()
+    generator.generate_embeddings_batch(documents, batch_size=args.batch_size)
+    baseline = len(documents) / (time.perf_counter() - start)
+    del generator
+
+    print(f"{'mode':>22} {'docs/s':>9} {'speedup':>9}")
+    print(f"{'single process':>22} {baseline:>9.1f} {1.0:>8.2f}x")
+    for num_workers in args.workers:
+        with EmbeddingProcessPool(
+            args.model,
+            num_workers=num_workers,
+            threads_per_worker=args.threads,
+            batch_size=args.batch_size,
+        ) as pool:
+            start = time.perf_counter()
+            pool.embed_documents(documents)
+            rate = len(documents) / (time.perf_counter() - start)
+        label = f"{num_workers} workers x {args.threads} thr"
+        print(f"{label:>22} {rate:>9.1f} {rate / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
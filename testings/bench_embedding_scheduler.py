@@ -0,0 +1,69 @@
+"""
+Throughput of single-query embeddings versus concurrency, comparing the per-call path
+(`generate_embedding`) against the micro-batching scheduler (`embed_query`).
+
+Usage:
+    python testings/bench_embedding_scheduler.py --requests 256 --concurrency 1 4 16 64
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from tools.embedding_generator import EmbeddingGenerator  # noqa: E402
+from tools.embedding_scheduler import EmbeddingScheduler  # noqa: E402
+
+QUERIES = [
+    "What is a shot clock violation?",
+    "How many timeouts does each team get per game?",
+    "When is a player disqualified for personal fouls?",
+    "What counts as goaltending?",
+    "How long can a player stay in the lane?",
+    "What is a flagrant foul penalty 2?",
+    "When does the coach's challenge apply?",
+    "What happens on a jump ball violation?",
+]
+
+
+def run(embed_fn, num_requests: int, concurrency: int) -> float:
+    # Unique texts so the embedding cache never short-circuits the forward pass
+    texts = [f"{QUERIES[i % len(QUERIES)]} #{i}" for i in range(num_requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(embed_fn, texts))
+    return num_requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="Qwen/Qwen3-Embedding-0.6B")
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    generator = EmbeddingGenerator(args.model, device="cpu", use_cache=False, use_scheduler=False)
+    scheduler = EmbeddingScheduler(
+        generator.generate_embedding,
+        max_wait_ms=args.max_wait_ms,
+        max_batch_size=args.max_batch_size,
+    )
+    generator.generate_embedding(QUERIES)  # warm up
+
+    print(f"{'concurrency':>12} {'per-call q/s':>14} {'batched q/s':>13} {'speedup':>9}")
+    for concurrency in args.concurrency:
+        direct = run(generator.generate_embedding, args.requests, concurrency)
+        batched = run(scheduler.embed, args.requests, concurrency)
+        print(f"{concurrency:>12} {direct:>14.1f} {batched:>13.1f} {batched / direct:>8.2f}x")
+
+    print(f"Scheduler stats: {scheduler.stats()}")
+    scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Search response size and latency with full payloads (chunk text stored in Qdrant) versus lean
+payloads (metadata only, text fetched from the local ChunkContentStore for the chunks that
+survive reranking).
+
+Needs a running Qdrant server. Response bytes are measured on the raw REST query endpoint,
+latencies through QdrantVectorStore.search.
+
+Usage:
+    python testings/bench_lean_payloads.py --points 20000 --top-k 10 --survivors 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from tools.content_store import ChunkContentStore  # noqa: E402
+from tools.loader import Document  # noqa: E402
+from tools.vector_store import QdrantVectorStore  # noqa: E402
+
+
+def make_corpus(num_points: int, dim: int, chunk_chars: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((num_points, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    filler = "The ball is dead when a foul is called and play resumes with a throw-in. "
+    text = (filler * (chunk_chars // len(filler) + 1))[:chunk_chars]
+    documents = [
+        Document(
+            page_content=f"Chunk {i}. {text}",
+            metadata={"source": "rules.pdf", "page": i // 20, "chunk_index": i},
+        )
+        for i in range(num_points)
+    ]
+    return documents, vectors
+
+
+def response_bytes(url: str, collection_name: str, query: np.ndarray, top_k: int) -> int:
+    body = json.dumps({"query": query.tolist(), "limit": top_k, "with_payload": True}).encode()
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/collections/{collection_name}/points/query",
+        data=body,
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return len(response.read())
+
+
+def bench(store: QdrantVectorStore, args, queries):
+    latencies = []
+    fetch_latencies = []
+    sizes = []
+    for query in queries:
+        sizes.append(response_bytes(args.url, store.collection_name, query, args.top_k))
+
+        start = time.perf_counter()
+        results = store.search(query.tolist(), top_k=args.top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        # The texts of the chunks kept after reranking
+        start = time.perf_counter()
+        if store.lean_payloads:
+            store.fetch_contents([str(point.id) for point in results[: args.survivors]])
+        fetch_latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    fetch_latencies.sort()
+    return {
+        "bytes": float(np.mean(sizes)),
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "fetch_p50": fetch_latencies[len(fetch_latencies) // 2],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.getenv("QDRANT_URL", "http://localhost:6333"))
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--chunk-chars", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--survivors", type=int, default=4, help="Chunks kept after reranking")
+    args = parser.parse_args()
+
+    documents, vectors = make_corpus(args.points, args.dim, args.chunk_chars)
+    queries = vectors[np.random.default_rng(1).integers(0, args.points, args.queries)]
+
+    print(f"{'layout':>8} {'bytes/query':>12} {'p50 ms':>8} {'p95 ms':>8} {'fetch p50 ms':>13}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for layout in ("full", "lean"):
+            lean = layout == "lean"
+            store = QdrantVectorStore(
+                f"bench_payload_{layout}",
+                vector_size=args.dim,
+                qdrant_url=args.url,
+                lean_payloads=lean,
+                content_store=(
+                    ChunkContentStore(str(Path(tmp_dir) / "content.db")) if lean else None
+                ),
+            )
+            try:
+                store.add_documents_bulk(documents, vectors)
+                result = bench(store, args, queries)
+            finally:
+                store.qdrant_client.delete_collection(store.collection_name)
+            print(
+                f"{layout:>8} {result['bytes']:>12.0f} {result['p50']:>8.2f} "
+                f"{result['p95']:>8.2f} {result['fetch_p50']:>13.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
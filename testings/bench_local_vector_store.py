@@ -0,0 +1,161 @@
+"""
+Ingestion time, search latency and recall of the embedded LocalVectorStore (exact NumPy and
+optional HNSW search) against Qdrant local mode, at growing collection sizes.
+
+1M vectors of 1024 dimensions take 4 GB per copy, use --dim to scale down on small machines.
+
+Usage:
+    python testings/bench_local_vector_store.py --sizes 10000 100000 1000000 --dim 1024
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from qdrant_client import QdrantClient, models  # noqa: E402
+from tools.loader import Document  # noqa: E402
+from tools.local_vector_store import LocalVectorStore  # noqa: E402
+
+
+def make_data(num_points: int, num_queries: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((num_points, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[rng.integers(0, num_points, num_queries)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    documents = [
+        Document(
+            page_content=f"chunk {i}",
+            metadata={"source": "rules.pdf", "page": i // 20, "chunk_index": i},
+        )
+        for i in range(num_points)
+    ]
+    return documents, vectors, queries
+
+
+def timed_searches(search_fn, queries):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search_fn(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return results, latencies[len(latencies) // 2], latencies[int(0.95 * (len(latencies) - 1))]
+
+
+def bench_local(index, data_dir, documents, vectors, queries, top_k):
+    start = time.perf_counter()
+    store = LocalVectorStore("bench", vectors.shape[1], data_dir=data_dir, index=index)
+    for i in range(0, len(documents), 10000):
+        store.add_documents(documents[i : i + 10000], vectors[i : i + 10000])
+    ingest = time.perf_counter() - start
+
+    results, p50, p95 = timed_searches(lambda q: store.search(q, top_k=top_k), queries)
+    store.close()
+
+    start = time.perf_counter()
+    reopened = LocalVectorStore("bench", vectors.shape[1], data_dir=data_dir, index=index)
+    reopen = time.perf_counter() - start
+    reopened.close()
+    return (
+        [[hit.payload["chunk_index"] for hit in hits] for hits in results],
+        ingest,
+        p50,
+        p95,
+        reopen,
+    )
+
+
+def bench_qdrant_local(data_dir, documents, vectors, queries, top_k):
+    start = time.perf_counter()
+    client = QdrantClient(path=data_dir)
+    client.create_collection(
+        "bench",
+        vectors_config=models.VectorParams(size=vectors.shape[1], distance=models.Distance.COSINE),
+    )
+    client.upload_collection(
+        "bench",
+        vectors=vectors,
+        payload=({"chunk_index": doc.metadata["chunk_index"]} for doc in documents),
+        ids=range(len(documents)),
+        batch_size=1024,
+    )
+    ingest = time.perf_counter() - start
+
+    results, p50, p95 = timed_searches(
+        lambda q: client.query_points("bench", query=q.tolist(), limit=top_k).points, queries
+    )
+    client.close()
+
+    start = time.perf_counter()
+    QdrantClient(path=data_dir).close()
+    reopen = time.perf_counter() - start
+    return (
+        [[hit.payload["chunk_index"] for hit in hits] for hits in results],
+        ingest,
+        p50,
+        p95,
+        reopen,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument(
+        "--backends", nargs="+", default=["local-exact", "local-hnsw", "qdrant-local"]
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>9} {'backend':>13} {'ingest s':>9} {'reopen s':>9} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {f'recall@{args.top_k}':>10}"
+    )
+    for size in args.sizes:
+        documents, vectors, queries = make_data(size, args.queries, args.dim)
+        scores = queries @ vectors.T
+        truth = np.argsort(-scores, axis=1)[:, : args.top_k]
+        del scores
+
+        for backend in args.backends:
+            data_dir = tempfile.mkdtemp(prefix="bench_vector_store_")
+            try:
+                if backend == "qdrant-local":
+                    result = bench_qdrant_local(data_dir, documents, vectors, queries, args.top_k)
+                else:
+                    index = backend.split("-", 1)[1]
+                    try:
+                        result = bench_local(
+                            index, data_dir, documents, vectors, queries, args.top_k
+                        )
+                    except ImportError as e:
+                        print(f"{size:>9} {backend:>13} skipped: {e}")
+                        continue
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+            hits, ingest, p50, p95, reopen = result
+            recall = np.mean(
+                [
+                    len(set(found) & set(expected)) / args.top_k
+                    for found, expected in zip(hits, truth)
+                ]
+            )
+            print(
+                f"{size:>9} {backend:>13} {ingest:>9.2f} {reopen:>9.2f} {p50:>8.2f} "
+                f"{p95:>8.2f} {recall:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
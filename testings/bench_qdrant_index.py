@@ -0,0 +1,165 @@
+"""
+Recall@k against exact search, p50/p95 search latency and memory of Qdrant collection settings:
+HNSW parameters, on-disk storage and scalar/binary quantization with rescoring.
+
+Needs a running Qdrant server (local mode has no HNSW index). Each setting gets its own
+collection, which is deleted again before the next one so the server RSS delta is
+attributable to it.
+
+Usage:
+    python testings/bench_qdrant_index.py --url http://localhost:6333 --points 50000 --top-k 5
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Optional
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from qdrant_client import models  # noqa: E402
+from tools.vector_store import QdrantVectorStore  # noqa: E402
+
+SETTINGS = {
+    "default": {},
+    "hnsw-m32": {"hnsw_m": 32, "hnsw_ef_construct": 256, "hnsw_ef": 128},
+    "on-disk": {"on_disk": True, "on_disk_payload": True},
+    "scalar": {"quantization": "scalar", "oversampling": 2.0},
+    "scalar-on-disk": {"quantization": "scalar", "on_disk": True, "oversampling": 2.0},
+    "binary": {"quantization": "binary", "oversampling": 3.0},
+}
+
+
+def make_data(num_points: int, num_queries: int, dim: int, seed: int = 0):
+    """Normalized vectors drawn around random centroids, queries perturbed from points."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((max(1, num_points // 100), dim)).astype(np.float32)
+    labels = rng.integers(0, len(centroids), num_points)
+    points = centroids[labels] + 0.5 * rng.standard_normal((num_points, dim)).astype(np.float32)
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+
+    queries = points[rng.integers(0, num_points, num_queries)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(dim)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return points, queries
+
+
+def exact_top_k(points: np.ndarray, queries: np.ndarray, top_k: int) -> np.ndarray:
+    scores = queries @ points.T
+    top = np.argpartition(-scores, top_k, axis=1)[:, :top_k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def server_rss_bytes(url: str) -> Optional[int]:
+    """Resident memory of the Qdrant process from its Prometheus endpoint, if exposed."""
+    try:
+        with urllib.request.urlopen(f"{url.rstrip('/')}/metrics", timeout=5) as response:
+            text = response.read().decode("utf-8")
+    except Exception:
+        return None
+    match = re.search(r"^memory_resident_bytes\s+(\d+)", text, re.MULTILINE)
+    return int(match.group(1)) if match else None
+
+
+def estimated_ram_bytes(num_points: int, dim: int, setting: dict) -> int:
+    """RAM the setting needs for vectors, quantized vectors and the HNSW graph."""
+    ram = 0 if setting.get("on_disk") else num_points * dim * 4
+    quantization = setting.get("quantization")
+    if quantization and setting.get("quantization_always_ram", True):
+        ram += num_points * (dim if quantization == "scalar" else dim // 8)
+    # Level 0 of the graph holds up to 2 * m links of 4 bytes per point
+    ram += num_points * 2 * setting.get("hnsw_m", 16) * 4
+    return ram
+
+
+def wait_until_indexed(store: QdrantVectorStore, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = store.qdrant_client.get_collection(store.collection_name)
+        if info.status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(1)
+    raise TimeoutError(f"Collection {store.collection_name} was not indexed in {timeout}s")
+
+
+def bench_setting(name, setting, args, points, queries, truth):
+    collection_name = f"bench_index_{name}"
+    rss_before = server_rss_bytes(args.url)
+    store = QdrantVectorStore(
+        collection_name, vector_size=points.shape[1], qdrant_url=args.url, **setting
+    )
+    try:
+        store.qdrant_client.upload_collection(
+            collection_name=collection_name,
+            vectors=points,
+            ids=range(len(points)),
+            batch_size=256,
+            wait=True,
+        )
+        wait_until_indexed(store, args.index_timeout)
+
+        for query in queries[:10]:  # warm up
+            store.search(query.tolist(), top_k=args.top_k)
+
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            results = store.search(query.tolist(), top_k=args.top_k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len({point.id for point in results} & set(expected.tolist()))
+
+        rss_after = server_rss_bytes(args.url)
+    finally:
+        if not args.keep:
+            store.qdrant_client.delete_collection(collection_name)
+
+    latencies.sort()
+    rss_delta = None
+    if rss_before is not None and rss_after is not None:
+        rss_delta = (rss_after - rss_before) / 2**20
+    return {
+        "recall": hits / (len(queries) * args.top_k),
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "estimated_mb": estimated_ram_bytes(len(points), points.shape[1], setting) / 2**20,
+        "rss_delta_mb": rss_delta,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.getenv("QDRANT_URL", "http://localhost:6333"))
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--settings", nargs="+", default=list(SETTINGS), choices=list(SETTINGS))
+    parser.add_argument("--index-timeout", type=float, default=600)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections")
+    args = parser.parse_args()
+
+    points, queries = make_data(args.points, args.queries, args.dim)
+    truth = exact_top_k(points, queries, args.top_k)
+
+    print(
+        f"{'setting':>16} {f'recall@{args.top_k}':>10} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'est. RAM MB':>12} {'RSS delta MB':>13}"
+    )
+    for name in args.settings:
+        result = bench_setting(name, SETTINGS[name], args, points, queries, truth)
+        rss = "n/a" if result["rss_delta_mb"] is None else f"{result['rss_delta_mb']:.1f}"
+        print(
+            f"{name:>16} {result['recall']:>10.3f} {result['p50']:>8.2f} {result['p95']:>8.2f} "
+            f"{result['estimated_mb']:>12.1f} {rss:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
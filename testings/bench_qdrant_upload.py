@@ -0,0 +1,91 @@
+"""
+Ingestion throughput into Qdrant: the sequential REST `add_documents` path versus the
+parallel gRPC `add_documents_bulk` path, on a synthetic corpus with precomputed vectors.
+
+Needs a running Qdrant server with the gRPC port exposed (docker run -p 6333:6333 -p 6334:6334).
+
+Usage:
+    python testings/bench_qdrant_upload.py --points 100000 --batch-sizes 256 1024 --parallel 1 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from tools.loader import Document  # noqa: E402
+from tools.vector_store import QdrantVectorStore  # noqa: E402
+
+
+def make_corpus(num_points: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((num_points, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    documents = [
+        Document(
+            page_content=f"Synthetic rule chunk {i}: " + "lorem ipsum " * 50,
+            metadata={"source": f"rulebook_{i // 10000}.pdf", "page": i // 20, "chunk_index": i},
+        )
+        for i in range(num_points)
+    ]
+    return documents, vectors
+
+
+def run(name, upload, args, documents, vectors) -> float:
+    collection_name = f"bench_upload_{name}"
+    store = QdrantVectorStore(collection_name, vector_size=vectors.shape[1], qdrant_url=args.url)
+    try:
+        start = time.perf_counter()
+        upload(store, documents, vectors)
+        elapsed = time.perf_counter() - start
+        count = store.qdrant_client.count(collection_name, exact=True).count
+        assert count == len(documents), f"{name}: expected {len(documents)} points, got {count}"
+    finally:
+        store.qdrant_client.delete_collection(collection_name)
+    return len(documents) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.getenv("QDRANT_URL", "http://localhost:6333"))
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[256, 1024])
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--skip-rest", action="store_true", help="Skip the sequential baseline")
+    args = parser.parse_args()
+
+    documents, vectors = make_corpus(args.points, args.dim)
+    print(f"{'path':>28} {'points/s':>10}")
+
+    if not args.skip_rest:
+        rate = run(
+            "rest",
+            lambda store, docs, vecs: store.add_documents(docs, vecs.tolist()),
+            args,
+            documents,
+            vectors,
+        )
+        print(f"{'REST upsert(wait) x100':>28} {rate:>10.0f}")
+
+    for batch_size in args.batch_sizes:
+        for parallel in args.parallel:
+            rate = run(
+                f"grpc_{batch_size}_{parallel}",
+                lambda store, docs, vecs, batch_size=batch_size, parallel=parallel: (
+                    store.add_documents_bulk(docs, vecs, batch_size=batch_size, parallel=parallel)
+                ),
+                args,
+                documents,
+                vectors,
+            )
+            label = f"gRPC batch={batch_size} x{parallel}"
+            print(f"{label:>28} {rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
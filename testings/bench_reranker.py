@@ -0,0 +1,104 @@
+"""
+Latency of Reranker scoring for one query against a growing number of ~2000 character
+chunks, comparing the single padded forward pass over the full LM head, the same pass
+with only the yes/no LM head rows, token-budget mini-batching and mini-batching on top of
+the shared-prefix KV cache.
+
+Usage:
+    python testings/bench_reranker.py --docs 1 5 15 30 60 --max-tokens 8192
+    python testings/bench_reranker.py --int8 --threads 4
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+import torch  # noqa: E402
+from embedding_backend_parity import load_fixture_texts  # noqa: E402
+from tools.reranker import Reranker  # noqa: E402
+
+QUERY = "When is a player disqualified for personal fouls?"
+
+
+def build_chunks(num_docs: int, seed: int = 0) -> list[str]:
+    """Chunks between ~300 and ~2000 characters, like RecursiveCharacterTextSplitter output."""
+    rng = random.Random(seed)
+    passages = load_fixture_texts()
+    chunks = []
+    for _ in range(num_docs):
+        target = rng.randint(300, 2000)
+        chunk = ""
+        while len(chunk) < target:
+            chunk += rng.choice(passages) + " "
+        chunks.append(chunk[:target])
+    return chunks
+
+
+def single_pass(reranker: Reranker, documents: list[str]) -> list[float]:
+    pairs = [reranker.format_instruction(reranker.task, QUERY, doc) for doc in documents]
+    return reranker.compute_logits(reranker.process_inputs(pairs))
+
+
+def timed(fn, repeats: int) -> float:
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="Qwen/Qwen3-Reranker-0.6B")
+    parser.add_argument("--docs", type=int, nargs="+", default=[1, 5, 15, 30, 60])
+    parser.add_argument("--max-tokens", type=int, default=8192)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    reranker = Reranker(args.model, max_tokens_per_batch=args.max_tokens, quantize_int8=args.int8)
+    modes = {
+        "single": lambda documents: single_pass(reranker, documents),
+        "yes/no": lambda documents: reranker.compute_yes_no_logits(
+            reranker.process_inputs(
+                [reranker.format_instruction(reranker.task, QUERY, doc) for doc in documents]
+            )
+        ),
+        "batched": lambda documents: reranker.score_pairs(
+            [reranker.format_instruction(reranker.task, QUERY, doc) for doc in documents]
+        ),
+        "prefix": lambda documents: reranker.score_with_shared_prefix(QUERY, documents),
+    }
+
+    header = f"{'docs':>5} {'padded tokens':>14}" + "".join(f" {m + ' ms':>11}" for m in modes)
+    print(header + f" {'yes/no x':>9} {'batched x':>10} {'prefix x':>9}")
+    for num_docs in args.docs:
+        documents = build_chunks(num_docs)
+        pairs = [reranker.format_instruction(reranker.task, QUERY, doc) for doc in documents]
+        lengths = [len(ids) for ids in reranker.tokenize_pairs(pairs)]
+        single_tokens = max(lengths) * len(lengths)
+
+        latencies = {
+            mode: timed(lambda fn=fn, documents=documents: fn(documents), args.repeats)
+            for mode, fn in modes.items()
+        }
+        row = f"{num_docs:>5} {single_tokens:>14}"
+        row += "".join(f" {latencies[m]:>11.1f}" for m in modes)
+        row += f" {latencies['single'] / latencies['yes/no']:>8.2f}x"
+        row += f" {latencies['single'] / latencies['batched']:>9.2f}x"
+        row += f" {latencies['single'] / latencies['prefix']:>8.2f}x"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
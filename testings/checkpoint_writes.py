@@ -0,0 +1,181 @@
+"""
+Checkpoint rows and bytes written per RAG turn, with the retrieval subgraph persisting its own
+checkpoints and per-step durability (before) versus a non-persisted subgraph and checkpoints
+written only at interrupts and turn ends (after).
+
+Agents, embedding, search, memory and reranking are stubbed. The checkpointer is an in-memory
+saver that counts what PostgresSaver would write: one `checkpoints` row per checkpoint, one
+`checkpoint_blobs` row per updated channel and one `checkpoint_writes` row per pending write.
+Bytes are the serialized sizes of those values.
+
+Usage:
+    python testings/checkpoint_writes.py --turns 5
+"""
+
+import argparse
+import sys
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from langchain_core.messages import AIMessage  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from agents.chat_agent import ChatAgentResponse  # noqa: E402
+from agents.input_agent import GuardrailOutput  # noqa: E402
+from agents.query_agent import SearchQueryList  # noqa: E402
+from orchestrator.main_graph_node import MainGraph  # noqa: E402
+from orchestrator.subgraph_nodes import RetrievalSubGraph  # noqa: E402
+from states.graph_states import ContextSchema  # noqa: E402
+
+QUERY = "What happens after a flagrant foul 2?"
+SUBQUERIES = [
+    "What is a flagrant foul 2?",
+    "What is the penalty for a flagrant foul 2?",
+    "Is a player ejected after a flagrant foul 2?",
+]
+CHUNK = "A flagrant foul penalty 2 results in the ejection of the offender. " * 20
+
+
+class CountingSaver(InMemorySaver):
+    """In-memory checkpointer counting the rows and bytes a Postgres checkpointer writes."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = Counter()
+        self.bytes = 0
+
+    def _size(self, value) -> int:
+        return len(self.serde.dumps_typed(value)[1])
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        values = checkpoint["channel_values"]
+        self.rows["checkpoints"] += 1
+        self.rows["checkpoint_blobs"] += len(new_versions)
+        self.bytes += self._size({k: v for k, v in checkpoint.items() if k != "channel_values"})
+        self.bytes += self._size(metadata)
+        self.bytes += sum(self._size(values[k]) for k in new_versions if k in values)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        self.rows["checkpoint_writes"] += len(writes)
+        self.bytes += sum(self._size(value) for _, value in writes)
+        return super().put_writes(config, writes, task_id, task_path)
+
+
+class StubAgent:
+    def __init__(self, output):
+        self.output = output
+
+    def run(self, *args, **kwargs):
+        return self.output
+
+    def answer(self, *args, **kwargs):
+        return self.output
+
+
+class StubEmbedder:
+    def embed_query(self, text):
+        return [0.0] * 1024
+
+    def generate_embedding(self, texts):
+        return [[0.0] * 1024 for _ in texts]
+
+
+class StubVectorStore:
+    def _points(self, text, top_k):
+        return [
+            SimpleNamespace(
+                id=f"{text}-{i}", score=0.9, payload={"content": CHUNK, "page": 1, "source": "r"}
+            )
+            for i in range(top_k)
+        ]
+
+    def search(self, embedding, top_k=5, query_text=None, **kwargs):
+        return self._points(query_text, top_k)
+
+    def search_batch(self, embeddings, top_k=5, query_texts=None, **kwargs):
+        return [self._points(text, top_k) for text in query_texts]
+
+
+class StubMemory:
+    def search_memory(self, query, user_id):
+        return {"results": [{"memory": f"{user_id} prefers short answers"}]}
+
+
+def build_graph(saver: CountingSaver, retrieval_mode: str, persist_subgraph: bool) -> MainGraph:
+    retrieval = RetrievalSubGraph.__new__(RetrievalSubGraph)
+    retrieval.emb_generator = StubEmbedder()
+    retrieval.qdrant_store = StubVectorStore()
+    retrieval.mem_zero = StubMemory()
+    retrieval.retriever_config = SimpleNamespace(top_k=5)
+    retrieval.max_concurrency = 3
+    # Before: the subgraph had its own Postgres checkpointer
+    retrieval.subgraph = retrieval._build_subgraph(saver if persist_subgraph else False)
+
+    main_graph = MainGraph.__new__(MainGraph)
+    main_graph.input_agent = StubAgent(GuardrailOutput(classification="safe"))
+    main_graph.chat_agent = StubAgent(ChatAgentResponse(use_rag=True, message="rules"))
+    main_graph.query_agent = StubAgent(SearchQueryList(queries=SUBQUERIES))
+    main_graph.response_agent = StubAgent(AIMessage(content="A flagrant 2 is an ejection."))
+    main_graph.retrieval = retrieval
+    main_graph.retrieval_mode = retrieval_mode
+    main_graph.speculative = False
+    main_graph.speculation = None
+    main_graph.model_executor = ThreadPoolExecutor(max_workers=1)
+    main_graph.async_nodes = False
+
+    def rerank(query, sub_results):
+        for result in sub_results:
+            for chunk in result.search_result:
+                chunk["rerank_score"] = 0.9
+        return {"sub_results": sub_results, "metrics": {"rerank_cache_hits": 0}}
+
+    main_graph._rerank_sub_results = rerank
+    main_graph.checkpointer = saver
+    main_graph.graph = main_graph._build_graph()
+    return main_graph
+
+
+def measure(retrieval_mode: str, persist_subgraph: bool, durability: str, turns: int):
+    saver = CountingSaver()
+    main_graph = build_graph(saver, retrieval_mode, persist_subgraph)
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    context = ContextSchema(user_id="timing")
+    for _ in range(turns):
+        main_graph.graph.invoke(
+            {"query": QUERY}, config=config, context=context, durability=durability
+        )
+    return {table: count / turns for table, count in saver.rows.items()}, saver.bytes / turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=5, help="RAG turns in one conversation")
+    args = parser.parse_args()
+
+    # (subgraph checkpoints, durability): before, subgraph not persisted, after
+    setups = [(True, "async"), (False, "async"), (False, "exit")]
+    print(
+        f"{'retrieval':>9} {'subgraph ckpt':>13} {'durability':>10} {'checkpoints':>12} "
+        f"{'blobs':>7} {'writes':>7} {'rows':>6} {'KB':>8}"
+    )
+    for retrieval_mode in ("subgraph", "batch"):
+        for persist_subgraph, durability in setups:
+            if retrieval_mode == "batch" and persist_subgraph:
+                # The batch path does not run the subgraph
+                continue
+            rows, size = measure(retrieval_mode, persist_subgraph, durability, args.turns)
+            print(
+                f"{retrieval_mode:>9} {str(persist_subgraph):>13} {durability:>10} "
+                f"{rows.get('checkpoints', 0):>12.1f} {rows.get('checkpoint_blobs', 0):>7.1f} "
+                f"{rows.get('checkpoint_writes', 0):>7.1f} {sum(rows.values()):>6.1f} "
+                f"{size / 1024:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
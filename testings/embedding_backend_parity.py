@@ -0,0 +1,60 @@
+"""
+Parity check of the ONNX Runtime embedding backend against the PyTorch backend.
+
+Every query and passage of the fixture set is embedded by both backends and the
+row-wise cosine similarity must stay above the threshold.
+
+Usage:
+    python testings/embedding_backend_parity.py --quantize --threshold 0.99
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from tools.embedding_generator import EmbeddingGenerator  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).resolve().parent / "fixtures" / "nba_rules_fixture.json"
+
+
+def load_fixture_texts(path: Path = FIXTURE_PATH) -> list[str]:
+    with open(path, "r") as f:
+        fixture = json.load(f)
+    texts = []
+    for item in fixture:
+        texts.append(item["query"])
+        texts.extend(item["passages"])
+    return texts
+
+
+def check_parity(model_name: str, quantize: bool, threshold: float) -> float:
+    texts = load_fixture_texts()
+    torch_generator = EmbeddingGenerator(
+        model_name, device="cpu", backend="torch", use_cache=False, use_scheduler=False
+    )
+    onnx_generator = EmbeddingGenerator(
+        model_name, backend="onnx", onnx_quantize=quantize, use_cache=False, use_scheduler=False
+    )
+
+    torch_embeddings = torch_generator.generate_embedding(texts)
+    onnx_embeddings = onnx_generator.generate_embedding(texts)
+
+    # Both backends return normalized vectors, so the row-wise dot product is the cosine
+    cosines = np.sum(torch_embeddings * onnx_embeddings, axis=1)
+    print(f"Texts: {len(texts)}  min cosine: {cosines.min():.5f}  mean: {cosines.mean():.5f}")
+    assert cosines.min() >= threshold, f"ONNX parity below {threshold}: {cosines.min():.5f}"
+    return float(cosines.min())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="Qwen/Qwen3-Embedding-0.6B")
+    parser.add_argument("--quantize", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.99)
+    args = parser.parse_args()
+    check_parity(args.model, args.quantize, args.threshold)
@@ -0,0 +1,63 @@
+"""
+Resident memory of the embedding models used by the retrieval subgraph and Mem0.
+
+"separate" loads the model for EmbeddingGenerator and a second SentenceTransformer the
+way Mem0's huggingface embedder does. "shared" builds EmbeddingGenerator and the Mem0
+adapter on top of the model registry. Each mode runs in a fresh interpreter.
+
+Usage:
+    python testings/report_model_rss.py
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parents[1] / "service"
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_mode(mode: str, model_name: str):
+    sys.path.insert(0, str(SERVICE_DIR))
+    from sentence_transformers import SentenceTransformer
+    from tools.embedding_generator import EmbeddingGenerator
+    from tools.memory import SharedModelEmbeddings
+
+    before = rss_mb()
+    generator = EmbeddingGenerator(model_name, device="cpu", use_cache=False, use_scheduler=False)
+    if mode == "separate":
+        mem0_model = SentenceTransformer(model_name, device="cpu")
+        mem0_model.encode("warm up")
+    else:
+        mem0_model = SharedModelEmbeddings(generator)
+        mem0_model.embed_query("warm up")
+    generator.generate_embedding(["warm up"])
+    print(f"{mode:>9}: before={before:8.1f} MB  after={rss_mb():8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="Qwen/Qwen3-Embedding-0.6B")
+    parser.add_argument("--mode", choices=["separate", "shared"], default=None)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.model)
+        return
+
+    for mode in ["separate", "shared"]:
+        subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--model", args.model], check=True
+        )
+
+
+if __name__ == "__main__":
+    main()
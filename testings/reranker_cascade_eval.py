@@ -0,0 +1,79 @@
+"""
+How often the reranker cascade skips the model on the fixture set and how closely its
+keep/drop decisions agree with full reranking.
+
+A chunk is kept when its rerank score is above the response threshold used by
+MainGraph._make_response (0.4). Vector scores are cosine similarities from the same
+embedding model the retrieval subgraph uses.
+
+Usage:
+    python testings/reranker_cascade_eval.py --margins 0.05 0.1 0.15 --int8
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from tools.embedding_generator import EmbeddingGenerator  # noqa: E402
+from tools.reranker import Reranker  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).resolve().parent / "fixtures" / "nba_rules_fixture.json"
+KEEP_THRESHOLD = 0.4
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embedding-model", default="Qwen/Qwen3-Embedding-0.6B")
+    parser.add_argument("--reranker-model", default="Qwen/Qwen3-Reranker-0.6B")
+    parser.add_argument("--threshold", type=float, default=0.55)
+    parser.add_argument("--margins", type=float, nargs="+", default=[0.05, 0.1, 0.15, 0.2])
+    parser.add_argument("--min-candidates", type=int, default=3)
+    parser.add_argument("--int8", action="store_true")
+    args = parser.parse_args()
+
+    with open(FIXTURE_PATH, "r") as f:
+        fixture = json.load(f)
+
+    generator = EmbeddingGenerator(
+        args.embedding_model, device="cpu", use_cache=False, use_scheduler=False
+    )
+    reranker = Reranker(args.reranker_model, quantize_int8=args.int8)
+
+    cases = []
+    for item in fixture:
+        query_embedding = generator.generate_embedding(item["query"])
+        passage_embeddings = generator.generate_embedding(item["passages"])
+        vector_scores = (passage_embeddings @ query_embedding).tolist()
+        full_scores = reranker.run([item["query"]], item["passages"])
+        cases.append((item, vector_scores, full_scores))
+
+    print(f"{'margin':>7} {'skipped calls':>14} {'skipped docs':>13} {'agreement':>10}")
+    for margin in args.margins:
+        reranker.cascade_threshold = args.threshold
+        reranker.cascade_margin = margin
+        reranker.cascade_min_candidates = args.min_candidates
+        reranker.cascade_calls = reranker.cascade_skipped_calls = 0
+        reranker.cascade_documents = reranker.cascade_skipped_documents = 0
+
+        agree = total = 0
+        for item, vector_scores, full_scores in cases:
+            cascade_scores, _ = reranker.run_cascade(item["query"], item["passages"], vector_scores)
+            keep_full = np.array(full_scores) > KEEP_THRESHOLD
+            keep_cascade = np.array(cascade_scores) > KEEP_THRESHOLD
+            agree += int((keep_full == keep_cascade).sum())
+            total += len(full_scores)
+
+        stats = reranker.cascade_stats()
+        print(
+            f"{margin:>7.2f} {stats['skipped_call_rate']:>13.0%} "
+            f"{stats['skipped_document_rate']:>12.0%} {agree / total:>9.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
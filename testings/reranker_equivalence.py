@@ -0,0 +1,59 @@
+"""
+Numerical equivalence of the Reranker scoring paths against the reference
+`compute_logits` single padded forward pass.
+
+Usage:
+    python testings/reranker_equivalence.py --atol 1e-3
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from tools.reranker import Reranker  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).resolve().parent / "fixtures" / "nba_rules_fixture.json"
+
+
+def reference_scores(reranker: Reranker, query: str, documents: list[str]) -> list[float]:
+    """Scores of the original path: every pair padded into one forward pass."""
+    pairs = [reranker.format_instruction(reranker.task, query, doc) for doc in documents]
+    return reranker.compute_logits(reranker.process_inputs(pairs))
+
+
+def max_abs_diff(a: list[float], b: list[float]) -> float:
+    return max(abs(x - y) for x, y in zip(a, b))
+
+
+def check_equivalence(model_name: str, atol: float):
+    with open(FIXTURE_PATH, "r") as f:
+        fixture = json.load(f)
+
+    reranker = Reranker(model_name, max_tokens_per_batch=1024)
+    worst = {"yes-no head": 0.0, "mini-batched": 0.0, "shared-prefix": 0.0}
+    for item in fixture:
+        query, documents = item["query"], item["passages"]
+        pairs = [reranker.format_instruction(reranker.task, query, doc) for doc in documents]
+        expected = reference_scores(reranker, query, documents)
+        candidates = {
+            "yes-no head": reranker.compute_yes_no_logits(reranker.process_inputs(pairs)),
+            "mini-batched": reranker.score_pairs(pairs),
+            "shared-prefix": reranker.score_with_shared_prefix(query, documents),
+        }
+        for mode, scores in candidates.items():
+            worst[mode] = max(worst[mode], max_abs_diff(expected, scores))
+
+    for mode, diff in worst.items():
+        print(f"{mode:>15}: max |score - reference| = {diff:.2e}")
+        assert diff <= atol, f"{mode} scores differ from compute_logits by {diff:.2e}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="Qwen/Qwen3-Reranker-0.6B")
+    parser.add_argument("--atol", type=float, default=1e-3)
+    args = parser.parse_args()
+    check_equivalence(args.model, args.atol)
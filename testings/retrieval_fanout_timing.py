@@ -0,0 +1,118 @@
+"""
+Timing check of the sub-query fan-out: with stubbed embedding, Qdrant and Mem0 components that
+sleep for a fixed time per sub-query, running the retrieval subgraph for every sub-query
+concurrently should take about as long as the slowest sub-query, not the sum.
+
+Usage:
+    python testings/retrieval_fanout_timing.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from orchestrator.subgraph_nodes import RetrievalSubGraph  # noqa: E402
+from states.graph_states import ContextSchema  # noqa: E402
+
+# Seconds spent per sub-query in (embedding, vector search, memory search)
+DELAYS = {
+    "What is a flagrant foul?": (0.05, 0.10, 0.10),
+    "What is the penalty for a flagrant foul 2?": (0.10, 0.20, 0.15),
+    "When is a player ejected?": (0.15, 0.30, 0.20),
+}
+
+
+class StubEmbedder:
+    def embed_query(self, text):
+        time.sleep(DELAYS[text][0])
+        return [0.0, 1.0]
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(DELAYS[text][0])
+        return [0.0, 1.0]
+
+
+class StubVectorStore:
+    def _points(self, text):
+        return [SimpleNamespace(id=text, score=1.0, payload={"content": text, "page": 1})]
+
+    def search(self, embedding, top_k=5, query_text=None, **kwargs):
+        time.sleep(DELAYS[query_text][1])
+        return self._points(query_text)
+
+    async def asearch(self, embedding, top_k=5, query_text=None, **kwargs):
+        await asyncio.sleep(DELAYS[query_text][1])
+        return self._points(query_text)
+
+
+class StubMemory:
+    def search_memory(self, query, user_id):
+        time.sleep(DELAYS[query][2])
+        return {"results": [{"memory": f"{user_id}: {query}"}]}
+
+
+def build_retrieval() -> RetrievalSubGraph:
+    """RetrievalSubGraph wired to the stubs, without models, Qdrant or Postgres."""
+    retrieval = RetrievalSubGraph.__new__(RetrievalSubGraph)
+    retrieval.emb_generator = StubEmbedder()
+    retrieval.qdrant_store = StubVectorStore()
+    retrieval.mem_zero = StubMemory()
+    retrieval.retriever_config = SimpleNamespace(top_k=5)
+    retrieval.max_concurrency = 3
+    retrieval.subgraph = retrieval._build_subgraph()
+    retrieval.async_subgraph = retrieval._build_async_subgraph()
+    return retrieval
+
+
+def check(name, elapsed, results, subqueries, slowest, total):
+    ordered = [result.subquery for result in results] == subqueries and all(
+        result.search_result[0]["id"] == result.subquery for result in results
+    )
+    print(
+        f"{name:>12}: {elapsed:.3f}s (slowest {slowest:.3f}s, sum {total:.3f}s), "
+        f"order ok: {ordered}"
+    )
+    return ordered
+
+
+def main():
+    retrieval = build_retrieval()
+    context = ContextSchema(user_id="timing")
+    subqueries = list(DELAYS)
+    per_query = [max(embed + search, memory) for embed, search, memory in DELAYS.values()]
+    slowest, total = max(per_query), sum(per_query)
+
+    start = time.perf_counter()
+    sequential = [
+        retrieval._to_query_results(
+            [q], [retrieval.subgraph.invoke({"subquery": q}, context=context)]
+        )[0]
+        for q in subqueries
+    ]
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fanout = retrieval.run_subqueries(subqueries, context=context)
+    fanout_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    async_fanout = asyncio.run(retrieval.arun_subqueries(subqueries, context=context))
+    async_time = time.perf_counter() - start
+
+    ok = check("sequential", sequential_time, sequential, subqueries, slowest, total)
+    ok &= check("fan-out", fanout_time, fanout, subqueries, slowest, total)
+    ok &= check("async", async_time, async_fanout, subqueries, slowest, total)
+
+    # Graph overhead is a few ms per run, anything close to the sum means no overlap
+    ok &= fanout_time < slowest + 0.5 * (total - slowest)
+    ok &= async_time < slowest + 0.5 * (total - slowest)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Time to first answer token with the streaming path (graph.stream with the "messages", "custom"
+and "updates" modes) versus the time to the full answer with graph.invoke.
+
+The guardrail, router and formatter are stubbed with fixed sleeps, retrieval and reranking
+with a fixed sleep, and the response model with a fake chat model that waits before its first
+token and between tokens, the way a streamed completion arrives.
+
+Usage:
+    python testings/streaming_ttft.py --first-token-delay 0.4 --token-delay 0.03 --repeats 3
+"""
+
+import argparse
+import re
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from agents.chat_agent import ChatAgentResponse  # noqa: E402
+from agents.input_agent import GuardrailOutput  # noqa: E402
+from agents.query_agent import SearchQueryList  # noqa: E402
+from orchestrator.main_graph_node import MainGraph  # noqa: E402
+from orchestrator.streaming import stream_turn  # noqa: E402
+from states.graph_states import ContextSchema, QueryResult  # noqa: E402
+
+QUERY = "What happens after a flagrant foul 2?"
+ANSWER = (
+    "A flagrant foul penalty 2 is unnecessary and excessive contact. The offender is ejected, "
+    "the fouled player shoots two free throws and his team keeps possession of the ball. "
+) * 3
+FRONT_DELAY = 0.3
+RETRIEVAL_DELAY = 0.2
+
+
+class SlowChatModel(BaseChatModel):
+    """Fake chat model returning a fixed answer with a first-token and per-token delay."""
+
+    answer: str
+    first_token_delay: float
+    token_delay: float
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _tokens(self) -> List[str]:
+        return re.findall(r"\S+\s*", self.answer)
+
+    def _generate(
+        self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        time.sleep(self.first_token_delay + self.token_delay * len(self._tokens()))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    def _stream(
+        self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_delay)
+        for token in self._tokens():
+            time.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class StubAgent:
+    def __init__(self, output):
+        self.output = output
+
+    def run(self, *args, **kwargs):
+        time.sleep(FRONT_DELAY)
+        return self.output
+
+
+class StubResponseAgent:
+    def __init__(self, model: BaseChatModel):
+        self.agent = model
+
+    def answer(self, query, sub_queries, memory, search_result, chat_history=None):
+        return self.agent.invoke(query)
+
+
+class StubRetrieval:
+    def retrieve_batch(self, subqueries, user_id):
+        time.sleep(RETRIEVAL_DELAY)
+        return [QueryResult(subquery=q, search_result=[], memories=[]) for q in subqueries]
+
+
+def build_graph(args) -> MainGraph:
+    """MainGraph wired to the stubs, without OpenAI, models, Qdrant or Postgres."""
+    main_graph = MainGraph.__new__(MainGraph)
+    main_graph.input_agent = StubAgent(GuardrailOutput(classification="safe"))
+    main_graph.chat_agent = StubAgent(ChatAgentResponse(use_rag=True, message="rules"))
+    main_graph.query_agent = StubAgent(SearchQueryList(queries=[QUERY]))
+    main_graph.response_agent = StubResponseAgent(
+        SlowChatModel(
+            answer=ANSWER,
+            first_token_delay=args.first_token_delay,
+            token_delay=args.token_delay,
+        )
+    )
+    main_graph.retrieval = StubRetrieval()
+    main_graph.retrieval_mode = "batch"
+    main_graph.speculative = False
+    main_graph.speculation = None
+    main_graph.model_executor = ThreadPoolExecutor(max_workers=1)
+    main_graph.async_nodes = False
+    main_graph._rerank_sub_results = lambda query, sub_results: {
+        "sub_results": sub_results,
+        "metrics": {},
+    }
+    main_graph.checkpointer = InMemorySaver()
+    main_graph.graph = main_graph._build_graph()
+    return main_graph
+
+
+def turn_args():
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    return {"query": QUERY}, config, ContextSchema(user_id="timing")
+
+
+def run_invoke(main_graph: MainGraph) -> Optional[float]:
+    graph_input, config, context = turn_args()
+    start = time.perf_counter()
+    output = main_graph.graph.invoke(graph_input, config=config, context=context)
+    elapsed = time.perf_counter() - start
+    return elapsed if output["final_result"] == ANSWER else None
+
+
+def run_stream(main_graph: MainGraph):
+    graph_input, config, context = turn_args()
+    progress, tokens = [], []
+    turn = stream_turn(
+        main_graph.graph,
+        graph_input,
+        config=config,
+        context=context,
+        on_progress=progress.append,
+        on_token=tokens.append,
+    )
+    ok = turn.final_response == ANSWER and "".join(tokens) == ANSWER and bool(progress)
+    return turn.time_to_first_token, turn.total_time, ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--first-token-delay", type=float, default=0.4)
+    parser.add_argument("--token-delay", type=float, default=0.03)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    main_graph = build_graph(args)
+    invoke_times = [run_invoke(main_graph) for _ in range(args.repeats)]
+    stream_runs = [run_stream(main_graph) for _ in range(args.repeats)]
+
+    full_answer = sum(invoke_times) / args.repeats
+    ttft = sum(run[0] for run in stream_runs) / args.repeats
+    stream_total = sum(run[1] for run in stream_runs) / args.repeats
+    ok = all(invoke_times) and all(run[2] for run in stream_runs)
+    print(f"invoke, time to full answer:  {full_answer:.3f}s")
+    print(f"stream, time to first token:  {ttft:.3f}s ({full_answer / ttft:.1f}x sooner)")
+    print(f"stream, time to full answer:  {stream_total:.3f}s")
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
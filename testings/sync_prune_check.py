@@ -0,0 +1,89 @@
+"""
+Check that QdrantVectorStore.sync_documents prunes stale points of a re-ingested source in a
+collection written before content-addressed IDs, where points have integer IDs.
+
+Runs against an in-memory Qdrant (local mode) unless --url is given. Embeddings are random.
+
+Usage:
+    python testings/sync_prune_check.py
+    python testings/sync_prune_check.py --url http://localhost:6333
+"""
+
+import argparse
+import sys
+import uuid
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+import numpy as np  # noqa: E402
+from langchain_core.documents import Document  # noqa: E402
+from qdrant_client import QdrantClient, models  # noqa: E402
+from tools import vector_store as vector_store_module  # noqa: E402
+from tools.vector_store import QdrantVectorStore  # noqa: E402
+
+VECTOR_SIZE = 8
+SOURCE = "nba_rules.pdf"
+
+
+def random_vectors(n: int) -> list[list[float]]:
+    return np.random.default_rng(0).random((n, VECTOR_SIZE)).tolist()
+
+
+def build_store(url: str, collection_name: str) -> QdrantVectorStore:
+    if url != ":memory:":
+        return QdrantVectorStore(collection_name, vector_size=VECTOR_SIZE, qdrant_url=url)
+    client = QdrantClient(location=":memory:")
+    with mock.patch.object(vector_store_module, "QdrantClient", lambda url: client):
+        return QdrantVectorStore(collection_name, vector_size=VECTOR_SIZE)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=":memory:", help="Qdrant URL, in-memory by default")
+    args = parser.parse_args()
+
+    store = build_store(args.url, f"sync_prune_check_{uuid.uuid4().hex[:8]}")
+    client = store.qdrant_client
+
+    # Points as written before content-addressed IDs: integer IDs, old chunk texts
+    client.upsert(
+        collection_name=store.collection_name,
+        points=[
+            models.PointStruct(
+                id=point_id,
+                vector=vector,
+                payload={"source": SOURCE, "page": 1, "chunk_index": i, "content": "old"},
+            )
+            for i, (point_id, vector) in enumerate(zip([5, 6], random_vectors(2)))
+        ],
+        wait=True,
+    )
+
+    documents = [
+        Document(
+            page_content=f"Rule {i}: a flagrant foul penalty 2 results in an ejection.",
+            metadata={"source": SOURCE, "page": 1, "chunk_index": i},
+        )
+        for i in range(3)
+    ]
+    stats = store.sync_documents(documents, lambda docs: random_vectors(len(docs)))
+
+    stored = {
+        record.id for record in client.scroll(collection_name=store.collection_name, limit=100)[0]
+    }
+    expected = {QdrantVectorStore.chunk_id(doc) for doc in documents}
+    client.delete_collection(store.collection_name)
+
+    ok = stats["deleted"] == 2 and stored == expected
+    print(f"sync stats: {stats}")
+    print(
+        f"points left: {len(stored)}, integer IDs left: {sum(isinstance(i, int) for i in stored)}"
+    )
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()